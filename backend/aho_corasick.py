@@ -0,0 +1,96 @@
+"""
+Aho-Corasick multi-pattern matcher
+Finds every occurrence of every pattern in one linear scan of the text
+"""
+
+from collections import deque
+from typing import List, Dict, Iterator, Tuple
+
+
+class AhoCorasick:
+    """Automaton over a fixed set of patterns (matching is case-sensitive, lowercase both sides for case-insensitive search)"""
+
+    def __init__(self, patterns: List[str]):
+        """
+        Args:
+            patterns: Strings to search for; empty patterns are ignored
+        """
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Pattern indices ending at each state, including those inherited through fail links
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first so every fail target is complete before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Scan text once
+
+        Yields:
+            (start, end, pattern_index) for every occurrence, ordered by end offset
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for index in output[state]:
+                    yield end - len(patterns[index]), end, index
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """Get every (start, end, pattern_index) occurrence, ordered by start offset"""
+        return sorted(self.iter(text))
+
+
+def build_name_matcher(names: List[str], aliases: Dict[str, List[str]] = None) -> Tuple[AhoCorasick, List[List[int]]]:
+    """
+    Build a case-insensitive matcher for parameter names and their aliases
+
+    Returns:
+        (automaton over lowercased patterns, owners) where owners[pattern_index]
+        lists the indices into names that the pattern stands for
+    """
+    aliases = aliases or {}
+    pattern_ids: Dict[str, int] = {}
+    owners: List[List[int]] = []
+    for name_index, name in enumerate(names):
+        for pattern in [name] + list(aliases.get(name, [])):
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(owners)
+                owners.append([])
+            if name_index not in owners[pattern_ids[pattern]]:
+                owners[pattern_ids[pattern]].append(name_index)
+    return AhoCorasick(list(pattern_ids)), owners
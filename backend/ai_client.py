@@ -0,0 +1,143 @@
+"""
+Pooled async HTTP client for AI provider requests
+Keeps connections alive between requests (HTTP/2 through httpx[http2] from requirements.txt),
+bounds every attempt by timeouts and retries 429/5xx answers with jittered
+exponential backoff, so extraction doesn't pay TLS setup or rate-limit errors per call
+"""
+
+import asyncio
+import importlib.util
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from config import APIConfig
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the h2 package (httpx[http2] in requirements.txt)"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def is_retryable(status_code: int) -> bool:
+    """Rate limits and server errors are worth retrying"""
+    return status_code == 429 or status_code >= 500
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """
+    Delay before retry number attempt + 1
+
+    Full jitter: a random delay up to base * 2**attempt (at most cap), or the
+    server's Retry-After seconds when it sends one (also at most cap).
+    """
+    if retry_after:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retries 429/5xx responses and failed connects of the wrapped transport within a time budget"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_retries: int = None, backoff_base: float = None,
+                 backoff_max: float = None, budget: float = None):
+        """
+        Args:
+            transport: Transport doing the actual requests
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds, doubled every retry
+            backoff_max: Longest single backoff in seconds
+            budget: Seconds after the first attempt by which every retry must have started
+        """
+        self.transport = transport
+        self.max_retries = APIConfig.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = APIConfig.AI_BACKOFF_BASE_SECONDS if backoff_base is None else backoff_base
+        self.backoff_max = APIConfig.AI_BACKOFF_MAX_SECONDS if backoff_max is None else backoff_max
+        self.budget = APIConfig.AI_RETRY_BUDGET_SECONDS if budget is None else budget
+        self.retries = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nothing reached the server, so the request can safely be sent again
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                if attempt >= self.max_retries or time.monotonic() - start + delay > self.budget:
+                    raise
+                reason = "connection failed"
+            else:
+                if not is_retryable(response.status_code) or attempt >= self.max_retries:
+                    return response
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, response.headers.get("retry-after"))
+                if time.monotonic() - start + delay > self.budget:
+                    return response
+                reason = f"HTTP {response.status_code}"
+                # Read the (small) error body so the connection goes back to the pool
+                await response.aread()
+                await response.aclose()
+
+            attempt += 1
+            self.retries += 1
+            print(f"⏳ AI request {reason}, retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(APIConfig.AI_TIMEOUT_SECONDS, connect=APIConfig.AI_CONNECT_TIMEOUT_SECONDS)
+
+
+def create_http_client(**retry_options) -> httpx.AsyncClient:
+    """Keep-alive connection pool sized by AI_HTTP_* settings, with retries (retry_options override config)"""
+    limits = httpx.Limits(
+        max_connections=APIConfig.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=APIConfig.AI_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=APIConfig.AI_HTTP_KEEPALIVE_SECONDS
+    )
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=APIConfig.AI_HTTP2 and http2_available())
+    return httpx.AsyncClient(transport=RetryTransport(transport, **retry_options), timeout=_timeout())
+
+
+def create_async_client(api_key: str, base_url: str, **retry_options) -> AsyncOpenAI:
+    """AsyncOpenAI client on its own connection pool (retries happen in the transport, not in the SDK)"""
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=create_http_client(**retry_options),
+        timeout=_timeout(),
+        max_retries=0
+    )
+
+
+class AIClientPool:
+    """App-lifetime AsyncOpenAI clients, one per (API key, base URL), shared by all extractors"""
+
+    def __init__(self):
+        self._clients: Dict[tuple, AsyncOpenAI] = {}
+
+    def get(self, api_key: str, base_url: str) -> AsyncOpenAI:
+        """Get the client for a provider, creating it on first use"""
+        key = (api_key, base_url)
+        if key not in self._clients:
+            self._clients[key] = create_async_client(api_key, base_url)
+            print(f"🔌 Opened pooled AI client for {base_url} (HTTP/2: {APIConfig.AI_HTTP2 and http2_available()})")
+            if APIConfig.AI_HTTP2 and not http2_available():
+                print("⚠️ AI_HTTP2 is on but h2 is missing, using HTTP/1.1 (pip install -r requirements.txt)")
+        return self._clients[key]
+
+    async def aclose(self) -> None:
+        """Close every client and its connections"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.close()
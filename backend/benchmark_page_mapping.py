@@ -0,0 +1,128 @@
+"""
+Benchmark page mapping construction
+Compares the legacy "mark 30 lines + fill gaps" builder with boundary detection
+on synthetic 1k/10k/100k line documents
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from page_mapping import LineLocator, PageMap
+
+
+def make_document(total_lines: int, seed: int = 0) -> Tuple[List[str], List[str], List[int]]:
+    """
+    Build a synthetic markdown document with pages of 10-80 lines
+
+    Returns:
+        (markdown lines, first line of each page's own export, true page of every line)
+    """
+    rng = random.Random(seed)
+    lines, first_lines, truth = [], [], []
+    page = 0
+    while len(lines) < total_lines:
+        page += 1
+        length = min(rng.randint(10, 80), total_lines - len(lines))
+        heading = f"## {page}.{rng.randint(1, 9)} Section heading for page {page}"
+        first_lines.append(heading)
+        lines.append(heading)
+        truth.append(page)
+        for i in range(length - 1):
+            lines.append(f"| row {i} | value {rng.randint(0, 999)} | mV |" if i % 3 else "")
+            truth.append(page)
+    return lines, first_lines, truth
+
+
+def legacy_fill_page_gaps(page_mapping: Dict[int, int], total_lines: int) -> Dict[int, int]:
+    """The previous MarkdownConverter._fill_page_gaps (rescans known lines for every gap)"""
+    if not page_mapping:
+        return {i: 1 for i in range(total_lines)}
+
+    filled_mapping = {}
+    sorted_lines = sorted(page_mapping.keys())
+
+    for line_num in range(total_lines):
+        if line_num in page_mapping:
+            filled_mapping[line_num] = page_mapping[line_num]
+        else:
+            if line_num < sorted_lines[0]:
+                filled_mapping[line_num] = page_mapping[sorted_lines[0]]
+            else:
+                prev_page = 1
+                for known_line in sorted_lines:
+                    if known_line <= line_num:
+                        prev_page = page_mapping[known_line]
+                    else:
+                        break
+                filled_mapping[line_num] = prev_page
+
+    return filled_mapping
+
+
+def legacy_page_mapping(lines: List[str], first_lines: List[str]) -> Dict[int, int]:
+    """The previous MarkdownConverter._extract_page_mapping page-export method"""
+    page_mapping = {}
+    current_line = 0
+    for page_idx, first_line in enumerate(first_lines, start=1):
+        for line_num in range(current_line, len(lines)):
+            if first_line[:30] in lines[line_num] or lines[line_num][:30] in first_line:
+                # Mark this and next ~30 lines as this page
+                for offset in range(min(30, len(lines) - line_num)):
+                    page_mapping[line_num + offset] = page_idx
+                current_line = line_num + 30
+                break
+    return legacy_fill_page_gaps(page_mapping, len(lines))
+
+
+def boundary_page_mapping(lines: List[str], first_lines: List[str]) -> PageMap:
+    """The current MarkdownConverter._extract_page_mapping page-export method"""
+    locator = LineLocator(lines)
+    boundaries = []
+    current_line = 0
+    for page_no, first_line in enumerate(first_lines, start=1):
+        line_num = locator.find(first_line, current_line)
+        if line_num is not None:
+            boundaries.append((line_num, page_no))
+            current_line = line_num + 1
+    return PageMap.from_boundaries(boundaries, len(lines))
+
+
+def accuracy(mapping, truth: List[int]) -> float:
+    """Share of lines mapped to their true page"""
+    return sum(1 for i, page in enumerate(truth) if mapping.get(i) == page) / len(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--max-legacy-lines", type=int, default=20000,
+                        help="Skip the quadratic legacy builder above this size")
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'pages':>6} | {'legacy s':>9} {'acc':>6} | {'boundary s':>10} {'acc':>6} | {'speedup':>8}")
+    print("-" * 68)
+    for size in args.sizes:
+        lines, first_lines, truth = make_document(size)
+
+        start = time.perf_counter()
+        new_mapping = boundary_page_mapping(lines, first_lines)
+        new_seconds = time.perf_counter() - start
+        new_accuracy = accuracy(new_mapping, truth)
+
+        if size <= args.max_legacy_lines:
+            start = time.perf_counter()
+            old_mapping = legacy_page_mapping(lines, first_lines)
+            old_seconds = time.perf_counter() - start
+            old_cols = f"{old_seconds:9.3f} {accuracy(old_mapping, truth):6.1%}"
+            speedup = f"{old_seconds / new_seconds:7.0f}x"
+        else:
+            old_cols = f"{'skipped':>9} {'-':>6}"
+            speedup = f"{'-':>8}"
+
+        print(f"{size:8d} {len(first_lines):6d} | {old_cols} | {new_seconds:10.4f} {new_accuracy:6.1%} | {speedup}")
+
+
+if __name__ == "__main__":
+    main()
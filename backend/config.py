@@ -32,6 +32,32 @@ class APIConfig:
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.1"))
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "2000"))
     
+    # Map-reduce AI extraction: the datasheet is split into section-aware chunks of at most
+    # AI_CHUNK_CHARS, parameters into batches, and every (chunk, batch) pair is one request
+    AI_CHUNK_CHARS: int = int(os.getenv("AI_CHUNK_CHARS", "12000"))
+    AI_PARAMETER_BATCH_SIZE: int = int(os.getenv("AI_PARAMETER_BATCH_SIZE", "25"))
+    AI_MAX_CONCURRENT_REQUESTS: int = int(os.getenv("AI_MAX_CONCURRENT_REQUESTS", "4"))
+    # Send each parameter batch only its best BM25 matching lines instead of whole chunks
+    AI_RETRIEVAL_ENABLED: bool = os.getenv("AI_RETRIEVAL_ENABLED", "true").lower() == "true"
+    AI_RETRIEVAL_TOP_K: int = int(os.getenv("AI_RETRIEVAL_TOP_K", "8"))
+    
+    # Shared AI HTTP client: connection pool, timeouts (seconds, per attempt) and retries of 429/5xx
+    AI_HTTP_MAX_CONNECTIONS: int = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+    AI_HTTP_MAX_KEEPALIVE: int = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "10"))
+    AI_HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("AI_HTTP_KEEPALIVE_SECONDS", "60"))
+    AI_HTTP2: bool = os.getenv("AI_HTTP2", "true").lower() == "true"  # needs h2, installed by httpx[http2] in requirements.txt
+    AI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AI_CONNECT_TIMEOUT_SECONDS", "5"))
+    AI_TIMEOUT_SECONDS: float = float(os.getenv("AI_TIMEOUT_SECONDS", "60"))
+    AI_MAX_RETRIES: int = int(os.getenv("AI_MAX_RETRIES", "4"))
+    AI_BACKOFF_BASE_SECONDS: float = float(os.getenv("AI_BACKOFF_BASE_SECONDS", "0.5"))
+    AI_BACKOFF_MAX_SECONDS: float = float(os.getenv("AI_BACKOFF_MAX_SECONDS", "20"))
+    AI_RETRY_BUDGET_SECONDS: float = float(os.getenv("AI_RETRY_BUDGET_SECONDS", "90"))
+    
+    # Per-parameter cache of AI responses (SQLite), keyed by chunk, parameter, model and prompt
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    AI_CACHE_PATH: str = os.getenv("AI_CACHE_PATH", os.path.join(os.path.dirname(__file__), "llm_cache.sqlite3"))
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "200000"))
+    
     @classmethod
     def get_api_key(cls) -> str:
         """Get the API key based on selected provider"""
@@ -100,9 +126,71 @@ class APIConfig:
             "base_url": cls.get_base_url(),
             "temperature": cls.TEMPERATURE,
             "max_tokens": cls.MAX_TOKENS,
+            "ai_chunk_chars": cls.AI_CHUNK_CHARS,
+            "ai_parameter_batch_size": cls.AI_PARAMETER_BATCH_SIZE,
+            "ai_max_concurrent_requests": cls.AI_MAX_CONCURRENT_REQUESTS,
+            "ai_retrieval_enabled": cls.AI_RETRIEVAL_ENABLED,
+            "ai_cache_enabled": cls.AI_CACHE_ENABLED,
+            "ai_max_retries": cls.AI_MAX_RETRIES,
             "has_api_key": bool(cls.get_api_key())
         }
 
 
+class ProcessingConfig:
+    """Configuration for PDF conversion and document processing"""
+    
+    # Conversion cache (content-addressed by PDF SHA-256)
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DIR: str = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache"))
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_MB", "2048")) * 1024 * 1024
+    
+    # Upload size limits (larger uploads are rejected with HTTP 413)
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
+    MAX_PARAMETER_FILE_BYTES: int = int(os.getenv("MAX_PARAMETER_FILE_MB", "10")) * 1024 * 1024
+    
+    # Background conversion process pool
+    CONVERSION_WORKERS: int = int(os.getenv("CONVERSION_WORKERS", "2"))
+    CONVERSION_MAX_PENDING: int = int(os.getenv("CONVERSION_MAX_PENDING", "8"))
+    JOB_RETENTION_SECONDS: int = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+    
+    # pdfplumber page extraction (0 = one process per CPU core, 1 = serial)
+    PDF_PAGE_WORKERS: int = int(os.getenv("PDF_PAGE_WORKERS", "0"))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+    
+    # Pages whose word blocks stay memoised per document for highlighting
+    PAGE_BLOCK_CACHE_PAGES: int = int(os.getenv("PAGE_BLOCK_CACHE_PAGES", "32"))
+    
+    # Per-user sessions (document state kept in memory between requests)
+    SESSION_TTL_SECONDS: int = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_MAX_COUNT: int = int(os.getenv("SESSION_MAX_COUNT", "64"))
+    SESSION_MAX_BYTES: int = int(os.getenv("SESSION_MAX_MB", "1024")) * 1024 * 1024
+    # "memory" (single worker), "disk" (files in SESSION_DIR) or a redis://host:port/db URL,
+    # both shared by the workers on one host (uploaded PDFs stay in the local uploads/ directory)
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")
+    SESSION_DIR: str = os.getenv("SESSION_DIR", os.path.join(os.path.dirname(__file__), "sessions"))
+    
+    # Threads used by RapidFuzz batch scoring (-1 = all cores)
+    FUZZY_WORKERS: int = int(os.getenv("FUZZY_WORKERS", "-1"))
+    
+    # Load Docling models in every conversion worker at startup
+    WARM_UP_ON_STARTUP: bool = os.getenv("WARM_UP_ON_STARTUP", "true").lower() == "true"
+    
+    @classmethod
+    def get_info(cls) -> dict:
+        """Get information about the current processing configuration"""
+        return {
+            "cache_enabled": cls.CACHE_ENABLED,
+            "cache_dir": cls.CACHE_DIR,
+            "cache_max_bytes": cls.CACHE_MAX_BYTES,
+            "conversion_workers": cls.CONVERSION_WORKERS,
+            "conversion_max_pending": cls.CONVERSION_MAX_PENDING,
+            "pdf_page_workers": cls.PDF_PAGE_WORKERS,
+            "session_backend": cls.SESSION_BACKEND.split("://")[0],
+            "session_ttl_seconds": cls.SESSION_TTL_SECONDS,
+            "session_max_count": cls.SESSION_MAX_COUNT,
+            "warm_up_on_startup": cls.WARM_UP_ON_STARTUP
+        }
+
+
 # Create a singleton instance
 config = APIConfig()
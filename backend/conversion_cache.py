@@ -0,0 +1,199 @@
+"""
+Content-addressed conversion cache.
+Stores Docling/pdfplumber results keyed by the SHA-256 of the PDF bytes so
+re-uploaded datasheets skip conversion entirely.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Any, Mapping, Optional
+
+from config import ProcessingConfig
+from docling_provenance import LineBoxes
+from page_mapping import PageMap
+
+
+class ConversionCache:
+    """On-disk cache of conversion results with size-bounded LRU eviction"""
+
+    MARKDOWN_FILE = "document.md"
+    PAGE_MAPPING_FILE = "page_mapping.json"
+    PAGES_FILE = "pages.json"
+    LINE_BOXES_FILE = "line_boxes.json"
+    META_FILE = "meta.json"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or ProcessingConfig.CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else ProcessingConfig.CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """Compute the SHA-256 hex digest of a file"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _package_version(name: str) -> str:
+        try:
+            return metadata.version(name)
+        except metadata.PackageNotFoundError:
+            return "unknown"
+
+    def make_key(self, pdf_sha256: str, converter_options: Dict[str, Any] = None) -> str:
+        """
+        Build the cache key for a PDF.
+
+        The key covers the PDF content, the Docling and pdfplumber versions and the
+        converter options, so upgrading either library or changing options never
+        serves stale results.
+        """
+        key_material = json.dumps({
+            "pdf_sha256": pdf_sha256,
+            "docling": self._package_version("docling"),
+            "pdfplumber": self._package_version("pdfplumber"),
+            "options": converter_options or {}
+        }, sort_keys=True)
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached conversion result.
+
+        Returns:
+            dict with markdown, page_mapping, line_boxes, pdf_pages and total_pages, or None on a miss
+        """
+        entry_dir = self.cache_dir / key
+        if not (entry_dir / self.META_FILE).exists():
+            self.misses += 1
+            return None
+
+        try:
+            with open(entry_dir / self.META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(entry_dir / self.MARKDOWN_FILE, 'r', encoding='utf-8') as f:
+                markdown = f.read()
+            with open(entry_dir / self.PAGE_MAPPING_FILE, 'r', encoding='utf-8') as f:
+                page_mapping = PageMap.from_wire(json.load(f))
+            with open(entry_dir / self.PAGES_FILE, 'r', encoding='utf-8') as f:
+                pdf_pages = json.load(f)
+            line_boxes = LineBoxes()
+            if (entry_dir / self.LINE_BOXES_FILE).exists():
+                with open(entry_dir / self.LINE_BOXES_FILE, 'r', encoding='utf-8') as f:
+                    line_boxes = LineBoxes.from_wire(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Discarding corrupt cache entry {key[:12]}: {e}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.misses += 1
+            return None
+
+        # Touch the entry so LRU eviction sees it as recently used
+        os.utime(entry_dir, None)
+        self.hits += 1
+
+        return {
+            "markdown": markdown,
+            "page_mapping": page_mapping,
+            "line_boxes": line_boxes,
+            "pdf_pages": pdf_pages,
+            "total_pages": meta["total_pages"]
+        }
+
+    def put(self, key: str, markdown: str, page_mapping: Mapping[int, int],
+            pdf_pages: list, total_pages: int, line_boxes: LineBoxes = None) -> None:
+        """
+        Store a conversion result and evict old entries if over the size limit
+
+        Best-effort: a failed cache write is logged and never fails the conversion.
+        """
+        entry_dir = self.cache_dir / key
+        if (entry_dir / self.META_FILE).exists():
+            return
+
+        # Unique per call, so concurrent writers of the same key never share a temp dir
+        tmp_dir = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            tmp_dir.mkdir(parents=True)
+            with open(tmp_dir / self.MARKDOWN_FILE, 'w', encoding='utf-8') as f:
+                f.write(markdown)
+            with open(tmp_dir / self.PAGE_MAPPING_FILE, 'w', encoding='utf-8') as f:
+                if not isinstance(page_mapping, PageMap):
+                    page_mapping = PageMap.from_dict(page_mapping)
+                json.dump(page_mapping.to_wire(), f)
+            with open(tmp_dir / self.PAGES_FILE, 'w', encoding='utf-8') as f:
+                json.dump(pdf_pages, f)
+            if line_boxes:
+                with open(tmp_dir / self.LINE_BOXES_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(line_boxes.to_wire(), f)
+
+            size = sum(p.stat().st_size for p in tmp_dir.iterdir())
+            with open(tmp_dir / self.META_FILE, 'w', encoding='utf-8') as f:
+                json.dump({"total_pages": total_pages, "size": size, "created": time.time()}, f)
+
+            # Publish atomically; if a concurrent writer published first, its entry is just as good
+            try:
+                os.replace(tmp_dir, entry_dir)
+            except OSError:
+                if not (entry_dir / self.META_FILE).exists():
+                    raise
+            self._evict()
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Could not cache conversion {key[:12]}: {e}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _entry_size(self, entry_dir: Path) -> int:
+        try:
+            with open(entry_dir / self.META_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)["size"]
+        except (OSError, ValueError, KeyError):
+            return sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir() and not entry_dir.name.startswith("."):
+                entries.append((entry_dir.stat().st_mtime, entry_dir, self._entry_size(entry_dir)))
+
+        total = sum(size for _, _, size in entries)
+        for _, entry_dir, size in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            print(f"🗑️ Evicted cache entry {entry_dir.name[:12]} ({size} bytes)")
+
+    def clear(self) -> None:
+        """Remove every cache entry"""
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache usage statistics"""
+        entries = [d for d in self.cache_dir.iterdir() if d.is_dir() and not d.name.startswith(".")]
+        return {
+            "entries": len(entries),
+            "size_bytes": sum(self._entry_size(d) for d in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# For quick inspection
+if __name__ == "__main__":
+    cache = ConversionCache()
+    print(json.dumps(cache.get_stats(), indent=2))
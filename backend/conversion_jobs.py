@@ -0,0 +1,369 @@
+"""
+Background conversion jobs
+Runs Docling conversion in a bounded process pool so the event loop stays free
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from config import ProcessingConfig
+
+
+# How long a warmed-up worker waits for the rest of the pool before giving up
+WARM_UP_BARRIER_TIMEOUT = 600
+
+# Worker process state (set by _init_worker in each pool process)
+_progress_queue = None
+_warm_up_barrier = None
+
+
+def _init_worker(progress_queue, warm_up_barrier):
+    """Set up a worker process (Docling models load lazily or via warm_up_worker)"""
+    global _progress_queue, _warm_up_barrier
+    _progress_queue = progress_queue
+    _warm_up_barrier = warm_up_barrier
+
+
+def _report(job_id: str, stage: str, progress: int):
+    """Send a progress update back to the parent process"""
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, stage, progress))
+
+
+def warm_up_worker() -> Dict[str, Any]:
+    """Load the worker's converter pool ahead of the first upload"""
+    from converter_pool import get_converter_pool
+
+    pool = get_converter_pool()
+    info = {"pid": os.getpid(), "model_load_seconds": pool.warm_up()}
+    # Hold this worker until every worker has a warm-up task, so none of them takes two
+    try:
+        _warm_up_barrier.wait(WARM_UP_BARRIER_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    return info
+
+
+def run_conversion(job_id: str, pdf_path: str) -> Dict[str, Any]:
+    """
+    Convert a PDF inside a worker process
+
+    Returns:
+        dict with pdf_text, pdf_pages, markdown, page_mapping, line_boxes, total_pages and timings
+    """
+    from converter_pool import get_converter_pool
+    from pdf_processor import PDFProcessor
+
+    pool = get_converter_pool()
+    load_seconds_before = pool.model_load_seconds
+
+    _report(job_id, "converting", 5)
+    md_result = pool.convert(pdf_path)
+
+    start = time.perf_counter()
+    pdf_pages = md_result["pdf_pages"]
+    if pdf_pages is None:
+        # No Docling provenance: take page text from pdfplumber (word blocks load lazily per page)
+        _report(job_id, "extracting_pages", 70)
+        processor = PDFProcessor(pdf_path, include_blocks=False)
+        pdf_pages = processor.extract_pages()
+    pdf_text = "".join(page["text"] + "\n" for page in pdf_pages)
+    page_extraction_seconds = time.perf_counter() - start
+
+    _report(job_id, "finalizing", 95)
+    return {
+        "pdf_text": pdf_text,
+        "pdf_pages": pdf_pages,
+        "markdown": md_result["markdown"],
+        "page_mapping": md_result["page_mapping"],
+        "line_boxes": md_result["line_boxes"],
+        "total_pages": md_result["total_pages"],
+        "timings": {
+            "pid": os.getpid(),
+            "model_load_seconds": pool.model_load_seconds - load_seconds_before,
+            "conversion_seconds": md_result["conversion_seconds"],
+            "page_extraction_seconds": page_extraction_seconds
+        }
+    }
+
+
+class QueueFullError(Exception):
+    """Raised when too many conversion jobs are already pending"""
+
+
+class ConversionJobManager:
+    """Track conversion jobs running in a bounded ProcessPoolExecutor"""
+
+    def __init__(self, max_workers: int = None, max_pending: int = None,
+                 on_change: Callable[[str, Dict[str, Any]], None] = None):
+        """
+        Args:
+            max_workers: Worker processes in the pool
+            max_pending: Most jobs queued or running at once
+            on_change: Called with (owner, job snapshot) whenever a job that has an owner changes,
+                e.g. to publish its status where other server workers can read it
+        """
+        self.max_workers = max_workers or ProcessingConfig.CONVERSION_WORKERS
+        self.max_pending = max_pending or ProcessingConfig.CONVERSION_MAX_PENDING
+        self.on_change = on_change
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._owners: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._progress_queue = None
+        self._listener: Optional[threading.Thread] = None
+        self.metrics = {
+            "model_loads": 0,
+            "model_load_seconds_total": 0.0,
+            "conversions": 0,
+            "conversion_seconds_total": 0.0,
+            "page_extraction_seconds_total": 0.0,
+            "last_conversion_seconds": None
+        }
+
+    def start(self):
+        """Start the worker pool (idempotent)"""
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self) -> ProcessPoolExecutor:
+        """Get the worker pool, starting it if needed (caller holds the lock)"""
+        if self._executor is not None:
+            return self._executor
+        # Docling/torch are not fork-safe, always spawn fresh workers
+        ctx = multiprocessing.get_context("spawn")
+        self._progress_queue = ctx.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, ctx.Barrier(self.max_workers))
+        )
+        self._listener = threading.Thread(target=self._listen_progress, args=(self._progress_queue,), daemon=True)
+        self._listener.start()
+        print(f"⚙️ Conversion pool started with {self.max_workers} worker(s)")
+        return self._executor
+
+    def _submit(self, fn, *args) -> Tuple[ProcessPoolExecutor, Future]:
+        """
+        Submit a task to the worker pool, starting it if needed
+
+        Submitting under the lock keeps a concurrent shutdown from swapping the pool out
+        in between. Returns the pool the task went to along with its future.
+        """
+        with self._lock:
+            executor = self._start_locked()
+            return executor, executor.submit(fn, *args)
+
+    def warm_up(self):
+        """
+        Start the pool and load Docling models in every worker
+
+        Each worker waits at a barrier after loading until all max_workers warm-up
+        tasks are taken, so every worker process loads its models exactly once.
+        Returns immediately; model-load times are recorded in metrics as workers finish.
+        """
+        for _ in range(self.max_workers):
+            _executor, future = self._submit(warm_up_worker)
+            future.add_done_callback(self._record_warm_up)
+
+    def _record_warm_up(self, future):
+        try:
+            info = future.result()
+        except Exception as e:
+            print(f"⚠️ Conversion worker warm-up failed: {e}")
+            return
+        with self._lock:
+            if info["model_load_seconds"] > 0:
+                self.metrics["model_loads"] += 1
+                self.metrics["model_load_seconds_total"] += info["model_load_seconds"]
+        print(f"🔥 Worker {info['pid']} warm ({info['model_load_seconds']:.2f}s model load)")
+
+    def _record_timings(self, timings: Dict[str, Any]):
+        with self._lock:
+            if timings["model_load_seconds"] > 0:
+                self.metrics["model_loads"] += 1
+                self.metrics["model_load_seconds_total"] += timings["model_load_seconds"]
+            self.metrics["conversions"] += 1
+            self.metrics["conversion_seconds_total"] += timings["conversion_seconds"]
+            self.metrics["page_extraction_seconds_total"] += timings["page_extraction_seconds"]
+            self.metrics["last_conversion_seconds"] = timings["conversion_seconds"]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get aggregated model-load and conversion timings across workers"""
+        with self._lock:
+            metrics = dict(self.metrics)
+        conversions = metrics["conversions"]
+        metrics["avg_conversion_seconds"] = (
+            metrics["conversion_seconds_total"] / conversions if conversions else None
+        )
+        metrics["avg_model_load_seconds"] = (
+            metrics["model_load_seconds_total"] / metrics["model_loads"] if metrics["model_loads"] else None
+        )
+        metrics["workers"] = self.max_workers
+        return metrics
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            self._discard(executor)
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Stop a pool, unless it was already replaced (the next submit starts a fresh one)"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            progress_queue = self._progress_queue
+        executor.shutdown(wait=False, cancel_futures=True)
+        if progress_queue is not None:
+            progress_queue.put(None)
+
+    def _listen_progress(self, progress_queue):
+        """Apply progress updates reported by worker processes"""
+        while True:
+            update = progress_queue.get()
+            if update is None:
+                break
+            job_id, stage, progress = update
+            self._update(job_id, status="running", stage=stage, progress=progress)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] in ("completed", "failed"):
+                return
+            if fields.get("status") == "running" and job["started_at"] is None:
+                job["started_at"] = time.time()
+            job.update(fields)
+        self._changed(job_id)
+
+    def _changed(self, job_id: str):
+        """Report a job's new state to on_change"""
+        with self._lock:
+            owner = self._owners.get(job_id)
+            job = dict(self.jobs[job_id]) if job_id in self.jobs else None
+        if self.on_change and owner and job:
+            self.on_change(owner, job)
+
+    def _new_job(self, filename: str, owner: str = None) -> Dict[str, Any]:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "filename": filename,
+            "status": "queued",
+            "stage": "queued",
+            "progress": 0,
+            "error": None,
+            "result": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None
+        }
+        with self._lock:
+            self._prune()
+            self.jobs[job["job_id"]] = job
+            if owner:
+                self._owners[job["job_id"]] = owner
+        self._changed(job["job_id"])
+        return job
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period (caller holds the lock)"""
+        cutoff = time.time() - ProcessingConfig.JOB_RETENTION_SECONDS
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job["finished_at"] is not None and job["finished_at"] < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+            self._owners.pop(job_id, None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        """Mark a job as completed with a response summary"""
+        with self._lock:
+            job = self.jobs[job_id]
+            job.update(status="completed", stage="completed", progress=100,
+                       result=result, finished_at=time.time())
+        self._changed(job_id)
+
+    def fail(self, job_id: str, error: str):
+        """Mark a job as failed"""
+        with self._lock:
+            job = self.jobs[job_id]
+            job.update(status="failed", stage="failed", error=error, finished_at=time.time())
+        self._changed(job_id)
+
+    def create_completed(self, filename: str, result: Dict[str, Any], owner: str = None) -> Dict[str, Any]:
+        """Record a job that finished without conversion (e.g. a cache hit)"""
+        job = self._new_job(filename, owner)
+        self.complete(job["job_id"], result)
+        return self.get(job["job_id"])
+
+    def submit(self, filename: str, pdf_path: str,
+               on_complete: Callable[[str, Dict[str, Any]], Dict[str, Any]], owner: str = None) -> Dict[str, Any]:
+        """
+        Queue a PDF for conversion
+
+        on_complete(job_id, conversion) runs in a background thread when the worker
+        finishes and returns the summary stored as the job result. owner (e.g. a
+        session id) is passed to on_change with every status update.
+
+        Raises:
+            QueueFullError: if max_pending jobs are already queued or running
+        """
+        if self.pending_count() >= self.max_pending:
+            raise QueueFullError(f"Too many conversions in progress ({self.max_pending}), try again later")
+
+        job = self._new_job(filename, owner)
+        job_id = job["job_id"]
+        try:
+            executor, future = self._submit(run_conversion, job_id, pdf_path)
+        except Exception as e:
+            self.fail(job_id, str(e))
+            raise
+
+        def _done(fut):
+            try:
+                conversion = fut.result()
+                self._record_timings(conversion.pop("timings"))
+                summary = on_complete(job_id, conversion)
+                self.complete(job_id, summary)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory); start a fresh pool for the next job
+                print(f"❌ Conversion pool broken while running job {job_id[:8]}: {e}")
+                self.fail(job_id, "Conversion worker crashed")
+                self._discard(executor)
+            except Exception as e:
+                print(f"❌ Conversion job {job_id[:8]} failed: {e}")
+                self.fail(job_id, str(e))
+
+        future.add_done_callback(_done)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a snapshot of a job's status"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def owner_of(self, job_id: str) -> Optional[str]:
+        """Get the owner a job was submitted with"""
+        with self._lock:
+            return self._owners.get(job_id)
+
+    def list_jobs(self, owner: str = None) -> list:
+        """Get snapshots of all jobs (or only those of owner), newest first"""
+        with self._lock:
+            jobs = [dict(job) for job_id, job in self.jobs.items()
+                    if owner is None or self._owners.get(job_id) == owner]
+        return sorted(jobs, key=lambda j: j["created_at"], reverse=True)
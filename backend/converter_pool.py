@@ -0,0 +1,116 @@
+"""
+Process-wide pool of warm Docling converters
+Model loading happens once per converter instead of once per upload. Conversion
+worker processes run one conversion at a time, so each keeps a single converter.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class ConverterPool:
+    """Lazily initialised pool of MarkdownConverter instances"""
+
+    WAIT_SECONDS = 1.0
+
+    def __init__(self, size: int = 1):
+        """
+        Args:
+            size: Most converters loaded at once. More than one only helps when several
+                threads of this process convert at the same time.
+        """
+        self.size = max(1, size)
+        self._available: "queue.Queue" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.model_load_seconds = 0.0
+
+    def _create_converter(self):
+        from markdown_converter import MarkdownConverter
+
+        start = time.perf_counter()
+        converter = MarkdownConverter()
+        converter.warm_up()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.model_load_seconds += elapsed
+        print(f"🔥 Loaded Docling converter in {elapsed:.2f}s")
+        return converter
+
+    def _fill_reserved_slot(self):
+        """Create a converter for a slot already counted in _created, giving the slot back if loading fails"""
+        try:
+            return self._create_converter()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def warm_up(self) -> float:
+        """
+        Create every converter in the pool now instead of on first use
+
+        Returns:
+            seconds spent loading models
+        """
+        start = time.perf_counter()
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            self._available.put(self._fill_reserved_slot())
+        return time.perf_counter() - start
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a converter, creating one if the pool is not full yet"""
+        converter = None
+        while converter is None:
+            try:
+                converter = self._available.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                converter = self._fill_reserved_slot()
+            else:
+                # Wake up now and then in case a failed model load freed a slot
+                try:
+                    converter = self._available.get(timeout=self.WAIT_SECONDS)
+                except queue.Empty:
+                    pass
+
+        try:
+            yield converter
+        finally:
+            self._available.put(converter)
+
+    def convert(self, pdf_path: str) -> Dict[str, Any]:
+        """Convert a PDF with a pooled converter, recording the conversion time"""
+        with self.acquire() as converter:
+            start = time.perf_counter()
+            result = converter.convert_pdf_to_markdown(pdf_path)
+            result["conversion_seconds"] = time.perf_counter() - start
+        return result
+
+
+_pool: Optional[ConverterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_converter_pool() -> ConverterPool:
+    """Get the process-wide converter pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConverterPool()
+        return _pool
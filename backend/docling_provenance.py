@@ -0,0 +1,176 @@
+"""
+Markdown rendering with Docling provenance
+Walks the document items once, emitting markdown lines together with the page
+and bounding box each line came from
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from page_mapping import PageMap
+
+# Items Docling leaves out of its markdown export
+SKIPPED_LABELS = {"page_header", "page_footer"}
+
+
+class LineBoxes:
+    """Bounding box of each markdown line on its PDF page ([x0, top, x1, bottom], top-left origin, points)"""
+
+    def __init__(self, boxes: Dict[int, List[float]] = None):
+        self.boxes: Dict[int, List[float]] = boxes or {}
+
+    def get(self, line_num: int) -> Optional[List[float]]:
+        """Box of a line, or None when the line has no provenance"""
+        return self.boxes.get(line_num)
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def to_wire(self) -> Dict[str, Any]:
+        """Compact JSON form: parallel line and box lists"""
+        lines = sorted(self.boxes)
+        return {"lines": lines, "boxes": [self.boxes[line] for line in lines]}
+
+    @classmethod
+    def from_wire(cls, data: Optional[Dict[str, Any]]) -> "LineBoxes":
+        """Build from to_wire() output"""
+        if not data:
+            return cls()
+        if isinstance(data, LineBoxes):
+            return data
+        return cls(dict(zip(data["lines"], data["boxes"])))
+
+
+def _label(item) -> str:
+    label = getattr(item, "label", "")
+    return str(getattr(label, "value", label))
+
+
+def _page_height(doc, page_no: int) -> Optional[float]:
+    page = doc.pages.get(page_no) if isinstance(doc.pages, dict) else None
+    size = getattr(page, "size", None)
+    return getattr(size, "height", None)
+
+
+def _to_top_left(bbox, page_height: Optional[float]) -> Optional[List[float]]:
+    """Convert a Docling BoundingBox to [x0, top, x1, bottom] with a top-left origin"""
+    if bbox is None:
+        return None
+    top, bottom = bbox.t, bbox.b
+    if "BOTTOM" in str(getattr(bbox, "coord_origin", "")).upper():
+        if page_height is None:
+            return None
+        top, bottom = page_height - top, page_height - bottom
+    return [round(float(v), 3) for v in (bbox.l, min(top, bottom), bbox.r, max(top, bottom))]
+
+
+def _union(boxes: List[List[float]]) -> Optional[List[float]]:
+    if not boxes:
+        return None
+    return [min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes)]
+
+
+def _table_lines(item, doc, page_height: Optional[float], item_box: Optional[List[float]]) -> List[Tuple[str, Optional[List[float]]]]:
+    """Render a table item, giving each markdown row the box of its table row when cells carry boxes"""
+    try:
+        markdown = item.export_to_markdown(doc=doc)
+    except TypeError:
+        markdown = item.export_to_markdown()
+    lines = markdown.split('\n')
+
+    row_boxes: Dict[int, List[List[float]]] = {}
+    for cell in getattr(getattr(item, "data", None), "table_cells", None) or []:
+        box = _to_top_left(getattr(cell, "bbox", None), page_height)
+        if box:
+            row_boxes.setdefault(cell.start_row_offset_idx, []).append(box)
+
+    rendered = []
+    for i, line in enumerate(lines):
+        # Line 0 is the header row, line 1 the separator, line i >= 2 is table row i - 1
+        row = 0 if i == 0 else i - 1
+        box = _union(row_boxes.get(row, [])) if i != 1 else None
+        rendered.append((line, box or item_box))
+    return rendered
+
+
+def _item_lines(item, doc, page_height: Optional[float], item_box: Optional[List[float]]) -> List[Tuple[str, Optional[List[float]]]]:
+    """Render one item to markdown lines, each with its box"""
+    label = _label(item)
+    if label == "table":
+        return _table_lines(item, doc, page_height, item_box)
+    if label == "picture":
+        return [("<!-- image -->", item_box)]
+
+    text = (getattr(item, "text", "") or "").strip()
+    if not text:
+        return []
+    if label == "title":
+        text = f"# {text}"
+    elif label == "section_header":
+        text = f"## {text}"
+    elif label == "list_item":
+        text = f"- {text}"
+    elif label == "code":
+        text = f"```\n{text}\n```"
+    return [(line, item_box) for line in text.split('\n')]
+
+
+def render_with_provenance(doc) -> Optional[Tuple[str, PageMap, LineBoxes, List[Dict[str, Any]]]]:
+    """
+    Render a Docling document to markdown in one walk over its items
+
+    Returns:
+        (markdown, page mapping, line boxes, per-page text records) or None when
+        the document has no item provenance to work from
+    """
+    if not hasattr(doc, "iterate_items"):
+        return None
+
+    lines: List[str] = []
+    boundaries: List[Tuple[int, int]] = []
+    boxes: Dict[int, List[float]] = {}
+    page_texts: Dict[int, List[str]] = {}
+    current_page = None
+
+    for item, _level in doc.iterate_items():
+        if _label(item) in SKIPPED_LABELS:
+            continue
+        prov = (getattr(item, "prov", None) or [None])[0]
+        page_no = prov.page_no if prov else current_page
+        if page_no is None:
+            continue
+        page_height = _page_height(doc, page_no)
+        item_lines = _item_lines(item, doc, page_height, _to_top_left(prov.bbox, page_height) if prov else None)
+        if not item_lines:
+            continue
+
+        # Blank line between blocks, as in Docling's own markdown export
+        if lines:
+            lines.append("")
+        if page_no != current_page:
+            boundaries.append((len(lines), page_no))
+            current_page = page_no
+        for text, box in item_lines:
+            if box:
+                boxes[len(lines)] = box
+            lines.append(text)
+        # Tables carry no .text of their own, so their rendered rows stand in
+        if _label(item) == "table":
+            page_texts.setdefault(page_no, []).extend(text for text, _box in item_lines)
+        elif getattr(item, "text", None):
+            page_texts.setdefault(page_no, []).append(item.text)
+
+    if not boundaries:
+        return None
+
+    pdf_pages = []
+    pages = doc.pages if isinstance(doc.pages, dict) else {}
+    for page_no in sorted(pages or page_texts):
+        size = getattr(pages.get(page_no), "size", None)
+        pdf_pages.append({
+            "page_number": page_no,
+            "text": "\n".join(page_texts.get(page_no, [])),
+            "width": getattr(size, "width", None),
+            "height": getattr(size, "height", None)
+        })
+
+    return "\n".join(lines), PageMap.from_boundaries(boundaries, len(lines)), LineBoxes(boxes), pdf_pages
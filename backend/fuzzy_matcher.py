@@ -0,0 +1,66 @@
+"""
+Batch fuzzy matching with RapidFuzz
+Scores a whole parameter list against all candidate lines in one cdist call
+"""
+
+from typing import List, Tuple, Callable
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from config import ProcessingConfig
+
+
+class BatchFuzzyMatcher:
+    """Score many queries against a fixed set of choices and keep the top-k per query"""
+
+    def __init__(self, choices: List[str], scorer: Callable = fuzz.partial_ratio, workers: int = None):
+        """
+        Args:
+            choices: Candidate strings (already normalised, e.g. lowercased)
+            scorer: RapidFuzz scorer returning 0-100
+            workers: Threads used by cdist (-1 = all cores); defaults to FUZZY_WORKERS
+        """
+        self.choices = choices
+        self.scorer = scorer
+        self.workers = ProcessingConfig.FUZZY_WORKERS if workers is None else workers
+
+    def top_k(self, queries: List[str], k: int = 5, threshold: int = 0,
+              score_cap: int = None) -> List[List[Tuple[int, int]]]:
+        """
+        Find the best choices for every query
+
+        Scores are rounded to integers (as fuzzywuzzy reported them) before the
+        threshold is applied; ties keep choice order. With score_cap, scores above
+        it are lowered to it before ranking, so every choice at the cap ties.
+
+        Returns:
+            per query, a list of (choice_index, score) sorted by score descending
+        """
+        if not queries:
+            return []
+        if not self.choices:
+            return [[] for _ in queries]
+
+        scores = process.cdist(
+            queries,
+            self.choices,
+            scorer=self.scorer,
+            dtype=np.float32,
+            workers=self.workers,
+            score_cutoff=max(0.0, threshold - 0.5)
+        )
+        scores = np.rint(scores).astype(np.int32)
+        if score_cap is not None:
+            np.minimum(scores, score_cap, out=scores)
+
+        results = []
+        for row in scores:
+            candidates = np.nonzero(row >= threshold)[0] if threshold > 0 else np.arange(len(row))
+            if len(candidates) > k:
+                # Keep everything tied with the k-th best score so order stays stable
+                kth_score = np.partition(row[candidates], len(candidates) - k)[len(candidates) - k]
+                candidates = candidates[row[candidates] >= kth_score]
+            order = candidates[np.argsort(-row[candidates], kind="stable")][:k]
+            results.append([(int(i), int(row[i])) for i in order])
+        return results
@@ -0,0 +1,104 @@
+"""
+Incremental parsing of streamed JSON answers
+Yields each object of a JSON array as soon as its closing brace arrives, so
+streamed model output can be used before the whole answer is complete
+"""
+
+import json
+from typing import List, Dict, Any, Optional
+
+
+class JSONArrayStream:
+    """
+    Collects the objects of one array from JSON text fed in pieces
+
+    Accepts {"<key>": [{...}, ...], ...} (the array under key) or a bare top-level
+    array [{...}, ...]. Each object is decoded once, when it is complete.
+    """
+
+    def __init__(self, key: str = "parameters"):
+        self.key = key
+        self.text = ""
+        self.position = 0
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = -1
+        self.last_key: Optional[str] = None
+        self.array_depth = -1     # stack depth inside the wanted array
+        self.object_start = -1
+        self.items: List[Dict[str, Any]] = []
+
+    def feed(self, piece: str) -> List[Dict[str, Any]]:
+        """
+        Add streamed text
+
+        Returns:
+            The array objects completed by this piece, in order
+        """
+        self.text += piece
+        completed: List[Dict[str, Any]] = []
+        text = self.text
+        for index in range(self.position, len(text)):
+            char = text[index]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if len(self.stack) == 1 and self.stack[0] == '{':
+                        self.last_key = text[self.string_start + 1:index]
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = index
+            elif char in '{[':
+                if char == '[' and self.array_depth < 0 and (
+                    not self.stack or (self.stack == ['{'] and self.last_key == self.key)
+                ):
+                    self.array_depth = len(self.stack) + 1
+                elif char == '{' and self.stack and len(self.stack) == self.array_depth and self.stack[-1] == '[':
+                    self.object_start = index
+                self.stack.append(char)
+            elif char in '}]':
+                if self.stack:
+                    self.stack.pop()
+                if char == '}' and self.object_start >= 0 and len(self.stack) == self.array_depth:
+                    try:
+                        item = json.loads(text[self.object_start:index + 1])
+                    except ValueError:
+                        item = None
+                    if isinstance(item, dict):
+                        completed.append(item)
+                    self.object_start = -1
+                elif char == ']' and len(self.stack) == self.array_depth - 1:
+                    # The wanted array is closed; later arrays are ignored
+                    self.array_depth = 0
+        self.position = len(text)
+        self.items.extend(completed)
+        return completed
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Finish the stream
+
+        Returns:
+            Array objects that incremental parsing could not deliver (when the
+            complete text parses as JSON but was not shaped as expected), else []
+        """
+        if self.items:
+            return []
+        try:
+            result = json.loads(self.text)
+        except ValueError:
+            return []
+        if isinstance(result, dict):
+            result = result.get(self.key, [])
+        if not isinstance(result, list):
+            return []
+        items = [item for item in result if isinstance(item, dict)]
+        self.items.extend(items)
+        return items
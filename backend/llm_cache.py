@@ -0,0 +1,109 @@
+"""
+Persistent cache of LLM extraction responses
+Stores each parameter's answer for a markdown chunk in SQLite, keyed by the chunk
+content, parameter name, model, temperature and prompt version, so repeated AI
+extractions only send the (chunk, parameter) pairs that changed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any
+
+from config import APIConfig
+
+
+class LLMResponseCache:
+    """SQLite-backed per-parameter response cache, safe to share between threads and server workers"""
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        """
+        Args:
+            path: SQLite database file
+            max_entries: Oldest entries beyond this count are deleted on write
+        """
+        self.path = path or APIConfig.AI_CACHE_PATH
+        self.max_entries = max_entries or APIConfig.AI_CACHE_MAX_ENTRIES
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # WAL lets several uvicorn workers read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def chunk_hash(text: str) -> str:
+        """SHA-256 of a markdown chunk (computed once per chunk, shared by its parameter keys)"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(chunk_hash: str, parameter: str, model: str, temperature: float, prompt_version: int) -> str:
+        """Cache key of one parameter's answer for one chunk"""
+        key_material = json.dumps([chunk_hash, parameter, model, temperature, prompt_version])
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several keys at once; returns {key: response} for the hits"""
+        found: Dict[str, Dict[str, Any]] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, response FROM responses WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, response in rows:
+                    found[key] = json.loads(response)
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, responses: Dict[str, Dict[str, Any]]) -> None:
+        """Store responses and trim the oldest entries over max_entries"""
+        if not responses:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                [(key, json.dumps(response), now) for key, response in responses.items()]
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get entry count and hit/miss counters of this process"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# For quick inspection
+if __name__ == "__main__":
+    print(json.dumps(LLMResponseCache().get_stats(), indent=2))
@@ -1,24 +1,43 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 import os
 import json
 import shutil
+from contextlib import aclosing, asynccontextmanager
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import pandas as pd
 
-from pdf_processor import PDFProcessor
 from parameter_extractor import ParameterExtractor
 from markdown_converter import MarkdownConverter
 from markdown_parameter_extractor import MarkdownParameterExtractor
+from ai_client import AIClientPool
 from openai_extractor import OpenAIExtractor
 from vision_extractor import VisionExtractor
-from config import APIConfig
-import dev_cache
+from config import APIConfig, ProcessingConfig
+from conversion_cache import ConversionCache
+from conversion_jobs import ConversionJobManager, QueueFullError
+from docling_provenance import LineBoxes
+from llm_cache import LLMResponseCache
+from page_blocks import LazyPageBlocks
+from page_mapping import PageMap
+from session_store import SessionStore, SessionNotFoundError
+from upload_storage import UploadTooLargeError, check_content_length, save_upload
 
-app = FastAPI(title="Engineering Parameter Extraction Tool")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up Docling workers at startup; stop them and close AI connections at shutdown"""
+    if ProcessingConfig.WARM_UP_ON_STARTUP:
+        conversion_jobs.warm_up()
+    yield
+    conversion_jobs.shutdown()
+    await ai_clients.aclose()
+
+
+app = FastAPI(title="Engineering Parameter Extraction Tool", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -33,16 +52,38 @@ app.add_middleware(
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# Global storage for current session
-session_data = {
-    "parameters": [],
-    "pdf_path": None,
-    "pdf_text": None,
-    "pdf_pages": [],
-    "markdown": None,
-    "page_mapping": {},
-    "total_pages": 0
-}
+# Content-addressed cache of conversion results
+conversion_cache = ConversionCache()
+
+# Per-parameter cache of AI extraction responses
+llm_cache = LLMResponseCache() if APIConfig.AI_CACHE_ENABLED else None
+
+# Kept-alive AI provider connections shared by all requests
+ai_clients = AIClientPool()
+
+
+def _session_dir(session_id: str) -> Path:
+    """Upload directory of a session (removed when the session expires)"""
+    return UPLOAD_DIR / session_id
+
+
+# Per-user document state, keyed by the X-Session-ID header
+sessions = SessionStore(on_evict=lambda session_id: shutil.rmtree(_session_dir(session_id), ignore_errors=True))
+
+
+def _get_session(session_id: Optional[str]) -> Dict[str, Any]:
+    """Get a session's state or fail the request with 404"""
+    try:
+        return sessions.get(session_id)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# Background Docling conversion in a bounded process pool. Job status is also kept in
+# the owning session, so workers that did not run the job can answer status polls.
+conversion_jobs = ConversionJobManager(
+    on_change=lambda session_id, job: sessions.update(session_id, conversion_job=job)
+)
 
 
 @app.get("/")
@@ -70,143 +111,266 @@ async def get_config():
         }
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Get conversion timing and cache metrics"""
+    return {
+        "success": True,
+        "conversion": conversion_jobs.get_metrics(),
+        "cache": conversion_cache.get_stats(),
+        "llm_cache": llm_cache.get_stats() if llm_cache else None,
+        "sessions": sessions.get_stats()
+    }
+
+
+@app.post("/api/sessions")
+async def create_session():
+    """Start a session; send its id as the X-Session-ID header on later requests"""
+    return {"success": True, "session_id": sessions.create()}
+
+
+@app.delete("/api/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """End a session and free its document state"""
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"success": True}
+
+
+def _parse_aliases(value: Any) -> List[str]:
+    """Normalise an aliases cell/field (list, or ';'-separated string) to a list of names"""
+    if isinstance(value, list):
+        names = value
+    elif isinstance(value, str):
+        names = value.split(';')
+    else:
+        return []
+    return [str(name).strip() for name in names if name and str(name).strip()]
+
+
 @app.post("/api/upload-parameters")
-async def upload_parameters(file: UploadFile = File(...)):
-    """Upload and parse parameter list file (CSV, Excel, JSON)"""
+async def upload_parameters(file: UploadFile = File(...), x_session_id: Optional[str] = Header(None),
+                            content_length: Optional[str] = Header(None)):
+    """Upload and parse parameter list file (CSV, Excel, JSON); starts a session if none is given"""
     try:
-        # Save uploaded file
-        file_path = UPLOAD_DIR / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        check_content_length(content_length, ProcessingConfig.MAX_PARAMETER_FILE_BYTES)
+        session_id, _ = sessions.get_or_create(x_session_id)
+        file_ext = file.filename.lower().split('.')[-1]
+        if file_ext not in ('csv', 'xlsx', 'xls', 'json'):
+            raise HTTPException(status_code=400, detail="Unsupported file format")
+        
+        # Stream the upload to a uniquely named file in the session's directory
+        stored = await save_upload(file, _session_dir(session_id), ProcessingConfig.MAX_PARAMETER_FILE_BYTES,
+                                   suffix=f".{file_ext}", content_addressed=False)
+        file_path = stored.path
         
         # Parse file based on extension
-        file_ext = file.filename.lower().split('.')[-1]
         parameters = []
+        aliases = {}
         
-        if file_ext == 'csv':
-            df = pd.read_csv(file_path)
-            # Assume first column contains parameter names
-            parameters = df.iloc[:, 0].tolist()
-        elif file_ext in ['xlsx', 'xls']:
-            df = pd.read_excel(file_path)
+        if file_ext in ['csv', 'xlsx', 'xls']:
+            df = pd.read_csv(file_path) if file_ext == 'csv' else pd.read_excel(file_path)
+            # Assume first column contains parameter names, an optional "aliases" column lists alternatives
             parameters = df.iloc[:, 0].tolist()
+            alias_columns = [c for c in df.columns if str(c).strip().lower() == 'aliases']
+            if alias_columns:
+                for name, value in zip(parameters, df[alias_columns[0]].tolist()):
+                    aliases[str(name).strip()] = _parse_aliases(value)
         elif file_ext == 'json':
             with open(file_path, 'r') as f:
                 data = json.load(f)
-                if isinstance(data, list):
-                    # Handle list of strings or list of dicts with 'name' field
-                    parameters = [p if isinstance(p, str) else p.get('name', str(p)) for p in data]
-                elif isinstance(data, dict) and 'parameters' in data:
-                    param_list = data['parameters']
-                    # Handle list of strings or list of dicts with 'name' field
+                param_list = data['parameters'] if isinstance(data, dict) and 'parameters' in data else data
+                if isinstance(param_list, list):
+                    # Handle list of strings or list of dicts with 'name' (and optional 'aliases') fields
                     parameters = [p if isinstance(p, str) else p.get('name', str(p)) for p in param_list]
+                    for p in param_list:
+                        if isinstance(p, dict) and p.get('aliases'):
+                            aliases[str(p.get('name', p)).strip()] = _parse_aliases(p['aliases'])
+                else:
+                    parameters = []
         else:
             raise HTTPException(status_code=400, detail="Unsupported file format")
         
         # Clean parameters
         parameters = [str(p).strip() for p in parameters if p and str(p).strip()]
+        aliases = {name: names for name, names in aliases.items() if name in parameters and names}
         
         # Store in session
-        session_data["parameters"] = parameters
+        sessions.update(session_id, parameters=parameters, aliases=aliases)
         
         # Clean up file
         os.remove(file_path)
         
         return {
             "success": True,
+            "session_id": session_id,
             "parameters": parameters,
             "count": len(parameters)
         }
     
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _store_conversion(session_id: str, pdf_path: str, filename: str, conversion: Dict[str, Any],
+                      cached: bool) -> Dict[str, Any]:
+    """Store a conversion result in the session and build the upload summary"""
+    stored = sessions.update(
+        session_id,
+        pdf_path=pdf_path,
+        pdf_text=conversion["pdf_text"],
+        pdf_pages=conversion["pdf_pages"],
+        page_blocks=LazyPageBlocks(pdf_path),
+        markdown=conversion["markdown"],
+        page_mapping=PageMap.from_wire(conversion["page_mapping"]),
+        line_boxes=LineBoxes.from_wire(conversion.get("line_boxes")),
+        total_pages=conversion["total_pages"]
+    )
+    if not stored:
+        print(f"⚠️ Session {session_id[:8]} expired before {filename} finished converting")
+    
+    return {
+        "session_id": session_id,
+        "filename": filename,
+        "pages": len(conversion["pdf_pages"]),
+        "pdf_url": f"/api/pdf/{session_id}/{Path(pdf_path).name}",
+        "markdown_length": len(conversion["markdown"]),
+        "has_markdown": True,
+        "cached": cached
+    }
+
+
 @app.post("/api/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
-    """Upload PDF datasheet"""
+async def upload_pdf(file: UploadFile = File(...), x_session_id: Optional[str] = Header(None),
+                     content_length: Optional[str] = Header(None)):
+    """
+    Upload PDF datasheet (starts a session if none is given)
+    
+    Returns a conversion job immediately; poll /api/jobs/{job_id} until it completes.
+    """
     try:
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        # DEVELOPMENT MODE: Use cached data to skip slow conversion
-        if dev_cache.DEV_MODE and dev_cache.is_cache_available():
-            print("🚀 DEV MODE: Using cached PDF and markdown")
-            
-            # Load from cache
-            cached_pdf_path, markdown, page_mapping, total_pages = dev_cache.load_from_cache()
-            
-            # Process cached PDF for highlighting
-            processor = PDFProcessor(cached_pdf_path)
-            pdf_text = processor.extract_text()
-            pdf_pages = processor.extract_pages()
-            
-            # Store in session
-            session_data["pdf_path"] = cached_pdf_path
-            session_data["pdf_text"] = pdf_text
-            session_data["pdf_pages"] = pdf_pages
-            session_data["markdown"] = markdown
-            session_data["page_mapping"] = page_mapping
-            session_data["total_pages"] = total_pages
-            
-            return {
-                "success": True,
-                "filename": Path(cached_pdf_path).name,
-                "pages": len(pdf_pages),
-                "pdf_url": f"/api/pdf/{Path(cached_pdf_path).name}",
-                "markdown_length": len(markdown),
-                "has_markdown": True,
-                "dev_mode": True
-            }
-        
-        # PRODUCTION MODE: Normal processing
-        # Save PDF file
-        pdf_path = UPLOAD_DIR / file.filename
-        with open(pdf_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        check_content_length(content_length, ProcessingConfig.MAX_UPLOAD_BYTES)
+        session_id, _ = sessions.get_or_create(x_session_id)
+        filename = Path(file.filename).name
         
-        # Process PDF with both methods
-        # 1. Original PDF processing (for highlighting)
-        processor = PDFProcessor(str(pdf_path))
-        pdf_text = processor.extract_text()
-        pdf_pages = processor.extract_pages()
+        # Stream the PDF into the session's directory under its SHA-256, hashing as it is written
+        stored = await save_upload(file, _session_dir(session_id), ProcessingConfig.MAX_UPLOAD_BYTES, suffix=".pdf")
+        pdf_path = stored.path
         
-        # 2. Docling markdown conversion (for better search)
-        print("⏳ Converting PDF to markdown with Docling...")
-        md_converter = MarkdownConverter()
-        md_result = md_converter.convert_pdf_to_markdown(str(pdf_path))
+        # Check the conversion cache (keyed by PDF content, not filename)
+        cache_key = None
+        cached = None
+        if ProcessingConfig.CACHE_ENABLED:
+            cache_key = conversion_cache.make_key(stored.sha256, MarkdownConverter.cache_options())
+            cached = await run_in_threadpool(conversion_cache.get, cache_key)
         
-        # Save to cache for future dev use
-        if dev_cache.DEV_MODE:
-            print("💾 Saving to cache for future dev use...")
-            dev_cache.save_to_cache(str(pdf_path), md_result["markdown"], md_result["page_mapping"])
-        
-        # Store in session
-        session_data["pdf_path"] = str(pdf_path)
-        session_data["pdf_text"] = pdf_text
-        session_data["pdf_pages"] = pdf_pages
-        session_data["markdown"] = md_result["markdown"]
-        session_data["page_mapping"] = md_result["page_mapping"]
-        session_data["total_pages"] = md_result["total_pages"]
+        if cached:
+            print(f"📦 Cache hit for {filename}, skipping conversion")
+            cached["pdf_text"] = "".join(page["text"] + "\n" for page in cached["pdf_pages"])
+            summary = _store_conversion(session_id, str(pdf_path), filename, cached, cached=True)
+            job = conversion_jobs.create_completed(filename, summary, owner=session_id)
+        else:
+            def on_complete(job_id: str, conversion: Dict[str, Any]) -> Dict[str, Any]:
+                # Runs in a background thread once the worker process finishes
+                if cache_key:
+                    conversion_cache.put(cache_key, conversion["markdown"], conversion["page_mapping"],
+                                         conversion["pdf_pages"], conversion["total_pages"],
+                                         LineBoxes.from_wire(conversion.get("line_boxes")))
+                return _store_conversion(session_id, str(pdf_path), filename, conversion, cached=False)
+            
+            print(f"⏳ Queued {filename} for Docling conversion...")
+            job = conversion_jobs.submit(filename, str(pdf_path), on_complete, owner=session_id)
         
         return {
             "success": True,
-            "filename": file.filename,
-            "pages": len(pdf_pages),
-            "pdf_url": f"/api/pdf/{file.filename}",
-            "markdown_length": len(md_result["markdown"]),
-            "has_markdown": True,
-            "dev_mode": False
+            "session_id": session_id,
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "result": job["result"]
         }
     
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs")
+async def list_jobs(x_session_id: Optional[str] = Header(None)):
+    """List the session's conversion jobs"""
+    jobs = conversion_jobs.list_jobs(owner=x_session_id) if x_session_id else []
+    return {"success": True, "jobs": jobs}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, x_session_id: Optional[str] = Header(None)):
+    """Get the status and progress of one of the session's conversion jobs"""
+    job = conversion_jobs.get(job_id)
+    if job and conversion_jobs.owner_of(job_id) != x_session_id:
+        # Other sessions' jobs are reported as missing rather than forbidden
+        job = None
+    if not job and x_session_id:
+        # The job may be running in another server worker
+        try:
+            session_job = sessions.get(x_session_id).get("conversion_job")
+        except SessionNotFoundError:
+            session_job = None
+        if session_job and session_job["job_id"] == job_id:
+            job = session_job
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {"success": True, **job}
+
+
+def _extraction_metadata(results: List[Dict[str, Any]], mode: str, session_data: Dict[str, Any],
+                         extractor: Optional[OpenAIExtractor] = None) -> Dict[str, Any]:
+    """Summary counts returned with extraction results"""
+    return {
+        "total_parameters": len(results),
+        "extracted_count": sum(1 for r in results if r["value"] != "NF"),
+        "not_found_count": sum(1 for r in results if r["value"] == "NF"),
+        "extraction_mode": mode,
+        "used_markdown": session_data.get("markdown") is not None,
+        "ai_cache": dict(extractor.last_cache_stats, enabled=llm_cache is not None) if extractor else None,
+        "ai_requests": dict(extractor.last_request_stats) if extractor else None
+    }
+
+def _simple_extractor(session_data: Dict[str, Any]):
+    """Markdown extractor for the session's document, or the PDF text extractor without markdown"""
+    if session_data.get("markdown"):
+        return MarkdownParameterExtractor(
+            session_data["markdown"],
+            session_data["page_mapping"],
+            session_data["pdf_pages"],
+            session_data["page_blocks"],
+            session_data["line_boxes"]
+        )
+    # Fallback to original PDF extractor
+    return ParameterExtractor(
+        session_data["pdf_text"],
+        session_data["pdf_pages"],
+        session_data["page_blocks"]
+    )
+
+
 @app.post("/api/extract")
-async def extract_parameters(request: Dict[str, Any]):
-    """Extract parameters from uploaded PDF using markdown or AI"""
+async def extract_parameters(request: Dict[str, Any], x_session_id: Optional[str] = Header(None)):
+    """Extract parameters from the session's uploaded PDF using markdown or AI"""
     try:
+        session_data = _get_session(x_session_id)
+        
         if not session_data["parameters"]:
             raise HTTPException(status_code=400, detail="No parameters uploaded")
         
@@ -217,50 +381,38 @@ async def extract_parameters(request: Dict[str, Any]):
         mode = request.get("mode", "simple")  # "simple" or "ai"
         
         results = []
+        extractor = None
         
         if mode == "ai":
             # AI-powered extraction using configured provider (OpenAI or OpenRouter)
             try:
-                extractor = OpenAIExtractor()  # Reads from config/.env automatically
-                results = extractor.extract_parameters(
+                extractor = OpenAIExtractor(cache=llm_cache, clients=ai_clients)  # Reads from config/.env automatically
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"API configuration error: {str(e)}. Please check your .env file.")
+            try:
+                # Raises only when every AI request failed; partial failures are counted in the metadata
+                results = await extractor.extract_parameters_async(
                     session_data["markdown"],
                     session_data["parameters"],
-                    session_data.get("page_mapping")
+                    session_data.get("page_mapping"),
+                    session_data.get("aliases")
                 )
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=f"API configuration error: {str(e)}. Please check your .env file.")
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"AI extraction failed: {str(e)}")
         
         else:
-            # Simple search mode (existing logic)
-            if session_data.get("markdown"):
-                extractor = MarkdownParameterExtractor(
-                    session_data["markdown"],
-                    session_data["page_mapping"],
-                    session_data["pdf_pages"]
-                )
-            else:
-                # Fallback to original PDF extractor
-                extractor = ParameterExtractor(
-                    session_data["pdf_text"],
-                    session_data["pdf_pages"]
-                )
+            # Simple search mode: each search tier runs once for the whole parameter list.
+            # Indexing and matching are CPU-bound, so they run off the event loop
+            def simple_extraction() -> List[Dict[str, Any]]:
+                extractor = _simple_extractor(session_data)
+                return extractor.extract_parameters(session_data["parameters"], session_data["aliases"])
             
-            for param_name in session_data["parameters"]:
-                extraction = extractor.extract_parameter(param_name)
-                results.append(extraction)
+            results = await run_in_threadpool(simple_extraction)
         
         return {
             "success": True,
             "results": results,
-            "metadata": {
-                "total_parameters": len(results),
-                "extracted_count": sum(1 for r in results if r["value"] != "NF"),
-                "not_found_count": sum(1 for r in results if r["value"] == "NF"),
-                "extraction_mode": mode,
-                "used_markdown": session_data.get("markdown") is not None
-            }
+            "metadata": _extraction_metadata(results, mode, session_data, extractor)
         }
     
     except HTTPException:
@@ -269,31 +421,105 @@ async def extract_parameters(request: Dict[str, Any]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/pdf/{filename}")
-async def get_pdf(filename: str):
-    """Serve PDF file"""
-    # Check uploads directory first
-    pdf_path = UPLOAD_DIR / filename
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _ndjson(event: str, data: Any) -> str:
+    """Format one newline-delimited JSON record ({"event", "data"})"""
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+@app.post("/api/extract/stream")
+async def extract_parameters_stream(request: Dict[str, Any], x_session_id: Optional[str] = Header(None)):
+    """
+    Stream extraction results as Server-Sent Events, or as NDJSON with "format": "ndjson"
+    
+    Emits a "result" event ({"index", "result"}) for each parameter as soon as it is
+    final, then "done" with the extraction metadata, or "error" ({"detail"}). Results
+    arrive out of order; index is the parameter's position in the uploaded list.
+    """
+    session_data = _get_session(x_session_id)
+    
+    if not session_data["parameters"]:
+        raise HTTPException(status_code=400, detail="No parameters uploaded")
+    
+    if not session_data["pdf_path"]:
+        raise HTTPException(status_code=400, detail="No PDF uploaded")
+    
+    mode = request.get("mode", "simple")  # "simple" or "ai"
+    if request.get("format", "sse") == "ndjson":
+        encode, media_type = _ndjson, "application/x-ndjson"
+    else:
+        encode, media_type = _sse, "text/event-stream"
+    
+    parameters = session_data["parameters"]
+    extractor = None
+    if mode == "ai":
+        try:
+            extractor = OpenAIExtractor(cache=llm_cache, clients=ai_clients)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"API configuration error: {str(e)}. Please check your .env file.")
+    
+    def simple_results():
+        # Runs in a worker thread: building the search index and every tier are CPU-bound
+        yield from _simple_extractor(session_data).iter_parameters(parameters, session_data["aliases"])
+    
+    async def ai_results():
+        positions: Dict[str, List[int]] = {}
+        for index, name in enumerate(parameters):
+            positions.setdefault(name, []).append(index)
+        stream = extractor.stream_parameters(
+            session_data["markdown"],
+            parameters,
+            session_data.get("page_mapping"),
+            session_data.get("aliases")
+        )
+        # aclosing cancels outstanding AI requests when the client disconnects
+        async with aclosing(stream):
+            async for name, result in stream:
+                for index in positions[name]:
+                    yield index, result
+    
+    async def events():
+        results: List[Dict[str, Any]] = [None] * len(parameters)
+        try:
+            async for index, result in (ai_results() if extractor else iterate_in_threadpool(simple_results())):
+                results[index] = result
+                yield encode("result", {"index": index, "result": result})
+        except Exception as e:
+            yield encode("error", {"detail": f"{'AI extraction' if extractor else 'Extraction'} failed: {str(e)}"})
+            return
+        yield encode("done", _extraction_metadata(results, mode, session_data, extractor))
+    
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/pdf/{session_id}/{filename}")
+async def get_pdf(session_id: str, filename: str):
+    """Serve a session's PDF file"""
+    pdf_path = _session_dir(Path(session_id).name) / Path(filename).name
     if pdf_path.exists():
         return FileResponse(pdf_path, media_type="application/pdf")
     
-    # Check dev cache directory
-    cache_pdf_path = dev_cache.CACHE_DIR / filename
-    if cache_pdf_path.exists():
-        return FileResponse(cache_pdf_path, media_type="application/pdf")
-    
     raise HTTPException(status_code=404, detail="PDF not found")
 
 
 @app.get("/api/markdown")
-async def get_markdown():
-    """Get markdown content and page mapping"""
+async def get_markdown(x_session_id: Optional[str] = Header(None)):
+    """Get the session's markdown content and page mapping"""
+    session_data = _get_session(x_session_id)
     if not session_data.get("markdown"):
         raise HTTPException(status_code=404, detail="No markdown available")
     
     return JSONResponse(content={
         "markdown": session_data["markdown"],
-        "page_mapping": session_data["page_mapping"],
+        "page_mapping": session_data["page_mapping"].to_wire(),
         "total_pages": session_data["total_pages"]
     })
 
@@ -337,7 +563,7 @@ async def analyze_graph(file: UploadFile = File(...), prompt: str = Form(None)):
         
         # Initialize vision extractor
         try:
-            extractor = VisionExtractor()
+            extractor = VisionExtractor(clients=ai_clients)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=f"Vision API configuration error: {str(e)}")
         
@@ -347,10 +573,10 @@ async def analyze_graph(file: UploadFile = File(...), prompt: str = Form(None)):
         # Analyze the graph
         if prompt and prompt.strip():
             print(f"✅ Using analyze_graph with user question")
-            result = extractor.analyze_graph(image_data, prompt)
+            result = await extractor.analyze_graph(image_data, prompt)
         else:
             print(f"⚠️ No prompt provided, using extract_equation")
-            result = extractor.extract_equation(image_data)
+            result = await extractor.extract_equation(image_data)
         
         if result["success"]:
             return {
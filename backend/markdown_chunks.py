@@ -0,0 +1,105 @@
+"""
+Section-aware markdown chunking
+Splits a datasheet into chunks of bounded size at heading boundaries, so each AI
+request sees whole sections (and whole tables) instead of a truncated prefix
+"""
+
+from typing import List
+
+
+class MarkdownChunk:
+    """A contiguous run of markdown lines, optionally preceded by repeated table header rows"""
+
+    def __init__(self, lines: List[str], start_line: int, header_lines: int = 0):
+        """
+        Args:
+            lines: Chunk lines, starting with header_lines repeated table header rows
+            start_line: Markdown line number of lines[header_lines]
+            header_lines: Number of repeated header rows at the start of lines
+        """
+        self.lines = lines
+        self.start_line = start_line
+        self.header_lines = header_lines
+        self.text = "\n".join(lines)
+
+    @property
+    def end_line(self) -> int:
+        """Markdown line number after the chunk's last line"""
+        return self.start_line + len(self.lines) - self.header_lines
+
+    def find_line(self, snippet: str) -> int:
+        """
+        Markdown line number of the first line containing snippet (case and whitespace-insensitive)
+
+        Returns:
+            The line number, or -1 when no single line contains the snippet
+        """
+        snippet = " ".join(snippet.lower().split())
+        if not snippet:
+            return -1
+        for offset, line in enumerate(self.lines[self.header_lines:]):
+            if snippet in " ".join(line.lower().split()):
+                return self.start_line + offset
+        return -1
+
+
+def _section_starts(lines: List[str]) -> List[int]:
+    """First line of every section (a section starts at each heading)"""
+    return [0] + [i for i, line in enumerate(lines) if i and line.startswith('#')]
+
+
+def _is_table_row(line: str) -> bool:
+    return line.lstrip().startswith('|')
+
+
+def chunk_markdown(markdown: str, max_chars: int) -> List[MarkdownChunk]:
+    """
+    Pack whole sections into chunks of at most max_chars
+
+    A section larger than max_chars is split between lines; when the split falls
+    inside a table, the next chunk repeats the table's header and separator rows
+    so the model still knows what each column means.
+    """
+    lines = markdown.split('\n')
+    chunks: List[MarkdownChunk] = []
+    current: List[str] = []
+    current_start = 0
+    current_header = 0
+    current_size = 0
+
+    def flush():
+        nonlocal current, current_size, current_header
+        if any(line.strip() for line in current[current_header:]):
+            chunks.append(MarkdownChunk(current, current_start, current_header))
+        current, current_size, current_header = [], 0, 0
+
+    starts = _section_starts(lines)
+    for start, end in zip(starts, starts[1:] + [len(lines)]):
+        # Keep sections whole when they fit next to what is already in the chunk
+        section_size = sum(len(line) + 1 for line in lines[start:end])
+        if current and current_size + section_size > max_chars:
+            flush()
+
+        table_start, table_header = -1, []
+        for line_num in range(start, end):
+            line = lines[line_num]
+            if not _is_table_row(line):
+                table_start, table_header = -1, []
+            elif table_start < 0:
+                table_start, table_header = line_num, [line]
+            elif line_num == table_start + 1:
+                table_header.append(line)
+
+            if len(current) > current_header and current_size + len(line) + 1 > max_chars:
+                flush()
+            if not current:
+                current_start = line_num
+                if table_start >= 0 and line_num >= table_start + len(table_header):
+                    # Continue a split table under its own header rows
+                    current = list(table_header)
+                    current_header = len(table_header)
+                    current_size = sum(len(row) + 1 for row in table_header)
+            current.append(line)
+            current_size += len(line) + 1
+    flush()
+    return chunks
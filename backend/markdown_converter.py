@@ -3,24 +3,43 @@ Markdown Converter using Docling
 Converts PDFs to structured markdown with page number tracking
 """
 
+from docling.datamodel.base_models import InputFormat
 from docling.document_converter import DocumentConverter
 from pathlib import Path
-from typing import Dict, List, Any
-import re
+from typing import Dict, List, Any, Mapping
+
+from docling_provenance import LineBoxes, render_with_provenance
+from page_mapping import LineLocator, PageMap
+from value_extraction import ValueExtractor
 
 
 class MarkdownConverter:
     """Convert PDF to markdown with page tracking using Docling"""
     
+    # Bump when the markdown or page mapping output changes so cached results are invalidated
+    OUTPUT_VERSION = 4
+    
     def __init__(self):
         self.converter = DocumentConverter()
+        self.value_extractor = ValueExtractor("converter")
+        self._value_markdown = None
+    
+    def warm_up(self):
+        """Load the PDF pipeline models now instead of on the first conversion"""
+        self.converter.initialize_pipeline(InputFormat.PDF)
+    
+    @classmethod
+    def cache_options(cls) -> Dict[str, Any]:
+        """Options that affect conversion output (part of the conversion cache key)"""
+        return {"output_version": cls.OUTPUT_VERSION}
     
     def convert_pdf_to_markdown(self, pdf_path: str) -> Dict[str, Any]:
         """
         Convert PDF to markdown with page references
         
         Returns:
-            dict with markdown, page_mapping, and metadata
+            dict with markdown, page_mapping, line_boxes, pdf_pages (per-page text from
+            Docling, None without provenance) and metadata
         """
         print(f"Converting PDF to markdown: {pdf_path}")
         
@@ -28,11 +47,17 @@ class MarkdownConverter:
         result = self.converter.convert(pdf_path)
         doc = result.document
         
-        # Export to markdown
-        markdown = doc.export_to_markdown()
-        
-        # Extract page mapping from document structure
-        page_mapping = self._extract_page_mapping(doc, markdown)
+        # Export to markdown, taking page and bbox of every line from item provenance
+        rendered = render_with_provenance(doc)
+        if rendered:
+            markdown, page_mapping, line_boxes, pdf_pages = rendered
+            print(f"   Page mapping from item provenance ({len(line_boxes)} lines with boxes)")
+        else:
+            # No provenance available: locate page boundaries in the exported markdown
+            markdown = doc.export_to_markdown()
+            page_mapping = self._extract_page_mapping(doc, markdown)
+            line_boxes = LineBoxes()
+            pdf_pages = None
         
         # Get total pages
         total_pages = self._get_total_pages(doc)
@@ -42,129 +67,93 @@ class MarkdownConverter:
         return {
             "markdown": markdown,
             "page_mapping": page_mapping,
+            "line_boxes": line_boxes,
+            "pdf_pages": pdf_pages,
             "total_pages": total_pages,
             "document": doc
         }
     
-    def _extract_page_mapping(self, doc, markdown: str) -> Dict[int, int]:
+    def _extract_page_mapping(self, doc, markdown: str) -> PageMap:
         """
         Map markdown line numbers to PDF page numbers using Docling's structure
         
+        Each page is exported on its own and its first line is located in the full
+        markdown (searching forward from the previous page), which gives one
+        boundary per page; every line then belongs to the page whose boundary
+        precedes it.
+        
         Returns:
-            dict mapping line_number -> page_number
+            PageMap (line_number -> page_number, stored as page runs)
         """
-        page_mapping = {}
         lines = markdown.split('\n')
+        total_pages = self._get_total_pages(doc)
+        boundaries = []
         
         print(f"Building page mapping for {len(lines)} lines...")
         
         try:
-            # Method 1: Export each page separately and find in markdown
-            if hasattr(doc, 'pages') and len(doc.pages) > 0:
-                print(f"   Using page-by-page export method ({len(doc.pages)} pages)")
+            page_numbers = self._get_page_numbers(doc)
+            if page_numbers:
+                print(f"   Using page-by-page export method ({len(page_numbers)} pages)")
                 
+                locator = LineLocator(lines)
                 current_line = 0
-                for page_idx, page in enumerate(doc.pages, start=1):
-                    # Export this page to markdown
+                for page_no in page_numbers:
                     try:
-                        if hasattr(page, 'export_to_markdown'):
-                            page_md = page.export_to_markdown()
-                        elif hasattr(page, 'text'):
-                            page_md = page.text
-                        else:
-                            continue
-                        
-                        # Find first few lines of this page in the full markdown
-                        page_lines = page_md.split('\n')
-                        first_line = next((l.strip() for l in page_lines if l.strip()), None)
-                        
-                        if first_line:
-                            # Find where this page starts in the markdown
-                            for line_num in range(current_line, len(lines)):
-                                if first_line[:30] in lines[line_num] or lines[line_num][:30] in first_line:
-                                    # Mark this and next ~20 lines as this page
-                                    for offset in range(min(30, len(lines) - line_num)):
-                                        page_mapping[line_num + offset] = page_idx
-                                    current_line = line_num + 30
-                                    break
+                        page_md = self._export_page(doc, page_no)
                     except Exception as e:
-                        print(f"   Warning: Could not process page {page_idx}: {e}")
+                        print(f"   Warning: Could not process page {page_no}: {e}")
                         continue
+                    
+                    # Find where this page starts in the markdown
+                    first_line = next((l.strip() for l in page_md.split('\n') if l.strip()), None)
+                    line_num = locator.find(first_line, current_line) if first_line else None
+                    if line_num is not None:
+                        boundaries.append((line_num, page_no))
+                        current_line = line_num + 1
                 
-                print(f"   Mapped {len(page_mapping)} lines using page export")
-            
-            # Method 2: Estimate based on line distribution
-            if len(page_mapping) < len(lines) * 0.1:  # Less than 10% mapped
-                print(f"   Falling back to estimation method")
-                total_pages = self._get_total_pages(doc)
-                lines_per_page = len(lines) // total_pages if total_pages > 0 else len(lines)
-                
-                for line_num in range(len(lines)):
-                    estimated_page = min(total_pages, (line_num // lines_per_page) + 1)
-                    page_mapping[line_num] = estimated_page
-                
-                print(f"   Estimated {len(page_mapping)} lines ({lines_per_page} lines/page)")
+                print(f"   Located {len(boundaries)} of {len(page_numbers)} page boundaries")
         
         except Exception as e:
             print(f"   Error in page mapping: {e}")
-            # Ultimate fallback: distribute evenly
-            total_pages = self._get_total_pages(doc)
-            lines_per_page = len(lines) // total_pages if total_pages > 0 else len(lines)
-            for line_num in range(len(lines)):
-                page_mapping[line_num] = min(total_pages, (line_num // lines_per_page) + 1)
+            boundaries = []
+        
+        # Estimate based on line distribution if too few pages were located
+        if len(boundaries) < max(1, total_pages * 0.1):
+            print(f"   Falling back to estimation method")
+            boundaries = [
+                (len(lines) * (page - 1) // total_pages, page)
+                for page in range(1, total_pages + 1)
+            ]
         
-        # Fill in any remaining gaps
-        page_mapping = self._fill_page_gaps(page_mapping, len(lines))
+        page_mapping = PageMap.from_boundaries(boundaries, len(lines))
         
         # Verify distribution
-        page_counts = {}
-        for page in page_mapping.values():
-            page_counts[page] = page_counts.get(page, 0) + 1
-        print(f"   Page distribution: {len(page_counts)} pages, avg {len(lines)//len(page_counts)} lines/page")
+        page_counts = page_mapping.page_counts()
+        print(f"   Page distribution: {len(page_counts)} pages, avg {len(lines)//max(1, len(page_counts))} lines/page")
         
         return page_mapping
     
-    def _get_page_text(self, page) -> str:
-        """Extract text from a page object"""
+    def _get_page_numbers(self, doc) -> List[int]:
+        """Page numbers of the document in order (Docling keys pages by page number)"""
+        pages = getattr(doc, 'pages', None)
+        if not pages:
+            return []
+        if isinstance(pages, dict):
+            return sorted(pages)
+        return list(range(1, len(pages) + 1))
+    
+    def _export_page(self, doc, page_no: int) -> str:
+        """Export a single page to markdown"""
         try:
-            if hasattr(page, 'text'):
-                return page.text
-            elif hasattr(page, 'export_to_markdown'):
+            return doc.export_to_markdown(page_no=page_no)
+        except TypeError:
+            # Older documents: fall back to the page object itself
+            pages = doc.pages
+            page = pages[page_no] if isinstance(pages, dict) else pages[page_no - 1]
+            if hasattr(page, 'export_to_markdown'):
                 return page.export_to_markdown()
-            return ""
-        except:
-            return ""
-    
-    def _fill_page_gaps(self, page_mapping: Dict[int, int], total_lines: int) -> Dict[int, int]:
-        """
-        Fill gaps in page mapping using interpolation
-        Ensures every line has a page number
-        """
-        if not page_mapping:
-            # If no mapping, assume single page
-            return {i: 1 for i in range(total_lines)}
-        
-        filled_mapping = {}
-        sorted_lines = sorted(page_mapping.keys())
-        
-        for line_num in range(total_lines):
-            if line_num in page_mapping:
-                filled_mapping[line_num] = page_mapping[line_num]
-            else:
-                # Find nearest known page
-                if line_num < sorted_lines[0]:
-                    filled_mapping[line_num] = page_mapping[sorted_lines[0]]
-                else:
-                    # Find previous known page
-                    prev_page = 1
-                    for known_line in sorted_lines:
-                        if known_line <= line_num:
-                            prev_page = page_mapping[known_line]
-                        else:
-                            break
-                    filled_mapping[line_num] = prev_page
-        
-        return filled_mapping
+            return getattr(page, 'text', '') or ''
     
     def _get_total_pages(self, doc) -> int:
         """Get total number of pages from document"""
@@ -177,7 +166,7 @@ class MarkdownConverter:
         except:
             return 1
     
-    def search_in_markdown(self, markdown: str, page_mapping: Dict[int, int], 
+    def search_in_markdown(self, markdown: str, page_mapping: Mapping[int, int], 
                           param_name: str) -> List[Dict[str, Any]]:
         """
         Search for parameter in markdown with page tracking
@@ -188,6 +177,11 @@ class MarkdownConverter:
         results = []
         lines = markdown.split('\n')
         
+        # Memoised line values are only valid for the document they came from
+        if markdown is not self._value_markdown:
+            self.value_extractor.clear()
+            self._value_markdown = markdown
+        
         # Search for parameter (case-insensitive)
         for line_num, line in enumerate(lines):
             if param_name.lower() in line.lower():
@@ -210,27 +204,7 @@ class MarkdownConverter:
     
     def _extract_value_from_line(self, line: str) -> Dict[str, str]:
         """Extract value and unit from a markdown line"""
-        # Patterns for value extraction
-        patterns = [
-            # Table format: | param | value | unit |
-            r'\|\s*([+-]?\d+\.?\d*\s*(?:to|-|–)\s*[+-]?\d+\.?\d*)\s*\|\s*([A-Za-z°%/]+)?\s*\|',
-            r'\|\s*([+-]?\d+\.?\d*)\s*\|\s*([A-Za-z°%/]+)?\s*\|',
-            # Colon/equals format: param: value unit
-            r':\s*([+-]?\d+\.?\d*\s*(?:to|-|–)\s*[+-]?\d+\.?\d*)\s*([A-Za-z°%/]+)?',
-            r':\s*([+-]?\d+\.?\d*)\s*([A-Za-z°%/]+)?',
-            # Range format: 1.5V to 6.0V
-            r'([+-]?\d+\.?\d*)\s*([A-Za-z]+)\s+to\s+([+-]?\d+\.?\d*)\s*([A-Za-z]+)?',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line)
-            if match:
-                if len(match.groups()) >= 2:
-                    value = match.group(1).strip()
-                    unit = match.group(2).strip() if match.group(2) else ""
-                    return {"value": value, "unit": unit}
-        
-        return None
+        return self.value_extractor.extract(line)
     
     def _get_context(self, lines: List[str], line_num: int, context_size: int = 2) -> str:
         """Get surrounding context for a line"""
@@ -0,0 +1,122 @@
+"""
+Inverted index over markdown lines
+Built once per document so parameter lookups don't rescan every line
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Callable, Set
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class MarkdownIndex:
+    """Lowercased lines, token -> line postings and precomputed line values"""
+
+    def __init__(self, lines: List[str], value_extractor: Callable[[str], Optional[Dict[str, Any]]]):
+        """
+        Args:
+            lines: Markdown lines
+            value_extractor: Function extracting {"value", "unit"} from a line (or None)
+        """
+        self.lines = lines
+        self.lower_lines = [line.lower() for line in lines]
+
+        # token -> sorted list of line ids containing it
+        self.postings: Dict[str, List[int]] = {}
+        for line_num, line in enumerate(self.lower_lines):
+            for token in set(TOKEN_RE.findall(line)):
+                self.postings.setdefault(token, []).append(line_num)
+        self.vocabulary = list(self.postings)
+
+        # Numeric value parsed from each line, computed once per document
+        self.values = [value_extractor(line) for line in lines]
+        self.value_lines = [i for i, value in enumerate(self.values) if value]
+
+        self._token_lines: Dict[tuple, Set[int]] = {}
+        self._text: Optional[str] = None
+        self._line_starts: List[int] = []
+
+    def _lines_for_token(self, token: str, left_open: bool, right_open: bool) -> Set[int]:
+        """
+        Lines containing a line token compatible with a phrase token
+
+        left_open/right_open mean the phrase token touches the start/end of the phrase,
+        so the matching line token may carry extra word characters on that side.
+        """
+        key = (token, left_open, right_open)
+        if key not in self._token_lines:
+            if left_open and right_open:
+                matches = [t for t in self.vocabulary if token in t]
+            elif left_open:
+                matches = [t for t in self.vocabulary if t.endswith(token)]
+            elif right_open:
+                matches = [t for t in self.vocabulary if t.startswith(token)]
+            else:
+                matches = [token] if token in self.postings else []
+
+            lines: Set[int] = set()
+            for match in matches:
+                lines.update(self.postings[match])
+            self._token_lines[key] = lines
+        return self._token_lines[key]
+
+    def lines_containing(self, phrase: str) -> List[int]:
+        """
+        Find lines containing phrase (case-insensitive substring match)
+
+        Equivalent to [i for i, line in enumerate(lines) if phrase.lower() in line.lower()],
+        but candidates come from intersecting token postings.
+        """
+        phrase = phrase.lower()
+        tokens = list(TOKEN_RE.finditer(phrase))
+        if not tokens:
+            return [i for i, line in enumerate(self.lower_lines) if phrase in line]
+
+        candidate_sets = [
+            self._lines_for_token(m.group(), m.start() == 0, m.end() == len(phrase))
+            for m in tokens
+        ]
+        candidate_sets.sort(key=len)
+        candidates = set(candidate_sets[0])
+        for lines in candidate_sets[1:]:
+            candidates &= lines
+            if not candidates:
+                return []
+
+        return sorted(i for i in candidates if phrase in self.lower_lines[i])
+
+    def lines_containing_any(self, phrases: List[str]) -> List[int]:
+        """Find lines containing at least one of the phrases"""
+        lines: Set[int] = set()
+        for phrase in phrases:
+            lines.update(self.lines_containing(phrase))
+        return sorted(lines)
+
+    def pattern_lines(self, matcher) -> List[List[int]]:
+        """
+        Find the lines containing each pattern of an AhoCorasick matcher
+
+        The lowercased document is scanned once for all patterns, so patterns
+        should be lowercase.
+
+        Returns:
+            per pattern, the sorted line ids containing it
+        """
+        if self._text is None:
+            self._text = '\n'.join(self.lower_lines)
+            offset = 0
+            for line in self.lower_lines:
+                self._line_starts.append(offset)
+                offset += len(line) + 1
+
+        lines: List[List[int]] = [[] for _ in matcher.patterns]
+        for start, _, pattern_index in matcher.iter(self._text):
+            if '\n' in matcher.patterns[pattern_index]:
+                continue
+            # Occurrences of one pattern arrive in order, so each list stays sorted
+            line_num = bisect_right(self._line_starts, start) - 1
+            found = lines[pattern_index]
+            if not found or found[-1] != line_num:
+                found.append(line_num)
+        return lines
@@ -4,35 +4,111 @@ Searches in markdown first, falls back to PDF if needed
 """
 
 import re
-from typing import List, Dict, Any, Optional
-from fuzzywuzzy import fuzz
+from functools import partial
+from typing import List, Dict, Any, Iterator, Mapping, Optional, Set, Tuple
+from aho_corasick import build_name_matcher
+from docling_provenance import LineBoxes
+from fuzzy_matcher import BatchFuzzyMatcher
+from markdown_index import MarkdownIndex
+from markdown_tables import TableIndex, primary_value
+from page_blocks import LazyPageBlocks, PageBlocks
+from value_extraction import ValueExtractor
 
 
 class MarkdownParameterExtractor:
     """Extract parameters from markdown with page tracking"""
     
-    def __init__(self, markdown: str, page_mapping: Dict[int, int], pdf_pages: List[Dict[str, Any]]):
+    def __init__(self, markdown: str, page_mapping: Mapping[int, int], pdf_pages: List[Dict[str, Any]],
+                 page_blocks: Optional[LazyPageBlocks] = None, line_boxes: Optional[LineBoxes] = None):
+        """
+        Args:
+            markdown: Markdown content from Docling
+            page_mapping: Markdown line -> PDF page number (PageMap or plain dict)
+            pdf_pages: Per-page PDF data (blocks are used only if page_blocks is not given)
+            page_blocks: Lazy provider of word blocks for highlighting
+            line_boxes: Docling bounding box of each markdown line; used for highlights
+                when present, so the PDF's word blocks are never loaded
+        """
         self.markdown = markdown
         self.page_mapping = page_mapping
         self.pdf_pages = pdf_pages
+        self.page_blocks = page_blocks
+        self.line_boxes = line_boxes or LineBoxes()
         self.lines = markdown.split('\n')
         self.fuzzy_threshold = 80
+        
+        # Each line is parsed for a value at most once per document
+        self.value_extractor = ValueExtractor("markdown")
+        
+        # Lowercased lines, token postings and parsed values, built once per document
+        self.index = MarkdownIndex(self.lines, self._extract_value_from_line)
+        
+        # Limit tables (MIN/TYP/MAX/UNIT) parsed into rows keyed by symbol and parameter name
+        self.tables = TableIndex(self.lines)
+        
+        # Fuzzy candidates: lines with a value that aren't too short to score
+        self.fuzzy_top_k = 5
+        self._fuzzy_lines = [i for i in self.index.value_lines if len(self.lines[i].strip()) >= 5]
+        self.fuzzy_matcher = BatchFuzzyMatcher([self.index.lower_lines[i] for i in self._fuzzy_lines])
     
     def extract_parameter(self, param_name: str) -> Dict[str, Any]:
         """
         Extract a single parameter from markdown
         Falls back to PDF if not found in markdown
         """
+        return next(self.iter_parameters([param_name]))[1]
+    
+    def extract_parameters(self, param_names: List[str],
+                           aliases: Optional[Dict[str, List[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract several parameters from markdown
+        
+        Args:
+            param_names: Parameter names to extract
+            aliases: Optional parameter name -> alternative names (e.g. symbols) also
+                accepted by the table and exact tiers
+        
+        Returns:
+            one result per parameter, in input order
+        """
+        print(f"Extracting {len(param_names)} parameters from markdown")
+        results: List[Optional[Dict[str, Any]]] = [None] * len(param_names)
+        for i, result in self.iter_parameters(param_names, aliases):
+            results[i] = result
+        print(f"   Found {sum(1 for r in results if r['value'] != 'NF')}/{len(param_names)} parameters")
+        return results
+    
+    def iter_parameters(self, param_names: List[str],
+                        aliases: Optional[Dict[str, List[str]]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (index into param_names, result) for every parameter as soon as it is resolved
         
-        print(f"Extracting parameter: {param_name}")
+        Each tier (table, exact, fuzzy, keyword) runs once over the parameters it
+        still has to resolve, in the same priority order as a per-parameter search.
+        A tier's matches are yielded in index order before the next tier runs, and
+        the parameters no tier found come last.
+        """
+        pending = list(range(len(param_names)))
+        tiers = (partial(self._table_match_batch, aliases=aliases),
+                 partial(self._exact_match_batch, aliases=aliases),
+                 self._fuzzy_match_tier, self._keyword_match_batch)
         
-        # Try markdown search first (better accuracy)
-        result = self._search_in_markdown(param_name)
-        if result:
-            print(f"   Found: {result['value']} {result['unit']} on page {result['source_page']}, line {result['markdown_line']}")
-            return result
+        for tier in tiers:
+            if not pending:
+                break
+            unresolved = []
+            for i, match in zip(pending, tier([param_names[i] for i in pending])):
+                if match:
+                    yield i, self._create_result(param_names[i], *match)
+                else:
+                    unresolved.append(i)
+            pending = unresolved
         
-        # Fallback: not found
+        for i in pending:
+            yield i, self._not_found(param_names[i])
+    
+    def _not_found(self, param_name: str) -> Dict[str, Any]:
+        """Result for a parameter no tier could find"""
         return {
             "name": param_name,
             "value": "NF",
@@ -48,126 +124,139 @@ class MarkdownParameterExtractor:
             "highlights": []
         }
     
-    def _search_in_markdown(self, param_name: str) -> Optional[Dict[str, Any]]:
-        """Search for parameter in markdown"""
-        
-        # Try exact match first
-        exact_matches = self._exact_match(param_name)
-        if exact_matches:
-            return self._create_result(param_name, exact_matches[0], "exact_match", 95)
-        
-        # Try fuzzy match
-        fuzzy_matches = self._fuzzy_match(param_name)
-        if fuzzy_matches:
-            return self._create_result(param_name, fuzzy_matches[0], "fuzzy_match", fuzzy_matches[0]["confidence"])
-        
-        # Try keyword match
-        keyword_matches = self._keyword_match(param_name)
-        if keyword_matches:
-            return self._create_result(param_name, keyword_matches[0], "keyword_match", 75)
-        
-        return None
+    # Batch tiers: per parameter, (match, method, confidence) or None
     
-    def _exact_match(self, param_name: str) -> List[Dict[str, Any]]:
-        """Find exact matches for parameter name"""
-        matches = []
+    def _table_match_batch(self, param_names: List[str],
+                           aliases: Optional[Dict[str, List[str]]] = None) -> List[Optional[tuple]]:
+        """Structured table lookup (reads the limit columns directly)"""
+        aliases = aliases or {}
+        results = []
+        for param_name in param_names:
+            match = None
+            for name in [param_name] + list(aliases.get(param_name, [])):
+                match = self._table_match(name)
+                if match:
+                    break
+            results.append((match, "table_match", 98) if match else None)
+        return results
+    
+    def _exact_match_batch(self, param_names: List[str],
+                           aliases: Optional[Dict[str, List[str]]] = None) -> List[Optional[tuple]]:
+        """
+        First line containing the parameter name (or an alias) that carries a value
+        
+        All names are located in one Aho-Corasick scan of the document.
+        """
+        matcher, owners = build_name_matcher(param_names, aliases)
+        name_lines: List[Set[int]] = [set() for _ in param_names]
+        for pattern_index, lines in enumerate(self.index.pattern_lines(matcher)):
+            for i in owners[pattern_index]:
+                name_lines[i].update(lines)
         
-        for line_num, line in enumerate(self.lines):
-            if param_name.lower() in line.lower():
-                value_info = self._extract_value_from_line(line)
+        results = []
+        for lines in name_lines:
+            match = None
+            for line_num in sorted(lines):
+                value_info = self.index.values[line_num]
                 if value_info:
-                    matches.append({
-                        "line_number": line_num,
-                        "line_text": line.strip(),
-                        "value": value_info["value"],
-                        "unit": value_info["unit"],
-                        "page_number": self.page_mapping.get(line_num, 1)
-                    })
+                    match = (self._line_match(line_num, value_info), "exact_match", 95)
+                    break
+            results.append(match)
+        return results
+    
+    def _fuzzy_match_tier(self, param_names: List[str]) -> List[Optional[tuple]]:
+        """Best fuzzy-scored value line, all parameters scored in one pass"""
+        return [
+            (matches[0], "fuzzy_match", matches[0]["confidence"]) if matches else None
+            for matches in self._fuzzy_match_batch(param_names)
+        ]
+    
+    def _keyword_match_batch(self, param_names: List[str]) -> List[Optional[tuple]]:
+        """First value line containing any keyword of the parameter name"""
+        results = []
+        for param_name in param_names:
+            matches = self._keyword_match(param_name)
+            results.append((matches[0], "keyword_match", 75) if matches else None)
+        return results
+    
+    def _table_match(self, param_name: str) -> Optional[Dict[str, Any]]:
+        """Find a limit-table row whose symbol or parameter name is param_name"""
+        record = self.tables.lookup(param_name)
+        if not record:
+            return None
         
-        return matches
+        line_num = record["line_number"]
+        value = primary_value(record)
+        limits = record["limits"]
+        return {
+            "line_number": line_num,
+            "line_text": self.lines[line_num].strip(),
+            "value": value,
+            "unit": record["unit"],
+            "page_number": self.page_mapping.get(line_num, 1),
+            "notes": f"Conditions: {record['conditions']}" if record["conditions"] else "",
+            # Highlight the limit cells themselves, a "min to max" range is not a single PDF word
+            "highlight_values": [v for v in limits.values() if v in value.split(" to ")]
+        }
     
     def _fuzzy_match(self, param_name: str) -> List[Dict[str, Any]]:
         """Find fuzzy matches for parameter name"""
-        matches = []
+        return self._fuzzy_match_batch([param_name])[0]
+    
+    def _fuzzy_match_batch(self, param_names: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Find fuzzy matches for several parameters in one scoring pass
         
-        for line_num, line in enumerate(self.lines):
-            # Skip very short lines
-            if len(line.strip()) < 5:
-                continue
-            
-            # Calculate fuzzy score
-            score = fuzz.partial_ratio(param_name.lower(), line.lower())
-            
-            if score >= self.fuzzy_threshold:
-                value_info = self._extract_value_from_line(line)
-                if value_info:
-                    matches.append({
-                        "line_number": line_num,
-                        "line_text": line.strip(),
-                        "value": value_info["value"],
-                        "unit": value_info["unit"],
-                        "page_number": self.page_mapping.get(line_num, 1),
-                        "confidence": min(score, 90)
-                    })
-        
-        # Sort by confidence
-        matches.sort(key=lambda x: x.get("confidence", 0), reverse=True)
-        return matches
+        Returns:
+            per parameter, the top matches sorted by confidence
+        """
+        ranked = self.fuzzy_matcher.top_k(
+            [name.lower() for name in param_names],
+            k=self.fuzzy_top_k,
+            threshold=self.fuzzy_threshold,
+            # Confidence is capped at 90, so every line scoring 90 or more ties and the earliest wins
+            score_cap=90
+        )
+        
+        results = []
+        for param_ranked in ranked:
+            matches = []
+            for choice_idx, score in param_ranked:
+                line_num = self._fuzzy_lines[choice_idx]
+                match = self._line_match(line_num, self.index.values[line_num])
+                match["confidence"] = score
+                matches.append(match)
+            results.append(matches)
+        return results
     
     def _keyword_match(self, param_name: str) -> List[Dict[str, Any]]:
         """Find matches based on keywords"""
         keywords = self._extract_keywords(param_name)
         matches = []
         
-        for line_num, line in enumerate(self.lines):
-            line_lower = line.lower()
-            
-            # Check if line contains any keywords
-            if any(kw.lower() in line_lower for kw in keywords):
-                value_info = self._extract_value_from_line(line)
-                if value_info:
-                    matches.append({
-                        "line_number": line_num,
-                        "line_text": line.strip(),
-                        "value": value_info["value"],
-                        "unit": value_info["unit"],
-                        "page_number": self.page_mapping.get(line_num, 1)
-                    })
+        # Lines containing any keyword
+        for line_num in self.index.lines_containing_any(keywords):
+            value_info = self.index.values[line_num]
+            if value_info:
+                matches.append(self._line_match(line_num, value_info))
         
         return matches
     
+    def _line_match(self, line_num: int, value_info: Dict[str, str]) -> Dict[str, Any]:
+        """Build a match for a markdown line"""
+        return {
+            "line_number": line_num,
+            "line_text": self.lines[line_num].strip(),
+            "value": value_info["value"],
+            "unit": value_info["unit"],
+            "page_number": self.page_mapping.get(line_num, 1),
+            # A "min to max" range is not a single PDF word; highlight each limit
+            "highlight_values": value_info["value"].split(" to ")
+        }
+    
     def _extract_value_from_line(self, line: str) -> Optional[Dict[str, str]]:
-        """Extract value and unit from a markdown line"""
-        # Patterns for value extraction (optimized for markdown tables)
-        patterns = [
-            # Table format: | param | min | typ | max | unit |
-            r'\|\s*([+-]?\d+\.?\d*)\s*\|\s*\|\s*([+-]?\d+\.?\d*)\s*\|\s*([A-Za-z°%/]+)?\s*\|',
-            # Table format: | param | value | unit |
-            r'\|\s*([+-]?\d+\.?\d*)\s*\|\s*([A-Za-z°%/]+)?\s*\|',
-            # Range in table: | param | 1.5 to 6.0 | V |
-            r'\|\s*([+-]?\d+\.?\d*)\s+to\s+([+-]?\d+\.?\d*)\s*\|\s*([A-Za-z°%/]+)?\s*\|',
-            # Colon format: param: 1.5V to 6.0V
-            r':\s*([+-]?\d+\.?\d*)\s*([A-Za-z]+)\s+to\s+([+-]?\d+\.?\d*)\s*([A-Za-z]+)?',
-            # Simple colon: param: value unit
-            r':\s*([+-]?\d+\.?\d*)\s*([A-Za-z°%/]+)?',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line)
-            if match:
-                groups = match.groups()
-                if len(groups) >= 2:
-                    # Handle range format
-                    if 'to' in pattern:
-                        value = f"{groups[0]} to {groups[1]}"
-                        unit = groups[2] if len(groups) > 2 and groups[2] else ""
-                    else:
-                        value = groups[0].strip()
-                        unit = groups[1].strip() if groups[1] else ""
-                    
-                    return {"value": value, "unit": unit}
-        
-        return None
+        """Extract value and unit from a markdown line (memoised per document)"""
+        return self.value_extractor.extract(line)
     
     def _extract_keywords(self, param_name: str) -> List[str]:
         """Extract keywords from parameter name"""
@@ -182,8 +271,15 @@ class MarkdownParameterExtractor:
         line_num = match["line_number"]
         page_num = match["page_number"]
         
-        # Get highlights from PDF for this page
-        highlights = self._get_pdf_highlights(page_num, match["value"])
+        # Highlight the source line's own box when Docling provenance has it,
+        # otherwise search the PDF words on this page
+        line_box = self.line_boxes.get(line_num)
+        if line_box:
+            highlights = [{"text": match["line_text"], "bbox": line_box, "type": "value"}]
+        else:
+            highlights = []
+            for value_text in dict.fromkeys(match.get("highlight_values") or [match["value"]]):
+                highlights.extend(self._get_pdf_highlights(page_num, value_text))
         
         # Get context
         context = self._get_context(line_num)
@@ -199,31 +295,24 @@ class MarkdownParameterExtractor:
             "manually_edited": False,
             "source_text": match["line_text"],
             "markdown_context": context,
-            "notes": "",
+            "notes": match.get("notes", ""),
             "highlights": highlights
         }
     
     def _get_pdf_highlights(self, page_num: int, value_text: str) -> List[Dict[str, Any]]:
         """Get PDF highlights for a specific page and value"""
-        highlights = []
+        blocks = self._get_page_blocks(page_num)
+        return blocks.highlights(blocks.find(value_text), "value")
+    
+    def _get_page_blocks(self, page_num: int) -> PageBlocks:
+        """Get word blocks for a page, loading them on demand when a provider is set"""
+        if self.page_blocks is not None:
+            return self.page_blocks.get(page_num)
         
-        # Find the page in pdf_pages
         for page in self.pdf_pages:
             if page["page_number"] == page_num:
-                blocks = page.get("blocks", [])
-                
-                # Search for value in blocks
-                for block in blocks:
-                    block_text = block.get("text", "")
-                    if value_text in block_text:
-                        highlights.append({
-                            "text": block_text,
-                            "bbox": block.get("bbox", []),
-                            "type": "value"
-                        })
-                break
-        
-        return highlights
+                return PageBlocks.coerce(page.get("blocks"))
+        return PageBlocks.from_blocks([])
     
     def _get_context(self, line_num: int, context_size: int = 2) -> str:
         """Get surrounding context for a line"""
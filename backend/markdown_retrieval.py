@@ -0,0 +1,170 @@
+"""
+BM25 retrieval over markdown datasheet lines
+Scores every text line and table row against a parameter name, so AI prompts can
+carry only the relevant excerpts instead of whole datasheet chunks
+"""
+
+import math
+from typing import List, Dict, Iterable, Optional
+
+from markdown_index import TOKEN_RE
+from markdown_tables import SEPARATOR_CELL, split_row
+
+
+def _tokens(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def _is_separator_row(line: str) -> bool:
+    cells = [cell for cell in split_row(line) if cell]
+    return bool(cells) and all(SEPARATOR_CELL.match(cell) for cell in cells)
+
+
+class RetrievedContext:
+    """Selected markdown lines in document order, with "..." where lines were left out"""
+
+    GAP = "..."
+
+    def __init__(self, lines: List[str], line_numbers: List[int]):
+        """
+        Args:
+            lines: All markdown lines of the document
+            line_numbers: Line numbers to keep
+        """
+        self.lines: List[str] = []
+        self.line_numbers: List[Optional[int]] = []
+        previous = None
+        for line_num in sorted(set(line_numbers)):
+            if previous is not None and line_num != previous + 1:
+                self.lines.append(self.GAP)
+                self.line_numbers.append(None)
+            self.lines.append(lines[line_num])
+            self.line_numbers.append(line_num)
+            previous = line_num
+        self.start_line = self.line_numbers[0] if self.line_numbers else 0
+        self.text = "\n".join(self.lines)
+
+    def find_line(self, snippet: str) -> int:
+        """
+        Markdown line number of the first kept line containing snippet (case and whitespace-insensitive)
+
+        Returns:
+            The line number, or -1 when no single kept line contains the snippet
+        """
+        snippet = " ".join(snippet.lower().split())
+        if not snippet:
+            return -1
+        for line, line_num in zip(self.lines, self.line_numbers):
+            if line_num is not None and snippet in " ".join(line.lower().split()):
+                return line_num
+        return -1
+
+
+class BM25Index:
+    """Okapi BM25 over the text lines and table body rows of a markdown document"""
+
+    def __init__(self, markdown: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            markdown: Markdown content
+            k1: Term frequency saturation
+            b: Document length normalisation
+        """
+        self.lines = markdown.split('\n')
+        self.k1 = k1
+        self.b = b
+
+        # Each passage is one line; context holds the lines a reader needs to understand it
+        # (its section heading and, for table rows, the table header rows)
+        self.passages: List[int] = []
+        self.context: Dict[int, List[int]] = {}
+        lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+
+        heading: Optional[int] = None
+        table_header: List[int] = []
+        for line_num, line in enumerate(self.lines):
+            stripped = line.strip()
+            if not stripped.startswith('|'):
+                table_header = []
+            if not stripped:
+                continue
+            if stripped.startswith('#'):
+                heading = line_num
+                continue
+            if stripped.startswith('|'):
+                if not table_header:
+                    table_header = [line_num]
+                    continue
+                if len(table_header) == 1 and line_num == table_header[0] + 1 and _is_separator_row(line):
+                    table_header.append(line_num)
+                    continue
+
+            context = ([heading] if heading is not None else []) + table_header
+            # The section heading counts towards the line's terms ("## Thermal" + "Shutdown at 170 °C")
+            terms = _tokens(line) + (_tokens(self.lines[heading]) if heading is not None else [])
+            passage = len(self.passages)
+            self.passages.append(line_num)
+            self.context[line_num] = context
+            lengths.append(len(terms))
+            for term in terms:
+                counts = self.postings.setdefault(term, {})
+                counts[passage] = counts.get(passage, 0) + 1
+
+        self.lengths = lengths
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        count = len(self.passages)
+        self.idf = {
+            term: math.log(1 + (count - len(counts) + 0.5) / (len(counts) + 0.5))
+            for term, counts in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[int]:
+        """
+        Best matching lines for a query
+
+        Returns:
+            Up to top_k markdown line numbers, best first (lines sharing no term with the query are never returned)
+        """
+        scores: Dict[int, float] = {}
+        for term in set(_tokens(query)):
+            counts = self.postings.get(term)
+            if not counts:
+                continue
+            idf = self.idf[term]
+            for passage, frequency in counts.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[passage] / self.average_length)
+                scores[passage] = scores.get(passage, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = sorted(scores, key=lambda passage: (-scores[passage], passage))
+        return [self.passages[passage] for passage in ranked[:top_k]]
+
+    def with_context(self, line_numbers: Iterable[int]) -> List[int]:
+        """Line numbers plus their heading and table header rows"""
+        selected: List[int] = []
+        for line_num in line_numbers:
+            selected.extend(self.context.get(line_num, []))
+            selected.append(line_num)
+        return selected
+
+    def excerpt(self, ranked_lists: List[List[int]], max_chars: int) -> RetrievedContext:
+        """
+        Merge several ranked hit lists into one excerpt of at most max_chars
+
+        Hits are taken round-robin by rank, so every query keeps its best lines
+        when the budget runs out.
+        """
+        selected: List[int] = []
+        seen = set()
+        size = 0
+        for rank in range(max((len(hits) for hits in ranked_lists), default=0)):
+            for hits in ranked_lists:
+                if rank >= len(hits):
+                    continue
+                new_lines = [n for n in self.with_context([hits[rank]]) if n not in seen]
+                cost = sum(len(self.lines[n]) + 1 for n in new_lines)
+                if selected and size + cost > max_chars:
+                    continue
+                selected.extend(new_lines)
+                seen.update(new_lines)
+                size += cost
+        return RetrievedContext(self.lines, selected)
@@ -0,0 +1,257 @@
+"""
+Structured model of markdown datasheet tables
+Parses pipe tables once into columns with MIN/TYP/NOM/MAX/UNIT roles and
+indexes their rows by symbol and parameter name
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+# Header cell -> column role
+LIMIT_HEADERS = {"MIN": "min", "TYP": "typ", "NOM": "nom", "MAX": "max", "VALUE": "value"}
+CONDITION_HEADERS = {"TEST CONDITIONS", "CONDITIONS", "TEST CONDITION"}
+DESCRIPTOR_HEADERS = {"PARAMETER", "PARAMETERS", "SYMBOL", "DESCRIPTION"}
+
+SEPARATOR_CELL = re.compile(r'^:?-{3,}:?$')
+FOOTNOTE = re.compile(r'\s*\(\d+\)')
+# Datasheet symbols: a short letter prefix, optionally followed by one subscript token ("V IN", "R θJC(top)", "PSRR")
+SYMBOL = re.compile(r'^[A-Za-zθψΔη]{1,4}(?:\s+\S+)?$')
+# "Supply, V IN" -> parameter "Supply", symbol "V IN"
+TRAILING_SYMBOL = re.compile(r'^(.+?),\s*([A-Za-zθψΔη]{1,2}\s+\S+)$')
+LIMIT_VALUE = re.compile(r'^([±+-]?\d+(?:\.\d+)?)\s*(%?)$')
+
+
+def normalize_key(name: str) -> str:
+    """Normalise a symbol or parameter name for lookup ("V IN", "VIN", "v_in" -> "vin")"""
+    return re.sub(r'[\W_]+', '', FOOTNOTE.sub('', name).lower())
+
+
+def split_row(line: str) -> List[str]:
+    """Split a markdown pipe row into stripped cells"""
+    cells = line.strip()
+    if cells.startswith('|'):
+        cells = cells[1:]
+    if cells.endswith('|'):
+        cells = cells[:-1]
+    return [cell.strip() for cell in cells.split('|')]
+
+
+class MarkdownTable:
+    """One pipe table stored column-wise, with the role of each column"""
+
+    def __init__(self, header: List[str], rows: List[List[str]], line_numbers: List[int], section: str = ""):
+        """
+        Args:
+            header: Header cells
+            rows: Body rows (padded or truncated to the header width)
+            line_numbers: Markdown line number of each body row
+            section: Nearest markdown heading above the table
+        """
+        width = len(header)
+        rows = [(row + [''] * width)[:width] for row in rows]
+
+        self.header = header
+        self.columns: List[List[str]] = [[row[c] for row in rows] for c in range(width)]
+        self.line_numbers = line_numbers
+        self.section = section
+        self.roles = self._detect_roles()
+
+    def __len__(self) -> int:
+        return len(self.line_numbers)
+
+    @property
+    def limit_columns(self) -> Dict[str, int]:
+        """Limit role -> column index"""
+        return {role: c for c, role in self.roles.items() if role in LIMIT_HEADERS.values()}
+
+    def _detect_roles(self) -> Dict[int, str]:
+        """
+        Assign a role to every column
+
+        Limit, unit and condition columns come from the header. Unlabelled columns
+        or PARAMETER-labelled columns left of the first limit are descriptors: the
+        first one that mostly holds symbols is the symbol column, the first one that
+        is labelled PARAMETER or holds mostly distinct values is the parameter column,
+        the rest are treated as conditions.
+        """
+        roles: Dict[int, str] = {}
+        for c, cell in enumerate(self.header):
+            label = FOOTNOTE.sub('', cell).upper()
+            if label in LIMIT_HEADERS and LIMIT_HEADERS[label] not in roles.values():
+                roles[c] = LIMIT_HEADERS[label]
+            elif label == "UNIT" and "unit" not in roles.values():
+                roles[c] = "unit"
+            elif label in CONDITION_HEADERS:
+                roles[c] = "conditions"
+
+        limits = [c for c, role in roles.items() if role in LIMIT_HEADERS.values()]
+        if not limits:
+            return roles
+
+        for c in range(min(limits)):
+            if c in roles:
+                continue
+            values = [v for v in self.columns[c] if v]
+            if not values:
+                continue
+            symbolic = sum(1 for v in values if SYMBOL.match(v)) / len(values) >= 0.6
+            labelled = FOOTNOTE.sub('', self.header[c]).upper() in DESCRIPTOR_HEADERS
+            distinct = labelled or len(set(values)) / len(values) >= 0.75
+            if symbolic and "symbol" not in roles.values():
+                roles[c] = "symbol"
+            elif not symbolic and distinct and "parameter" not in roles.values():
+                roles[c] = "parameter"
+            else:
+                roles[c] = "conditions"
+        return roles
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """
+        Build one record per body row that has at least one numeric limit
+
+        Symbols and units carry down from the previous row when a cell is empty
+        but the row continues the same parameter (multi-row specs).
+        """
+        if not self.limit_columns:
+            return []
+
+        def column(role: str) -> Optional[List[str]]:
+            for c, r in self.roles.items():
+                if r == role:
+                    return self.columns[c]
+            return None
+
+        symbols = column("symbol")
+        parameters = column("parameter")
+        units = column("unit")
+        condition_columns = [self.columns[c] for c, r in sorted(self.roles.items()) if r == "conditions"]
+
+        records = []
+        previous = {"symbol": "", "parameter": "", "unit": ""}
+        for i, line_num in enumerate(self.line_numbers):
+            symbol = symbols[i] if symbols else ""
+            parameter = FOOTNOTE.sub('', parameters[i]) if parameters else ""
+            unit = units[i] if units else ""
+
+            if not symbol:
+                split = TRAILING_SYMBOL.match(parameter)
+                if split:
+                    parameter, symbol = split.group(1), split.group(2)
+                elif parameter and parameter == previous["parameter"]:
+                    symbol = previous["symbol"]
+            if not parameter and symbol and symbol == previous["symbol"]:
+                parameter = previous["parameter"]
+            if not unit and (symbol or parameter) and (symbol, parameter) == (previous["symbol"], previous["parameter"]):
+                unit = previous["unit"]
+            previous = {"symbol": symbol, "parameter": parameter, "unit": unit}
+
+            limits = {}
+            for role, c in self.limit_columns.items():
+                match = LIMIT_VALUE.match(FOOTNOTE.sub('', self.columns[c][i]))
+                if match:
+                    limits[role] = match.group(1)
+                    if match.group(2) and not unit:
+                        unit = "%"
+            if not limits or not (symbol or parameter):
+                continue
+
+            conditions = []
+            for values in condition_columns:
+                if values[i] and values[i] not in conditions and values[i] != parameter:
+                    conditions.append(values[i])
+
+            records.append({
+                "line_number": line_num,
+                "symbol": symbol,
+                "parameter": parameter,
+                "conditions": ", ".join(conditions),
+                "limits": limits,
+                "unit": unit,
+                "section": self.section
+            })
+        return records
+
+
+def parse_tables(lines: List[str]) -> List[MarkdownTable]:
+    """Find every pipe table (header row + separator row + body) in markdown lines"""
+    tables = []
+    section = ""
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith('#'):
+            section = line.lstrip('#').strip()
+            i += 1
+            continue
+
+        is_header = line.lstrip().startswith('|') and i + 1 < len(lines)
+        separator = split_row(lines[i + 1]) if is_header else []
+        if not separator or not all(SEPARATOR_CELL.match(cell) for cell in separator):
+            i += 1
+            continue
+
+        header = split_row(line)
+        rows, line_numbers = [], []
+        i += 2
+        while i < len(lines) and lines[i].lstrip().startswith('|'):
+            rows.append(split_row(lines[i]))
+            line_numbers.append(i)
+            i += 1
+        tables.append(MarkdownTable(header, rows, line_numbers, section))
+    return tables
+
+
+class TableIndex:
+    """Rows of every limit table, indexed by normalised symbol and parameter name"""
+
+    def __init__(self, lines: List[str]):
+        """
+        Args:
+            lines: Markdown lines
+        """
+        self.tables = parse_tables(lines)
+        self.records: List[Dict[str, Any]] = []
+        self.by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_parameter: Dict[str, List[Dict[str, Any]]] = {}
+
+        for table in self.tables:
+            for record in table.rows():
+                self.records.append(record)
+                if record["symbol"]:
+                    self.by_symbol.setdefault(normalize_key(record["symbol"]), []).append(record)
+                if record["parameter"]:
+                    self.by_parameter.setdefault(normalize_key(record["parameter"]), []).append(record)
+
+        # Recommended/electrical limits are what callers want; absolute maximums only as a last resort
+        for rows in list(self.by_symbol.values()) + list(self.by_parameter.values()):
+            rows.sort(key=lambda r: ("absolute maximum" in r["section"].lower(), r["line_number"]))
+
+    def lookup_all(self, name: str) -> List[Dict[str, Any]]:
+        """Get every row for a parameter name or symbol (parameter names take precedence)"""
+        key = normalize_key(name)
+        if not key:
+            return []
+        return self.by_parameter.get(key) or self.by_symbol.get(key) or []
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get the preferred row for a parameter name or symbol"""
+        rows = self.lookup_all(name)
+        return rows[0] if rows else None
+
+
+def primary_value(record: Dict[str, Any]) -> str:
+    """
+    Pick the value to report for a row
+
+    TYP (or NOM) when given, otherwise the MIN..MAX range, otherwise whichever single limit exists.
+    """
+    limits = record["limits"]
+    for role in ("typ", "nom"):
+        if role in limits:
+            return limits[role]
+    if "min" in limits and "max" in limits:
+        return f"{limits['min']} to {limits['max']}"
+    for role in ("value", "max", "min"):
+        if role in limits:
+            return limits[role]
+    return ""
@@ -3,12 +3,16 @@ AI-powered parameter extraction from markdown datasheets.
 Supports both OpenAI and OpenRouter APIs for intelligent parameter extraction.
 """
 
-import json
+import asyncio
 import os
-from typing import List, Dict, Any
-from openai import OpenAI
+from typing import List, Dict, Any, AsyncIterator, Mapping, Optional, Tuple, Union
 from dotenv import load_dotenv
+from ai_client import AIClientPool, create_async_client
 from config import APIConfig
+from json_stream import JSONArrayStream
+from llm_cache import LLMResponseCache
+from markdown_chunks import MarkdownChunk, chunk_markdown
+from markdown_retrieval import BM25Index, RetrievedContext
 
 # Load environment variables
 load_dotenv()
@@ -17,13 +21,19 @@ load_dotenv()
 class OpenAIExtractor:
     """Extract parameters from markdown using AI (OpenAI or OpenRouter)"""
     
-    def __init__(self, api_key: str = None, provider: str = None):
+    # Part of every response cache key; bump whenever the system or user prompt changes
+    PROMPT_VERSION = 2
+    
+    def __init__(self, api_key: str = None, provider: str = None, cache: LLMResponseCache = None,
+                 clients: AIClientPool = None):
         """
         Initialize AI extractor with support for OpenAI and OpenRouter.
         
         Args:
             api_key: API key. If None, reads from config/env
             provider: API provider ('openai' or 'openrouter'). If None, reads from config
+            cache: Optional per-parameter response cache
+            clients: App-lifetime client pool; without one the extractor opens its own connections
         """
         # Determine provider
         self.provider = provider or APIConfig.API_PROVIDER
@@ -41,31 +51,223 @@ class OpenAIExtractor:
         # Get base URL and model
         self.base_url = APIConfig.get_base_url()
         self.model = APIConfig.get_model()
+        self.cache = cache
+        self.last_cache_stats = {"hits": 0, "misses": 0}
+        self.last_request_stats = {"sent": 0, "failed": 0}
         
-        # Initialize OpenAI client (works for both OpenAI and OpenRouter)
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+        # Async OpenAI client (works for both OpenAI and OpenRouter) with pooled connections and retries
+        if clients:
+            self.async_client = clients.get(self.api_key, self.base_url)
+        else:
+            self.async_client = create_async_client(self.api_key, self.base_url)
         
         print(f"🤖 Initialized AI Extractor with {self.provider.upper()} - Model: {self.model}")
     
-    def extract_parameters(self, markdown: str, parameters: List[str], page_mapping: Dict = None) -> List[Dict[str, Any]]:
+    def extract_parameters(self, markdown: str, parameters: List[str], page_mapping: Mapping[int, int] = None,
+                           aliases: Dict[str, List[str]] = None) -> List[Dict[str, Any]]:
+        """Synchronous wrapper around extract_parameters_async (for scripts; not for use inside an event loop)"""
+        async def run():
+            # Connections belong to the event loop that opened them, so this call's loop gets its own client
+            async with create_async_client(self.api_key, self.base_url) as client:
+                shared, self.async_client = self.async_client, client
+                try:
+                    return await self.extract_parameters_async(markdown, parameters, page_mapping, aliases)
+                finally:
+                    self.async_client = shared
+        return asyncio.run(run())
+    
+    async def extract_parameters_async(self, markdown: str, parameters: List[str],
+                                       page_mapping: Mapping[int, int] = None,
+                                       aliases: Dict[str, List[str]] = None) -> List[Dict[str, Any]]:
         """
-        Extract parameters from markdown using OpenAI.
+        Extract parameters from markdown with concurrent, retrieval-narrowed requests.
         
         Args:
             markdown: Markdown content from PDF
             parameters: List of parameter names to extract
-            page_mapping: Optional page mapping for line-to-page conversion
+            page_mapping: Optional markdown line -> page mapping used to locate source text
+            aliases: Optional extra search terms per parameter name
             
         Returns:
-            List of extracted parameters with values, units, and metadata
+            List of extracted parameters in the order of parameters, with values, units, and metadata
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        async for name, result in self.stream_parameters(markdown, parameters, page_mapping, aliases):
+            results[name] = result
+        return [results.get(name) or self._create_not_found_result(name) for name in parameters]
+    
+    async def stream_parameters(self, markdown: str, parameters: List[str], page_mapping: Mapping[int, int] = None,
+                                aliases: Dict[str, List[str]] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
         """
+        Yield (name, result) for each distinct parameter name as soon as its result is final.
+        
+        With AI_RETRIEVAL_ENABLED, each parameter batch is sent only the datasheet
+        lines that BM25 ranks highest for its parameter names (and aliases), with
+        their section headings and table header rows. Parameters that share no term
+        with the datasheet fall back to map-reduce over section-aware chunks: every
+        (chunk, batch) pair is one request and the most confident value wins.
+        Requests run concurrently up to AI_MAX_CONCURRENT_REQUESTS and are streamed,
+        so a parameter is final as soon as every request asking for it has returned
+        its entry. With a cache, pairs answered before are not sent again;
+        last_cache_stats holds this call's hits and misses.
+        
+        A failed request answers its parameters as not found and is counted in
+        last_request_stats; when every request fails, the first error is raised.
+        """
+        chunks = chunk_markdown(markdown, APIConfig.AI_CHUNK_CHARS)
+        names = list(dict.fromkeys(parameters))
+        batch_size = max(1, APIConfig.AI_PARAMETER_BATCH_SIZE)
+        
+        # Retrieval: the best matching lines of each parameter
+        index = BM25Index(markdown) if APIConfig.AI_RETRIEVAL_ENABLED else None
+        hits: Dict[str, List[int]] = {}
+        if index:
+            for name in names:
+                query = " ".join([name] + list((aliases or {}).get(name, [])))
+                found = index.search(query, APIConfig.AI_RETRIEVAL_TOP_K)
+                if found:
+                    hits[name] = found
+        
+        # Every parameter is answered from its retrieval excerpt (scope -1) or from each chunk
+        # (scope = chunk index). A retrieved parameter is cached under its own excerpt, so its
+        # answer stays valid whichever parameters it is batched with; a request shows the merged
+        # excerpt of its batch, and quotes are looked up in every line retrieved for the document.
+        contexts: Dict[tuple, Any] = {}
+        for name in names:
+            if name in hits:
+                contexts[(-1, name)] = index.excerpt([hits[name]], APIConfig.AI_CHUNK_CHARS)
+            else:
+                for chunk_index, chunk in enumerate(chunks):
+                    contexts[(chunk_index, name)] = chunk
+        retrieved_lines = RetrievedContext(
+            index.lines, index.with_context(line_num for found in hits.values() for line_num in found)
+        ) if hits else None
+        
+        # Answers already cached for a (context, parameter) pair are reused as they are
+        keys: Dict[tuple, str] = {}
+        if self.cache is not None:
+            hashes: Dict[int, str] = {}
+            for (scope, name), context in contexts.items():
+                if id(context) not in hashes:
+                    hashes[id(context)] = LLMResponseCache.chunk_hash(context.text)
+                keys[(scope, name)] = LLMResponseCache.make_key(
+                    hashes[id(context)], name, self.model, APIConfig.TEMPERATURE, self.PROMPT_VERSION
+                )
+        cached = await asyncio.to_thread(self.cache.get_many, list(keys.values())) if keys else {}
+        
+        answers = []  # (scope, name, cached entry)
+        missing: Dict[int, List[str]] = {}
+        for scope, name in contexts:
+            key = keys.get((scope, name))
+            if key in cached:
+                answers.append((scope, name, cached[key]))
+            else:
+                missing.setdefault(scope, []).append(name)
+        self.last_cache_stats = {"hits": len(answers), "misses": len(keys) - len(answers)}
+        
+        requests = []  # (scope, context, batch, prompt note)
+        for scope, pending in sorted(missing.items()):
+            for i in range(0, len(pending), batch_size):
+                batch = pending[i:i + batch_size]
+                if scope < 0:
+                    context = index.excerpt([hits[name] for name in batch], APIConfig.AI_CHUNK_CHARS)
+                    note = f" (excerpts relevant to these parameters; \"{RetrievedContext.GAP}\" marks omitted lines)"
+                else:
+                    context = contexts[(scope, batch[0])]
+                    note = (f" (part {scope + 1} of {len(chunks)}; parameters may be in other parts, mark them NF here)"
+                            if len(chunks) > 1 else "")
+                requests.append((scope, context, batch, note))
+        self.last_request_stats = {"sent": len(requests), "failed": 0}
+        
+        print(f"🤖 AI extraction: {len(hits)} parameter(s) by retrieval, {len(names) - len(hits)} over "
+              f"{len(chunks)} chunk(s), {len(requests)} request(s), {self.last_cache_stats['hits']} cached answer(s)")
+        
+        # Reduce: keep the most confident found value of each parameter (earlier scope on ties);
+        # a parameter is final once each of its contexts has answered
+        unanswered = {name: 0 for name in names}
+        for _, name in contexts:
+            unanswered[name] += 1
+        best: Dict[str, tuple] = {}
+        
+        def answer(scope: int, name: str, param: Optional[Dict[str, Any]]) -> bool:
+            if param is not None:
+                context = retrieved_lines if scope < 0 else contexts[(scope, name)]
+                result = self._format_result(name, param, context, page_mapping)
+                if result["value"] != "NF":
+                    current = best.get(name)
+                    if current is None or (result["confidence"], -scope) > (current[1]["confidence"], -current[0]):
+                        best[name] = (scope, result)
+            unanswered[name] -= 1
+            return unanswered[name] == 0
+        
+        def final(name: str) -> Dict[str, Any]:
+            return best[name][1] if name in best else self._create_not_found_result(name)
+        
+        for scope, name, param in answers:
+            if answer(scope, name, param):
+                yield name, final(name)
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max(1, APIConfig.AI_MAX_CONCURRENT_REQUESTS))
+        
+        errors: List[Exception] = []
+        
+        async def run(request_index: int, context, batch: List[str], note: str):
+            try:
+                async for param in self._stream_batch(semaphore, context, batch, note):
+                    queue.put_nowait((request_index, param))
+            except Exception as e:
+                print(f"OpenAI extraction error (lines from {context.start_line}): {str(e)}")
+                errors.append(e)
+            finally:
+                queue.put_nowait((request_index, None))
+        
+        tasks = [asyncio.create_task(run(i, context, batch, note)) for i, (_, context, batch, note) in enumerate(requests)]
+        new_answers: Dict[str, Dict[str, Any]] = {}
         try:
-            prompt = self._build_prompt(markdown, parameters)
+            answered = [set() for _ in requests]
+            received = [0] * len(requests)
+            running = len(tasks)
+            while running:
+                request_index, param = await queue.get()
+                scope, _, batch, _ = requests[request_index]
+                if param is None:
+                    # A request that ended without some entries answers them as not found
+                    running -= 1
+                    for name in batch:
+                        if name not in answered[request_index]:
+                            answered[request_index].add(name)
+                            if answer(scope, name, None):
+                                yield name, final(name)
+                    continue
+                
+                name, by_name = self._match_name(param, batch, received[request_index], answered[request_index])
+                received[request_index] += 1
+                if name is None:
+                    continue
+                answered[request_index].add(name)
+                # An entry placed by position may answer another parameter; only named answers are cached
+                if keys and by_name:
+                    new_answers[keys[(scope, name)]] = param
+                if answer(scope, name, param):
+                    yield name, final(name)
             
-            response = self.client.chat.completions.create(
+            self.last_request_stats["failed"] = len(errors)
+            if errors and len(errors) == len(requests):
+                raise errors[0]
+        finally:
+            # Stop outstanding requests when the consumer goes away early, and let them unwind
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if new_answers:
+                await asyncio.to_thread(self.cache.put_many, new_answers)
+    
+    async def _stream_batch(self, semaphore: asyncio.Semaphore, context: Union[MarkdownChunk, RetrievedContext],
+                            batch: List[str], note: str = "") -> AsyncIterator[Dict[str, Any]]:
+        """Run one streamed (context, parameter batch) request, yielding each returned entry once it is complete"""
+        async with semaphore:
+            stream = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
@@ -74,25 +276,38 @@ class OpenAIExtractor:
                     },
                     {
                         "role": "user",
-                        "content": prompt
+                        "content": self._build_prompt(context.text, batch, note)
                     }
                 ],
                 temperature=APIConfig.TEMPERATURE,
                 max_tokens=APIConfig.MAX_TOKENS,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True
             )
-            
-            # Parse the response
-            result = json.loads(response.choices[0].message.content)
-            extracted_params = result.get("parameters", [])
-            
-            # Post-process to match expected format
-            return self._format_results(extracted_params, page_mapping)
-            
-        except Exception as e:
-            print(f"OpenAI extraction error: {str(e)}")
-            # Return empty results on error
-            return [self._create_not_found_result(param) for param in parameters]
+            parser = JSONArrayStream("parameters")
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    for param in parser.feed(delta):
+                        yield param
+            for param in parser.close():
+                yield param
+    
+    def _match_name(self, param: Dict[str, Any], batch: List[str], position: int,
+                    answered: set) -> Tuple[Optional[str], bool]:
+        """
+        Requested name of a returned entry (by name, else by its position when that name is still open)
+
+        Returns:
+            (name or None, whether the entry's own name matched)
+        """
+        returned = str(param.get("name", "")).strip().lower()
+        for name in batch:
+            if name.strip().lower() == returned:
+                return (None if name in answered else name), True
+        if position < len(batch) and batch[position] not in answered:
+            return batch[position], False
+        return None, False
     
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the AI"""
@@ -109,21 +324,16 @@ Your task is to:
 Be precise and only extract values that are explicitly stated in the datasheet.
 If a parameter is not found, mark it as "NF" (Not Found)."""
     
-    def _build_prompt(self, markdown: str, parameters: List[str]) -> str:
-        """Build the extraction prompt"""
+    def _build_prompt(self, markdown: str, parameters: List[str], note: str = "") -> str:
+        """Build the extraction prompt for one chunk or excerpt of the datasheet"""
         param_list = "\n".join(f"{i+1}. {p}" for i, p in enumerate(parameters))
         
-        # Truncate markdown if too long (to stay within token limits)
-        max_chars = 12000  # Roughly 3000 tokens
-        if len(markdown) > max_chars:
-            markdown = markdown[:max_chars] + "\n\n[... datasheet truncated for length ...]"
-        
         return f"""Extract the following parameters from this technical datasheet (in markdown format):
 
 **Parameters to find:**
 {param_list}
 
-**Datasheet content:**
+**Datasheet content{note}:**
 ```markdown
 {markdown}
 ```
@@ -151,38 +361,38 @@ If a parameter is not found, mark it as "NF" (Not Found)."""
   ]
 }}"""
     
-    def _format_results(self, extracted_params: List[Dict], page_mapping: Dict = None) -> List[Dict[str, Any]]:
-        """Format results to match the expected output structure"""
-        formatted = []
-        
-        for param in extracted_params:
-            # Determine if found
-            value = param.get("value", "NF")
-            is_found = value != "NF" and value != ""
-            
-            result = {
-                "name": param.get("name", ""),
-                "value": value,
-                "unit": param.get("unit", ""),
-                "source_page": self._estimate_page(param.get("source_text", ""), page_mapping) if is_found else None,
-                "extraction_method": "openai" if is_found else "not_found",
-                "confidence": param.get("confidence", 0 if not is_found else 85),
-                "manually_edited": False,
-                "source_text": param.get("source_text", ""),
-                "notes": param.get("notes", ""),
-                "markdown_line": None,  # Could be enhanced to find line number
-                "highlights": []  # AI mode doesn't provide bounding boxes
-            }
-            
-            formatted.append(result)
+    def _format_result(self, name: str, param: Dict[str, Any], chunk: Union[MarkdownChunk, RetrievedContext],
+                       page_mapping: Mapping[int, int] = None) -> Dict[str, Any]:
+        """Format one returned entry to match the expected output structure"""
+        value = param.get("value")
+        value = "NF" if value is None else str(value).strip()
+        is_found = value not in ("NF", "")
+        if not is_found:
+            return self._create_not_found_result(name)
         
-        return formatted
-    
-    def _estimate_page(self, source_text: str, page_mapping: Dict = None) -> int:
-        """Estimate page number from source text (basic implementation)"""
-        # This is a simple estimation - could be improved
-        # For now, return page 1 as default
-        return 1
+        try:
+            confidence = int(float(param.get("confidence", 85)))
+        except (TypeError, ValueError):
+            confidence = 85
+        
+        # Locate the quoted source text in the chunk or excerpt to recover its line and page
+        source_text = param.get("source_text", "") or ""
+        line_num = chunk.find_line(source_text)
+        page_line = line_num if line_num >= 0 else chunk.start_line
+        
+        return {
+            "name": name,
+            "value": value,
+            "unit": param.get("unit", "") or "",
+            "source_page": page_mapping.get(page_line, 1) if page_mapping else 1,
+            "extraction_method": "openai",
+            "confidence": confidence,
+            "manually_edited": False,
+            "source_text": source_text,
+            "notes": param.get("notes", "") or "",
+            "markdown_line": line_num if line_num >= 0 else None,
+            "highlights": []  # AI mode doesn't provide bounding boxes
+        }
     
     def _create_not_found_result(self, param_name: str) -> Dict[str, Any]:
         """Create a not-found result for a parameter"""
@@ -200,10 +410,10 @@ If a parameter is not found, mark it as "NF" (Not Found)."""
             "highlights": []
         }
     
-    def test_connection(self) -> bool:
+    async def test_connection(self) -> bool:
         """Test if OpenAI API connection works"""
         try:
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=5
@@ -219,7 +429,7 @@ if __name__ == "__main__":
     # Test the extractor
     extractor = OpenAIExtractor()
     
-    if extractor.test_connection():
+    if asyncio.run(extractor.test_connection()):
         print("✓ OpenAI connection successful!")
         
         # Test with sample data
@@ -0,0 +1,209 @@
+"""
+Page word blocks for PDF highlighting
+Compact array-backed storage per page, extracted lazily when a highlight lookup needs it
+"""
+
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional
+
+import numpy as np
+import pdfplumber
+
+from config import ProcessingConfig
+
+
+class PageBlocks:
+    """
+    Compact word-box storage for one page
+    
+    Boxes and sizes live in float32 arrays and all word texts share a single
+    buffer indexed by offsets, instead of one dict (plus bbox list) per word.
+    """
+    
+    SEPARATOR = "\x00"
+    
+    def __init__(self, words: List[str], bboxes: np.ndarray, sizes: np.ndarray):
+        self.text = self.SEPARATOR.join(words)
+        lengths = np.fromiter((len(w) + 1 for w in words), dtype=np.int32, count=len(words))
+        # offsets[i] is the start of word i in text; word i ends at offsets[i + 1] - 1
+        self.offsets = np.zeros(len(words) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        self.sizes = np.asarray(sizes, dtype=np.float32)
+        self._lower_text: Optional[str] = None
+    
+    @classmethod
+    def from_words(cls, words: Iterable[Dict[str, Any]]) -> "PageBlocks":
+        """Build from pdfplumber extract_words() output"""
+        words = list(words)
+        bboxes = np.array(
+            [[w.get("x0", 0), w.get("top", 0), w.get("x1", 0), w.get("bottom", 0)] for w in words],
+            dtype=np.float32
+        )
+        sizes = np.array([w.get("height", 0) for w in words], dtype=np.float32)
+        return cls([w.get("text", "") for w in words], bboxes, sizes)
+    
+    @classmethod
+    def from_blocks(cls, blocks: List[Dict[str, Any]]) -> "PageBlocks":
+        """Build from the highlight dict shape ({"text", "bbox", "size"})"""
+        bboxes = np.array([b.get("bbox") or [0, 0, 0, 0] for b in blocks], dtype=np.float32)
+        sizes = np.array([b.get("size", 0) for b in blocks], dtype=np.float32)
+        return cls([b.get("text", "") for b in blocks], bboxes, sizes)
+    
+    @classmethod
+    def coerce(cls, blocks) -> "PageBlocks":
+        """Use PageBlocks as they are; build them from block dicts (e.g. pages loaded from JSON)"""
+        if isinstance(blocks, cls):
+            return blocks
+        return cls.from_blocks(blocks or [])
+    
+    def __len__(self) -> int:
+        return len(self.sizes)
+    
+    def text_at(self, index: int) -> str:
+        """Get the text of one word"""
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+    
+    def find(self, needle: str, ignore_case: bool = False) -> np.ndarray:
+        """
+        Find words whose text contains needle
+        
+        Returns:
+            sorted array of word indices
+        """
+        if not needle:
+            return np.arange(len(self))
+        if self.SEPARATOR in needle:
+            return np.empty(0, dtype=np.int64)
+        
+        if ignore_case:
+            if self._lower_text is None:
+                self._lower_text = self.text.lower()
+            if len(self._lower_text) != len(self.text):
+                # Lowercasing changed character counts (rare Unicode), offsets no longer line up
+                needle = needle.lower()
+                return np.array([i for i in range(len(self)) if needle in self.text_at(i).lower()], dtype=np.int64)
+            buffer, needle = self._lower_text, needle.lower()
+        else:
+            buffer = self.text
+        
+        positions = []
+        pos = buffer.find(needle)
+        while pos != -1:
+            positions.append(pos)
+            pos = buffer.find(needle, pos + 1)
+        if not positions:
+            return np.empty(0, dtype=np.int64)
+        
+        # The needle cannot contain the separator, so every match lies inside one word
+        indices = np.searchsorted(self.offsets, np.array(positions), side="right") - 1
+        return np.unique(indices)
+    
+    def within(self, x0: float, top: float, x1: float, bottom: float) -> np.ndarray:
+        """Get indices of words whose box lies entirely inside a region"""
+        b = self.bboxes
+        mask = (b[:, 0] >= x0) & (b[:, 1] >= top) & (b[:, 2] <= x1) & (b[:, 3] <= bottom)
+        return np.nonzero(mask)[0]
+    
+    def block(self, index: int) -> Dict[str, Any]:
+        """Get one word in the highlight dict shape"""
+        return {
+            "text": self.text_at(index),
+            "bbox": [round(float(v), 3) for v in self.bboxes[index]],
+            "size": round(float(self.sizes[index]), 3)
+        }
+    
+    def highlights(self, indices: Iterable[int], highlight_type: str) -> List[Dict[str, Any]]:
+        """Serialise words to highlight JSON"""
+        highlights = []
+        for index in indices:
+            block = self.block(int(index))
+            highlights.append({
+                "text": block["text"],
+                "bbox": block["bbox"],
+                "type": highlight_type
+            })
+        return highlights
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Serialise every word to the block dict shape"""
+        return [self.block(i) for i in range(len(self))]
+    
+    def nbytes(self) -> int:
+        """Approximate memory used by this page's storage"""
+        return len(self.text) + self.offsets.nbytes + self.bboxes.nbytes + self.sizes.nbytes
+
+
+def extract_page_blocks(page) -> PageBlocks:
+    """
+    Extract word blocks with positions (for highlighting) from a pdfplumber page
+
+    Kept as PageBlocks rather than per-word dicts; call to_dicts() where JSON is needed.
+    """
+    return PageBlocks.from_words(page.extract_words())
+
+
+class LazyPageBlocks:
+    """Memoise per-page PageBlocks in a small LRU, loading pages on first access"""
+
+    def __init__(self, pdf_path: str, capacity: int = None):
+        self.pdf_path = pdf_path
+        self.capacity = ProcessingConfig.PAGE_BLOCK_CACHE_PAGES if capacity is None else capacity
+        self._pages: "OrderedDict[int, PageBlocks]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, page_num: int) -> PageBlocks:
+        """Get word blocks for a page (1-based), extracting them if needed"""
+        return self.get_many([page_num])[page_num]
+
+    def get_many(self, page_nums: List[int]) -> Dict[int, PageBlocks]:
+        """Get word blocks for several pages, opening the PDF at most once"""
+        result = {}
+        missing = []
+        with self._lock:
+            for page_num in dict.fromkeys(page_nums):
+                if page_num in self._pages:
+                    self._pages.move_to_end(page_num)
+                    result[page_num] = self._pages[page_num]
+                    self.hits += 1
+                else:
+                    missing.append(page_num)
+
+        if missing:
+            loaded = self._load(missing)
+            with self._lock:
+                for page_num, blocks in loaded.items():
+                    self._pages[page_num] = blocks
+                    self._pages.move_to_end(page_num)
+                    result[page_num] = blocks
+                while len(self._pages) > self.capacity:
+                    self._pages.popitem(last=False)
+
+        return result
+
+    def _load(self, page_nums: List[int]) -> Dict[int, PageBlocks]:
+        loaded = {}
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for page_num in page_nums:
+                if 1 <= page_num <= len(pdf.pages):
+                    page = pdf.pages[page_num - 1]
+                    loaded[page_num] = PageBlocks.from_words(page.extract_words())
+                    page.flush_cache()
+                else:
+                    loaded[page_num] = PageBlocks.from_words([])
+        self.loads += len(page_nums)
+        return loaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memoisation statistics"""
+        with self._lock:
+            return {
+                "cached_pages": len(self._pages),
+                "cached_bytes": sum(blocks.nbytes() for blocks in self._pages.values()),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "loads": self.loads
+            }
@@ -0,0 +1,173 @@
+"""
+Markdown line -> PDF page mapping
+Stored as sorted run boundaries (the first line of each page run) with bisect lookup,
+instead of one dict entry per markdown line
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+# Page number used for runs of lines that have no page
+UNMAPPED = 0
+
+
+class PageMap(Mapping):
+    """
+    Read-only line -> page mapping backed by two parallel arrays
+
+    starts[i] is the first line of run i and pages[i] its page; the run ends
+    where the next one starts (or at total_lines). Behaves like the old
+    {line: page} dict, so page_mapping.get(line_num, 1) keeps working.
+    """
+
+    def __init__(self, starts: List[int] = None, pages: List[int] = None, total_lines: int = 0):
+        """
+        Args:
+            starts: Strictly increasing first line of each run
+            pages: Page of each run (UNMAPPED for lines without a page)
+            total_lines: Number of markdown lines covered
+        """
+        self.starts: List[int] = []
+        self.pages: List[int] = []
+        self.total_lines = total_lines
+
+        # Merge adjacent runs on the same page
+        for start, page in zip(starts or [], pages or []):
+            if start >= total_lines:
+                break
+            if self.pages and self.pages[-1] == page:
+                continue
+            self.starts.append(start)
+            self.pages.append(page)
+
+        self._mapped_lines = sum(
+            end - start for start, end, page in self.runs() if page != UNMAPPED
+        )
+
+    @classmethod
+    def from_dict(cls, mapping: Dict[int, int], total_lines: int = None) -> "PageMap":
+        """Build from a {line: page} dict (lines missing from the dict stay unmapped)"""
+        if total_lines is None:
+            total_lines = max(mapping) + 1 if mapping else 0
+        starts, pages = [], []
+        for line_num in range(total_lines):
+            page = mapping.get(line_num, UNMAPPED)
+            if not pages or pages[-1] != page:
+                starts.append(line_num)
+                pages.append(page)
+        return cls(starts, pages, total_lines)
+
+    @classmethod
+    def from_boundaries(cls, boundaries: List[Tuple[int, int]], total_lines: int) -> "PageMap":
+        """
+        Build from (first_line, page) page boundaries
+        
+        Every line belongs to the page of the nearest boundary at or above it;
+        lines before the first boundary belong to the first boundary's page.
+        """
+        starts, pages = [], []
+        for line_num, page in sorted(boundaries):
+            if line_num >= total_lines:
+                break
+            if line_num < 0 or (starts and starts[-1] == line_num):
+                continue
+            starts.append(line_num)
+            pages.append(page)
+        if starts:
+            starts[0] = 0
+        return cls(starts, pages, total_lines)
+
+    @classmethod
+    def from_sparse(cls, mapping: Dict[int, int], total_lines: int) -> "PageMap":
+        """
+        Build from a partial {line: page} dict, filling gaps in one sweep
+
+        Unmapped lines take the page of the previous mapped line (or of the first
+        mapped line when they come before it); an empty mapping puts every line on page 1.
+        """
+        if not mapping:
+            return cls([0], [1], total_lines)
+        return cls.from_boundaries(list(mapping.items()), total_lines)
+
+    @classmethod
+    def from_wire(cls, data: Optional[Dict[str, Any]]) -> "PageMap":
+        """Build from to_wire() output, or from the legacy {"line": page} JSON object"""
+        if not data:
+            return cls()
+        if isinstance(data, PageMap):
+            return data
+        if "starts" in data and "pages" in data:
+            return cls(data["starts"], data["pages"], data.get("lines", 0))
+        return cls.from_dict({int(line): page for line, page in data.items()})
+
+    def to_wire(self) -> Dict[str, Any]:
+        """Compact JSON form: {"starts": [...], "pages": [...], "lines": total_lines}"""
+        return {"starts": self.starts, "pages": self.pages, "lines": self.total_lines}
+
+    def runs(self) -> Iterator[tuple]:
+        """Yield (first_line, end_line_exclusive, page) for every run"""
+        for i, start in enumerate(self.starts):
+            end = self.starts[i + 1] if i + 1 < len(self.starts) else self.total_lines
+            yield start, end, self.pages[i]
+
+    def page_counts(self) -> Dict[int, int]:
+        """Number of lines on each page"""
+        counts: Dict[int, int] = {}
+        for start, end, page in self.runs():
+            if page != UNMAPPED:
+                counts[page] = counts.get(page, 0) + end - start
+        return counts
+
+    def get(self, line_num: int, default: Any = None) -> Any:
+        """Page of a line, or default when the line has no page"""
+        if not isinstance(line_num, int) or not 0 <= line_num < self.total_lines:
+            return default
+        index = bisect_right(self.starts, line_num) - 1
+        if index < 0 or self.pages[index] == UNMAPPED:
+            return default
+        return self.pages[index]
+
+    def __getitem__(self, line_num: int) -> int:
+        page = self.get(line_num)
+        if page is None:
+            raise KeyError(line_num)
+        return page
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end, page in self.runs():
+            if page != UNMAPPED:
+                yield from range(start, end)
+
+    def __len__(self) -> int:
+        return self._mapped_lines
+
+    def __repr__(self) -> str:
+        return f"PageMap(runs={len(self.starts)}, lines={self.total_lines})"
+
+
+class LineLocator:
+    """Locate lines of a markdown document by content, searching forward from a position"""
+
+    PREFIX_LENGTH = 30
+
+    def __init__(self, lines: List[str]):
+        # stripped line -> sorted line numbers, and the same keyed by the first PREFIX_LENGTH characters
+        self._exact: Dict[str, List[int]] = {}
+        self._prefix: Dict[str, List[int]] = {}
+        for line_num, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped:
+                self._exact.setdefault(stripped, []).append(line_num)
+                self._prefix.setdefault(stripped[:self.PREFIX_LENGTH], []).append(line_num)
+
+    def find(self, text: str, start: int = 0) -> Optional[int]:
+        """First line at or after start equal to text (or sharing its prefix)"""
+        text = text.strip()
+        for index, key in ((self._exact, text), (self._prefix, text[:self.PREFIX_LENGTH])):
+            candidates = index.get(key)
+            if candidates:
+                position = bisect_left(candidates, start)
+                if position < len(candidates):
+                    return candidates[position]
+        return None
@@ -1,36 +1,77 @@
 import re
-from typing import List, Dict, Any, Optional, Tuple
-from fuzzywuzzy import fuzz
-from fuzzywuzzy import process
+from functools import partial
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from rapidfuzz import fuzz
+
+from aho_corasick import AhoCorasick, build_name_matcher
+from fuzzy_matcher import BatchFuzzyMatcher
+from page_blocks import LazyPageBlocks, PageBlocks
+from value_extraction import ValueExtractor, VALUE_AFTER_NAME
 
 
 class ParameterExtractor:
     """Extract engineering parameters from PDF text"""
     
-    def __init__(self, pdf_text: str, pdf_pages: List[Dict[str, Any]]):
+    def __init__(self, pdf_text: str, pdf_pages: List[Dict[str, Any]],
+                 page_blocks: Optional[LazyPageBlocks] = None):
         self.pdf_text = pdf_text
         self.pdf_pages = pdf_pages
+        self.page_blocks = page_blocks
         self.fuzzy_threshold = 80
+        self.value_extractor = ValueExtractor("pdf_text")
+        self._fuzzy_candidates = None
+        self._fuzzy_matcher = None
+        self._lines = None
     
     def extract_parameter(self, param_name: str) -> Dict[str, Any]:
         """Extract a single parameter from PDF"""
+        return next(self.iter_parameters([param_name]))[1]
+    
+    def extract_parameters(self, param_names: List[str],
+                           aliases: Optional[Dict[str, List[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract several parameters from PDF
         
-        # Try exact match first
-        result = self._exact_match(param_name)
-        if result:
-            return result
+        Args:
+            param_names: Parameter names to extract
+            aliases: Optional parameter name -> alternative names also accepted by the exact tier
         
-        # Try fuzzy match
-        result = self._fuzzy_match(param_name)
-        if result:
-            return result
+        Returns:
+            one result per parameter, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(param_names)
+        for i, result in self.iter_parameters(param_names, aliases):
+            results[i] = result
+        return results
+    
+    def iter_parameters(self, param_names: List[str],
+                        aliases: Optional[Dict[str, List[str]]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (index into param_names, result) for every parameter as soon as it is resolved
         
-        # Try pattern-based extraction
-        result = self._pattern_match(param_name)
-        if result:
-            return result
+        Runs each tier (exact, fuzzy, pattern) once for every parameter still
+        unresolved, so the document is scanned per tier instead of per parameter.
+        A tier's results are yielded in index order before the next tier runs.
+        """
+        pending = list(range(len(param_names)))
+        tiers = (partial(self._exact_match_batch, aliases=aliases),
+                 self._fuzzy_match_batch, self._pattern_match_batch)
+        for tier in tiers:
+            if not pending:
+                break
+            unresolved = []
+            for i, result in zip(pending, tier([param_names[i] for i in pending])):
+                if result:
+                    yield i, result
+                else:
+                    unresolved.append(i)
+            pending = unresolved
         
-        # Not found
+        for i in pending:
+            yield i, self._not_found(param_names[i])
+    
+    def _not_found(self, param_name: str) -> Dict[str, Any]:
+        """Result for a parameter no tier could find"""
         return {
             "name": param_name,
             "value": "NF",
@@ -46,125 +87,200 @@ class ParameterExtractor:
     
     def _exact_match(self, param_name: str) -> Optional[Dict[str, Any]]:
         """Try exact parameter name match"""
+        return self._exact_match_batch([param_name])[0]
+    
+    def _exact_match_batch(self, param_names: List[str],
+                           aliases: Optional[Dict[str, List[str]]] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Find the first occurrence of each parameter name (or alias) that is followed by a value
+        
+        All names are matched together in one Aho-Corasick scan per page.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(param_names)
+        matcher, owners = build_name_matcher(param_names, aliases)
+        pending = set(range(len(param_names)))
+        
         for page in self.pdf_pages:
+            if not pending:
+                break
             page_text = page["text"]
+            values_after = {}
             
-            # Search for parameter name (case-insensitive)
-            pattern = re.escape(param_name)
-            matches = list(re.finditer(pattern, page_text, re.IGNORECASE))
-            
-            if matches:
+            for start, end, pattern_index in self._find_names(matcher, page_text):
+                waiting = [i for i in owners[pattern_index] if i in pending]
+                if not waiting:
+                    continue
+                
                 # Try to extract value after the parameter name
-                for match in matches:
-                    value_info = self._extract_value_after_match(
-                        page_text, match.end()
-                    )
-                    if value_info:
-                        highlights = self._find_highlights(
-                            page["blocks"], 
-                            param_name, 
-                            value_info["value"]
-                        )
-                        
-                        return {
-                            "name": param_name,
-                            "value": value_info["value"],
-                            "unit": value_info["unit"],
-                            "source_page": page["page_number"],
-                            "extraction_method": "exact_match",
-                            "confidence": 95,
-                            "manually_edited": False,
-                            "source_text": value_info["context"],
-                            "notes": "",
-                            "highlights": highlights
-                        }
+                if end not in values_after:
+                    values_after[end] = self._extract_value_after_match(page_text, end)
+                value_info = values_after[end]
+                if value_info:
+                    for i in waiting:
+                        results[i] = self._exact_result(param_names[i], page_text[start:end], page, value_info)
+                        pending.discard(i)
         
-        return None
+        return results
+    
+    def _find_names(self, matcher: AhoCorasick, text: str) -> List[Tuple[int, int, int]]:
+        """Case-insensitive occurrences of the matcher's patterns, ordered by start offset"""
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return matcher.find_all(lowered)
+        
+        # Lowercasing changed character counts (rare Unicode), offsets no longer line up
+        occurrences = []
+        for pattern_index, pattern in enumerate(matcher.patterns):
+            for match in re.finditer(re.escape(pattern), text, re.IGNORECASE):
+                occurrences.append((match.start(), match.end(), pattern_index))
+        return sorted(occurrences)
+    
+    def _exact_result(self, param_name: str, matched_text: str, page: Dict[str, Any],
+                      value_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the result for an exact name match"""
+        highlights = self._find_highlights(
+            self._get_page_blocks(page), 
+            matched_text, 
+            value_info["value"]
+        )
+        
+        return {
+            "name": param_name,
+            "value": value_info["value"],
+            "unit": value_info["unit"],
+            "source_page": page["page_number"],
+            "extraction_method": "exact_match",
+            "confidence": 95,
+            "manually_edited": False,
+            "source_text": value_info["context"],
+            "notes": "",
+            "highlights": highlights
+        }
     
     def _fuzzy_match(self, param_name: str) -> Optional[Dict[str, Any]]:
         """Try fuzzy matching for parameter name"""
-        best_match = None
-        best_score = 0
+        return self._fuzzy_match_batch([param_name])[0]
+    
+    def _page_lines(self) -> List[Tuple[Dict[str, Any], str, str]]:
+        """Every text line as (page, line, lowercased line), split once per document"""
+        if self._lines is None:
+            self._lines = [
+                (page, line, line.lower())
+                for page in self.pdf_pages
+                for line in page["text"].split('\n')
+            ]
+        return self._lines
+    
+    def _build_fuzzy_candidates(self):
+        """Collect the potential parameter name of every line that carries a value"""
+        self._fuzzy_candidates = []
+        for page, line, _ in self._page_lines():
+            # Split line into potential parameter names
+            potential_param = re.split(r'[:=\t]', line)[0].strip()
+            if not potential_param:
+                continue
+            
+            value_info = self._extract_value_from_line(line)
+            if value_info:
+                self._fuzzy_candidates.append((page, line, potential_param, value_info))
         
-        for page in self.pdf_pages:
-            page_text = page["text"]
-            lines = page_text.split('\n')
+        self._fuzzy_matcher = BatchFuzzyMatcher(
+            [candidate[2].lower() for candidate in self._fuzzy_candidates],
+            scorer=fuzz.ratio
+        )
+    
+    def _fuzzy_match_batch(self, param_names: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Fuzzy match several parameters against every line in one scoring pass"""
+        if self._fuzzy_matcher is None:
+            self._build_fuzzy_candidates()
+        
+        ranked = self._fuzzy_matcher.top_k(
+            [name.lower() for name in param_names],
+            k=1,
+            threshold=self.fuzzy_threshold
+        )
+        
+        results = []
+        for param_name, param_ranked in zip(param_names, ranked):
+            if not param_ranked:
+                results.append(None)
+                continue
             
-            for line in lines:
-                # Split line into potential parameter names
-                parts = re.split(r'[:=\t]', line)
-                if not parts:
-                    continue
-                
-                potential_param = parts[0].strip()
-                if not potential_param:
-                    continue
-                
-                # Calculate fuzzy match score
-                score = fuzz.ratio(param_name.lower(), potential_param.lower())
-                
-                if score >= self.fuzzy_threshold and score > best_score:
-                    # Try to extract value
-                    value_info = self._extract_value_from_line(line)
-                    if value_info:
-                        best_score = score
-                        highlights = self._find_highlights(
-                            page["blocks"], 
-                            potential_param, 
-                            value_info["value"]
-                        )
-                        
-                        best_match = {
-                            "name": param_name,
-                            "value": value_info["value"],
-                            "unit": value_info["unit"],
-                            "source_page": page["page_number"],
-                            "extraction_method": "fuzzy_match",
-                            "confidence": min(score, 90),
-                            "manually_edited": False,
-                            "source_text": line.strip(),
-                            "notes": f"Matched with: {potential_param}",
-                            "highlights": highlights
-                        }
-        
-        return best_match
+            # Best score, earliest line on ties
+            choice_idx, score = param_ranked[0]
+            page, line, potential_param, value_info = self._fuzzy_candidates[choice_idx]
+            highlights = self._find_highlights(
+                self._get_page_blocks(page), 
+                potential_param, 
+                value_info["value"]
+            )
+            
+            results.append({
+                "name": param_name,
+                "value": value_info["value"],
+                "unit": value_info["unit"],
+                "source_page": page["page_number"],
+                "extraction_method": "fuzzy_match",
+                "confidence": min(score, 90),
+                "manually_edited": False,
+                "source_text": line.strip(),
+                "notes": f"Matched with: {potential_param}",
+                "highlights": highlights
+            })
+        
+        return results
     
     def _pattern_match(self, param_name: str) -> Optional[Dict[str, Any]]:
         """Try pattern-based extraction for common parameter types"""
+        return self._pattern_match_batch([param_name])[0]
+    
+    def _pattern_match_batch(self, param_names: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Find, for each parameter, the first line containing one of its keywords and a value
         
-        # Extract key words from parameter name
-        keywords = self._extract_keywords(param_name)
+        A single pass over the document lines serves every parameter.
+        """
+        # Extract key words from parameter names
+        keywords = [self._extract_keywords(name) for name in param_names]
+        lowered = [[kw.lower() for kw in kws] for kws in keywords]
+        pending = [i for i, kws in enumerate(keywords) if kws]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(param_names)
         
-        for page in self.pdf_pages:
-            page_text = page["text"]
-            lines = page_text.split('\n')
+        for page, line, line_lower in self._page_lines():
+            if not pending:
+                break
+            
+            # Check which parameters have a keyword on this line
+            hits = [i for i in pending if any(kw in line_lower for kw in lowered[i])]
+            if not hits:
+                continue
+            
+            value_info = self._extract_value_from_line(line)
+            if not value_info:
+                continue
             
-            for line in lines:
-                # Check if line contains any keywords
-                line_lower = line.lower()
-                if any(kw.lower() in line_lower for kw in keywords):
-                    value_info = self._extract_value_from_line(line)
-                    if value_info:
-                        highlights = self._find_highlights(
-                            page["blocks"], 
-                            keywords[0] if keywords else param_name, 
-                            value_info["value"]
-                        )
-                        
-                        return {
-                            "name": param_name,
-                            "value": value_info["value"],
-                            "unit": value_info["unit"],
-                            "source_page": page["page_number"],
-                            "extraction_method": "pattern_match",
-                            "confidence": 75,
-                            "manually_edited": False,
-                            "source_text": line.strip(),
-                            "notes": "Extracted using pattern matching",
-                            "highlights": highlights
-                        }
+            for i in hits:
+                highlights = self._find_highlights(
+                    self._get_page_blocks(page), 
+                    keywords[i][0], 
+                    value_info["value"]
+                )
+                
+                results[i] = {
+                    "name": param_names[i],
+                    "value": value_info["value"],
+                    "unit": value_info["unit"],
+                    "source_page": page["page_number"],
+                    "extraction_method": "pattern_match",
+                    "confidence": 75,
+                    "manually_edited": False,
+                    "source_text": line.strip(),
+                    "notes": "Extracted using pattern matching",
+                    "highlights": highlights
+                }
+            pending = [i for i in pending if results[i] is None]
         
-        return None
+        return results
     
     def _extract_value_after_match(self, text: str, start_pos: int) -> Optional[Dict[str, Any]]:
         """Extract value after a parameter name match"""
@@ -173,8 +289,7 @@ class ParameterExtractor:
         
         # Look for value patterns
         # Pattern: optional separator + number + optional unit
-        pattern = r'[:=\s]*([+-]?\d+\.?\d*\s*(?:to|-|–)\s*[+-]?\d+\.?\d*|[+-]?\d+\.?\d*)\s*([A-Za-z°%/]+)?'
-        match = re.search(pattern, remaining_text)
+        match = VALUE_AFTER_NAME.search(remaining_text)
         
         if match:
             value = match.group(1).strip()
@@ -194,23 +309,14 @@ class ParameterExtractor:
         return None
     
     def _extract_value_from_line(self, line: str) -> Optional[Dict[str, Any]]:
-        """Extract value from a line of text"""
-        # Pattern for value extraction
-        patterns = [
-            r'[:=]\s*([+-]?\d+\.?\d*\s*(?:to|-|–)\s*[+-]?\d+\.?\d*|[+-]?\d+\.?\d*)\s*([A-Za-z°%/]+)?',
-            r'\s+([+-]?\d+\.?\d*\s*(?:to|-|–)\s*[+-]?\d+\.?\d*|[+-]?\d+\.?\d*)\s*([A-Za-z°%/]+)?'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line)
-            if match:
-                value = match.group(1).strip()
-                unit = match.group(2).strip() if match.group(2) else ""
-                return {
-                    "value": value,
-                    "unit": unit,
-                    "context": line.strip()
-                }
+        """Extract value from a line of text (memoised per document)"""
+        value_info = self.value_extractor.extract(line)
+        if value_info:
+            return {
+                "value": value_info["value"],
+                "unit": value_info["unit"],
+                "context": line.strip()
+            }
         
         return None
     
@@ -222,28 +328,15 @@ class ParameterExtractor:
         keywords = [w for w in words if w.lower() not in common_words]
         return keywords
     
-    def _find_highlights(self, blocks: List[Dict], param_text: str, value_text: str) -> List[Dict[str, Any]]:
+    def _get_page_blocks(self, page: Dict[str, Any]) -> PageBlocks:
+        """Get word blocks for a page, loading them on demand when a provider is set"""
+        if self.page_blocks is not None:
+            return self.page_blocks.get(page["page_number"])
+        return PageBlocks.coerce(page.get("blocks"))
+    
+    def _find_highlights(self, blocks: PageBlocks, param_text: str, value_text: str) -> List[Dict[str, Any]]:
         """Find text positions for highlighting in PDF"""
-        highlights = []
-        
-        # Search for parameter name
-        for block in blocks:
-            block_text = block.get("text", "")
-            if param_text.lower() in block_text.lower():
-                highlights.append({
-                    "text": block_text,
-                    "bbox": block.get("bbox", []),
-                    "type": "parameter"
-                })
-        
-        # Search for value
-        for block in blocks:
-            block_text = block.get("text", "")
-            if value_text in block_text:
-                highlights.append({
-                    "text": block_text,
-                    "bbox": block.get("bbox", []),
-                    "type": "value"
-                })
-        
+        # Search for parameter name, then for value
+        highlights = blocks.highlights(blocks.find(param_text, ignore_case=True), "parameter")
+        highlights.extend(blocks.highlights(blocks.find(value_text), "value"))
         return highlights
@@ -1,88 +1,186 @@
-from PyPDF2 import PdfReader
+import multiprocessing
+import os
 import pdfplumber
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import ProcessingConfig
+from page_blocks import extract_page_blocks
+
+
+def _parse_page(page, page_num: int, tables: Optional[List[Dict[str, Any]]],
+                include_blocks: bool = True) -> Dict[str, Any]:
+    """Extract text and optionally word blocks and tables from one pdfplumber page"""
+    page_text = page.extract_text() or ""
+    
+    page_data = {
+        "page_number": page_num,
+        "text": page_text,
+        "width": page.width,
+        "height": page.height
+    }
+    
+    # Extract text blocks with positions for highlighting
+    if include_blocks:
+        page_data["blocks"] = extract_page_blocks(page)
+    
+    if tables is not None:
+        for table in page.extract_tables():
+            if table:
+                tables.append({
+                    "page_number": page_num,
+                    "data": table
+                })
+    
+    # Release pdfminer layout objects as we go
+    page.flush_cache()
+    
+    return page_data
+
+
+def _parse_pages(pdf, first_page: int, last_page: int, include_tables: bool = False,
+                 include_blocks: bool = True) -> Tuple[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+    """Parse pages first_page..last_page (1-based, inclusive) of an open pdfplumber document"""
+    pages = []
+    tables = [] if include_tables else None
+    for page_num in range(first_page, last_page + 1):
+        pages.append(_parse_page(pdf.pages[page_num - 1], page_num, tables, include_blocks))
+    return pages, tables
+
+
+def _parse_page_range(pdf_path: str, first_page: int, last_page: int = None,
+                      include_tables: bool = False, include_blocks: bool = True) -> Tuple[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+    """
+    Parse pages first_page..last_page (1-based, inclusive) of a PDF
+    
+    Opens the file independently so it can run in a worker process.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        return _parse_pages(pdf, first_page, last_page or len(pdf.pages), include_tables, include_blocks)
+
+
+def _split_page_ranges(page_count: int, shards: int) -> List[Tuple[int, int]]:
+    """Split pages 1..page_count into contiguous, near-equal ranges"""
+    shards = max(1, min(shards, page_count))
+    base, extra = divmod(page_count, shards)
+    ranges = []
+    first = 1
+    for shard in range(shards):
+        last = first + base + (1 if shard < extra else 0) - 1
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
 
 
 class PDFProcessor:
     """Process PDF files to extract text and metadata"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, include_tables: bool = False, workers: int = None,
+                 include_blocks: bool = True):
+        """
+        Args:
+            pdf_path: Path to the PDF file
+            include_tables: Also extract tables during the parsing pass
+            include_blocks: Extract word blocks for highlighting, stored as page_blocks.PageBlocks
+                under each page's "blocks" key. Set to False to extract
+                text only and load blocks on demand with page_blocks.LazyPageBlocks
+            workers: Processes used for page extraction. None reads PDF_PAGE_WORKERS from config,
+                0 uses every CPU core, 1 parses serially
+        """
         self.pdf_path = pdf_path
-        self.reader = PdfReader(pdf_path)
+        self.include_tables = include_tables
+        self.include_blocks = include_blocks
+        self.workers = ProcessingConfig.PDF_PAGE_WORKERS if workers is None else workers
+        self._pages = None
+        self._tables = None
     
-    def extract_text(self) -> str:
-        """Extract all text from PDF"""
-        text = ""
-        for page in self.reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+    def _worker_count(self, page_count: int) -> int:
+        if page_count < ProcessingConfig.PDF_PARALLEL_MIN_PAGES:
+            return 1
+        workers = self.workers or os.cpu_count() or 1
+        return max(1, min(workers, page_count))
     
-    def extract_pages(self) -> List[Dict[str, Any]]:
-        """Extract text from each page separately with metadata"""
-        pages = []
+    def parse(self) -> List[Dict[str, Any]]:
+        """
+        Parse the PDF in a single pdfplumber pass
+        
+        Collects per-page text, word blocks and (if include_tables) tables together;
+        every other method reads from this result instead of re-opening the file.
+        Large documents are sharded by page range across a process pool and merged
+        back in page order.
+        """
+        if self._pages is not None and (self._tables is not None or not self.include_tables):
+            return self._pages
         
-        # Use pdfplumber for better text extraction with positions
         with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                page_text = page.extract_text() or ""
-                
-                # Extract text blocks with positions for highlighting
-                blocks = []
-                words = page.extract_words()
-                for word in words:
-                    blocks.append({
-                        "text": word.get("text", ""),
-                        "bbox": [word.get("x0", 0), word.get("top", 0), 
-                                word.get("x1", 0), word.get("bottom", 0)],
-                        "size": word.get("height", 0)
-                    })
-                
-                pages.append({
-                    "page_number": page_num,
-                    "text": page_text,
-                    "blocks": blocks,
-                    "width": page.width,
-                    "height": page.height
-                })
+            page_count = len(pdf.pages)
+            workers = self._worker_count(page_count)
+            if workers <= 1:
+                # Small documents are parsed in this same open, in one pass
+                pages, tables = _parse_pages(pdf, 1, page_count, self.include_tables, self.include_blocks)
+        
+        if workers > 1:
+            ranges = _split_page_ranges(page_count, workers)
+            print(f"   Extracting {page_count} pages with {workers} processes...")
+            
+            pages = []
+            tables = [] if self.include_tables else None
+            # pdfminer is not fork-safe alongside Docling/torch threads, spawn workers instead
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+                shard_results = executor.map(
+                    _parse_page_range,
+                    [self.pdf_path] * len(ranges),
+                    [first for first, _ in ranges],
+                    [last for _, last in ranges],
+                    [self.include_tables] * len(ranges),
+                    [self.include_blocks] * len(ranges)
+                )
+                # map() yields in submission order, so pages stay in document order
+                for shard_pages, shard_tables in shard_results:
+                    pages.extend(shard_pages)
+                    if tables is not None:
+                        tables.extend(shard_tables)
         
+        self._pages = pages
+        self._tables = tables
         return pages
     
+    def extract_text(self) -> str:
+        """Extract all text from PDF"""
+        return "".join(page["text"] + "\n" for page in self.parse())
+
+    def extract_pages(self) -> List[Dict[str, Any]]:
+        """Extract text from each page separately with metadata"""
+        return self.parse()
+
     def extract_tables(self) -> List[Dict[str, Any]]:
         """Extract tables from PDF using pdfplumber"""
-        tables = []
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                page_tables = page.extract_tables()
-                for table in page_tables:
-                    if table:
-                        tables.append({
-                            "page_number": page_num,
-                            "data": table
-                        })
-        return tables
-    
+        if self._tables is None:
+            # Tables were not requested up front, parse again including them
+            self.include_tables = True
+            self.parse()
+        return self._tables
+
     def search_text(self, query: str, page_num: int = None) -> List[Dict[str, Any]]:
         """Search for text in PDF and return positions"""
         results = []
-        
-        with pdfplumber.open(self.pdf_path) as pdf:
-            pages_to_search = [pdf.pages[page_num - 1]] if page_num else pdf.pages
-            
-            for page_idx, page in enumerate(pages_to_search):
-                actual_page_num = page_num if page_num else page_idx + 1
-                page_text = page.extract_text() or ""
-                
-                # Simple text search
-                if query.lower() in page_text.lower():
-                    results.append({
-                        "page_number": actual_page_num,
-                        "bbox": [0, 0, 0, 0],  # Simplified bbox
-                        "text": query
-                    })
-        
+
+        pages = self.parse()
+        pages_to_search = [pages[page_num - 1]] if page_num else pages
+
+        for page in pages_to_search:
+            # Simple text search
+            if query.lower() in page["text"].lower():
+                results.append({
+                    "page_number": page["page_number"],
+                    "bbox": [0, 0, 0, 0],  # Simplified bbox
+                    "text": query
+                })
+
         return results
-    
+
     def close(self):
-        """Close the PDF document"""
-        # PyPDF2 doesn't require explicit closing
-        pass
+        """Release parsed page data"""
+        self._pages = None
+        self._tables = None
@@ -0,0 +1,523 @@
+"""
+Storage backends for per-session document state
+
+MemoryBackend keeps live objects in this process (single worker). DiskBackend and
+RedisBackend store JSON records that every uvicorn worker on the host can read, so an
+upload handled by one worker is visible to /api/extract on another. Uploaded files stay
+in the host's uploads/ directory, so sessions are not shared across hosts.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+
+class SessionBackend:
+    """
+    Interface implemented by every backend
+
+    Records are dicts of session fields. Shared backends (shared = True) only
+    receive JSON-serialisable values; SessionStore converts to and from them.
+    """
+
+    shared = False
+
+    def create(self, session_id: str, record: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session's record and mark it as recently used, or None if it does not exist"""
+        raise NotImplementedError
+
+    def update(self, session_id: str, fields: Dict[str, Any], size: int) -> bool:
+        """Merge fields into an existing record; returns False if the session does not exist"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def prune(self) -> List[str]:
+        """Drop expired and over-cap sessions, returning their ids"""
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemoryBackend(SessionBackend):
+    """Sessions held in this process with TTL expiry and LRU eviction by count and size"""
+
+    def __init__(self, ttl_seconds: float, max_sessions: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # session id -> {"data", "last_access", "size"}, least recently used first
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, session_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sessions[session_id] = {"data": record, "last_access": time.time(), "size": 0}
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            entry["last_access"] = time.time()
+            self._sessions.move_to_end(session_id)
+            return entry["data"]
+
+    def update(self, session_id: str, fields: Dict[str, Any], size: int) -> bool:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return False
+            entry["data"].update(fields)
+            entry["size"] = size
+            entry["last_access"] = time.time()
+            self._sessions.move_to_end(session_id)
+            return True
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def prune(self) -> List[str]:
+        evicted = []
+        with self._lock:
+            cutoff = time.time() - self.ttl_seconds
+            for session_id in [sid for sid, entry in self._sessions.items() if entry["last_access"] < cutoff]:
+                del self._sessions[session_id]
+                evicted.append(session_id)
+
+            total = sum(entry["size"] for entry in self._sessions.values())
+            # The most recently used session always stays, even if it alone exceeds max_bytes
+            while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or total > self.max_bytes):
+                session_id, entry = self._sessions.popitem(last=False)
+                total -= entry["size"]
+                evicted.append(session_id)
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "size_bytes": sum(entry["size"] for entry in self._sessions.values())
+            }
+
+
+class _DirectoryLock:
+    """Cross-process lock built on exclusive file creation (works on Windows and POSIX)"""
+
+    STALE_SECONDS = 30
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __enter__(self):
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    # A worker that died while holding the lock leaves the file behind
+                    if time.time() - self.path.stat().st_mtime > self.STALE_SECONDS:
+                        self.path.unlink()
+                except FileNotFoundError:
+                    pass
+                time.sleep(0.005)
+
+    def __exit__(self, *exc):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class DiskBackend(SessionBackend):
+    """
+    Two JSON files per session: small mutable state and the converted document
+
+    Point SESSION_DIR at a tmpfs such as /dev/shm to keep sessions in shared RAM
+    across workers. Frequent small updates (parameters, conversion progress) only
+    rewrite the state file, and each worker keeps the parsed document until its file
+    changes, so a read does not re-parse markdown, pages and line boxes. The state
+    file's modification time is the session's last access.
+    """
+
+    shared = True
+    SUFFIX = ".session.json"
+    DOCUMENT_SUFFIX = ".document.json"
+    # Large fields written once per conversion; everything else lives in the state file
+    DOCUMENT_FIELDS = frozenset({"markdown", "pdf_text", "pdf_pages", "page_mapping", "line_boxes"})
+
+    def __init__(self, directory: str, ttl_seconds: float, max_sessions: int, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._lock_path = self.directory / ".lock"
+        # session id -> ((mtime_ns, size), document fields), least recently used first
+        self._documents: "OrderedDict[str, tuple]" = OrderedDict()
+        self._documents_lock = threading.Lock()
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{Path(session_id).name}{self.SUFFIX}"
+
+    def _document_path(self, session_id: str) -> Path:
+        return self.directory / f"{Path(session_id).name}{self.DOCUMENT_SUFFIX}"
+
+    def _split(self, fields: Dict[str, Any]) -> tuple:
+        state = {name: value for name, value in fields.items() if name not in self.DOCUMENT_FIELDS}
+        document = {name: value for name, value in fields.items() if name in self.DOCUMENT_FIELDS}
+        return state, document
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, path: Path, record: Dict[str, Any]) -> None:
+        # Readers in other workers see either the old or the new file, never a partial one
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def _document(self, session_id: str) -> Dict[str, Any]:
+        """A session's document fields, parsed again only when the file changed"""
+        path = self._document_path(session_id)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return {}
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._documents_lock:
+            cached = self._documents.get(session_id)
+            if cached is not None and cached[0] == version:
+                self._documents.move_to_end(session_id)
+                return cached[1]
+
+        document = self._read(path) or {}
+        with self._documents_lock:
+            self._documents[session_id] = (version, document)
+            self._documents.move_to_end(session_id)
+            while len(self._documents) > self.max_sessions:
+                self._documents.popitem(last=False)
+        return document
+
+    def _forget(self, session_id: str) -> None:
+        with self._documents_lock:
+            self._documents.pop(session_id, None)
+
+    def create(self, session_id: str, record: Dict[str, Any]) -> None:
+        state, document = self._split(record)
+        with _DirectoryLock(self._lock_path):
+            self._write(self._document_path(session_id), document)
+            self._write(self._path(session_id), state)
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(session_id)
+        state = self._read(path)
+        if state is None:
+            return None
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            return None
+        return {**self._document(session_id), **state}
+
+    def update(self, session_id: str, fields: Dict[str, Any], size: int) -> bool:
+        path = self._path(session_id)
+        state_fields, document_fields = self._split(fields)
+        with _DirectoryLock(self._lock_path):
+            state = self._read(path)
+            if state is None:
+                return False
+            if document_fields:
+                document = {**self._document(session_id), **document_fields}
+                self._write(self._document_path(session_id), document)
+            # Rewriting (or touching) the state file also marks the session as used
+            if state_fields:
+                state.update(state_fields)
+                self._write(path, state)
+            else:
+                os.utime(path, None)
+        return True
+
+    def delete(self, session_id: str) -> bool:
+        self._forget(session_id)
+        self._document_path(session_id).unlink(missing_ok=True)
+        try:
+            self._path(session_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            session_id = path.name[:-len(self.SUFFIX)]
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            try:
+                size = stat.st_size + self._document_path(session_id).stat().st_size
+            except FileNotFoundError:
+                size = stat.st_size
+            entries.append((stat.st_mtime, session_id, size))
+        return sorted(entries)
+
+    def prune(self) -> List[str]:
+        evicted = []
+        with _DirectoryLock(self._lock_path):
+            entries = self._entries()
+            cutoff = time.time() - self.ttl_seconds
+            total = sum(size for _, _, size in entries)
+            for i, (mtime, session_id, size) in enumerate(entries):
+                remaining = len(entries) - i
+                over_cap = remaining > 1 and (remaining > self.max_sessions or total > self.max_bytes)
+                if mtime >= cutoff and not over_cap:
+                    break
+                self._path(session_id).unlink(missing_ok=True)
+                self._document_path(session_id).unlink(missing_ok=True)
+                self._forget(session_id)
+                total -= size
+                evicted.append(session_id)
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "backend": "disk",
+            "directory": str(self.directory),
+            "sessions": len(entries),
+            "size_bytes": sum(size for _, _, size in entries)
+        }
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RespClient:
+    """Minimal blocking client for the Redis serialisation protocol (RESP2)"""
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                 password: str = None, timeout: float = 5.0):
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str) -> "RespClient":
+        """Build from redis://[:password@]host[:port][/db]"""
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        return cls(parsed.hostname or "localhost", parsed.port or 6379, db, parsed.password)
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self):
+        if self._sock is not None:
+            self._file.close()
+            self._sock.close()
+            self._sock = self._file = None
+
+    def _encode(self, args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise RespError(payload.decode("utf-8"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RespError(f"Unexpected reply type {kind!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        """Send one command and return its reply, reconnecting once if the connection dropped"""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (ConnectionError, OSError):
+                    self.close()
+                    if attempt:
+                        raise
+
+    def pipeline(self, *commands):
+        """Send several commands in one round trip and return their replies"""
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                self._sock.sendall(b"".join(self._encode(args) for args in commands))
+                replies, error = [], None
+                for _ in commands:
+                    try:
+                        replies.append(self._read_reply())
+                    except RespError as e:
+                        replies.append(None)
+                        error = error or e
+            except (ConnectionError, OSError):
+                self.close()
+                raise
+        if error:
+            raise error
+        return replies
+
+
+class RedisBackend(SessionBackend):
+    """
+    Sessions as Redis hashes (one JSON-encoded field per session field)
+
+    Updates only write the fields that changed, so concurrent updates from different
+    workers never overwrite each other. Redis expires idle sessions itself; memory
+    caps are Redis's own (set maxmemory with an allkeys-lru policy). A sorted set of
+    last-access times lets prune() report sessions whose keys Redis dropped, so their
+    uploads can be cleaned up.
+    """
+
+    shared = True
+    # Session ids checked per prune() call
+    PRUNE_BATCH = 256
+    # Refresh an existing session only: KEYS = session, index; ARGV = ttl_ms, now_ms, id, field, value, ...
+    UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+if #ARGV > 3 then redis.call('HSET', KEYS[1], unpack(ARGV, 4)) end
+redis.call('PEXPIRE', KEYS[1], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+return 1
+"""
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "session:"):
+        self.client = RespClient.from_url(url)
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.prefix = prefix
+        self.index_key = prefix + "last_access"
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _fields(self, fields: Dict[str, Any]) -> List[Any]:
+        args = []
+        for name, value in fields.items():
+            args.extend((name, json.dumps(value)))
+        return args
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
+
+    def create(self, session_id: str, record: Dict[str, Any]) -> None:
+        key = self._key(session_id)
+        self.client.pipeline(
+            ("HSET", key, *self._fields(record)),
+            ("PEXPIRE", key, self.ttl_ms),
+            ("ZADD", self.index_key, self._now_ms(), session_id)
+        )
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        key = self._key(session_id)
+        values, _ = self.client.pipeline(("HGETALL", key), ("PEXPIRE", key, self.ttl_ms))
+        if not values:
+            return None
+        self.client.execute("ZADD", self.index_key, "XX", self._now_ms(), session_id)
+        return {values[i].decode("utf-8"): json.loads(values[i + 1]) for i in range(0, len(values), 2)}
+
+    def update(self, session_id: str, fields: Dict[str, Any], size: int) -> bool:
+        # One script, so the key cannot expire between the existence check and HSET
+        # (which would recreate a partial session without a TTL)
+        return bool(self.client.execute(
+            "EVAL", self.UPDATE_SCRIPT, 2, self._key(session_id), self.index_key,
+            self.ttl_ms, self._now_ms(), session_id, *self._fields(fields)
+        ))
+
+    def delete(self, session_id: str) -> bool:
+        deleted, _ = self.client.pipeline(("DEL", self._key(session_id)), ("ZREM", self.index_key, session_id))
+        return bool(deleted)
+
+    def prune(self) -> List[str]:
+        # Only sessions idle for a full TTL can have expired; confirm their keys are gone
+        cutoff = self._now_ms() - self.ttl_ms
+        candidates = self.client.execute("ZRANGEBYSCORE", self.index_key, "-inf", cutoff,
+                                         "LIMIT", 0, self.PRUNE_BATCH)
+        session_ids = [candidate.decode("utf-8") for candidate in candidates or []]
+        if not session_ids:
+            return []
+        exists = self.client.pipeline(*[("EXISTS", self._key(session_id)) for session_id in session_ids])
+        gone = [session_id for session_id, found in zip(session_ids, exists) if not found]
+        if not gone:
+            return []
+        # ZREM succeeds in one worker only, so each session is reported once across workers
+        removed = self.client.pipeline(*[("ZREM", self.index_key, session_id) for session_id in gone])
+        return [session_id for session_id, count in zip(gone, removed) if count]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "host": f"{self.client.host}:{self.client.port}"}
+
+
+def create_backend(backend: str, ttl_seconds: float, max_sessions: int, max_bytes: int,
+                   directory: str = None) -> SessionBackend:
+    """
+    Build a backend from its SESSION_BACKEND setting
+
+    Args:
+        backend: "memory", "disk", or a redis://host:port/db URL
+        directory: Session file directory for the disk backend
+    """
+    if backend == "memory":
+        return MemoryBackend(ttl_seconds, max_sessions, max_bytes)
+    if backend == "disk":
+        return DiskBackend(directory, ttl_seconds, max_sessions, max_bytes)
+    if backend.startswith(("redis://", "rediss://")):
+        if backend.startswith("rediss://"):
+            raise ValueError("TLS Redis URLs are not supported by the built-in client")
+        return RedisBackend(backend, ttl_seconds)
+    raise ValueError(f"Unknown session backend: {backend}")
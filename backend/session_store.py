@@ -0,0 +1,196 @@
+"""
+Per-session document state
+Replaces the single global session dict so concurrent users each keep their own
+PDF, markdown and parameters. Idle sessions expire after a TTL and the least
+recently used ones are evicted when the session count or memory cap is exceeded.
+State lives in a pluggable backend (see session_backends) so several uvicorn
+workers can share it.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from config import ProcessingConfig
+from docling_provenance import LineBoxes
+from page_blocks import LazyPageBlocks
+from page_mapping import PageMap
+from session_backends import SessionBackend, create_backend
+
+
+class SessionNotFoundError(Exception):
+    """Raised when a session id is unknown or its session has expired"""
+
+
+def new_session_data() -> Dict[str, Any]:
+    """Empty state for a new session"""
+    return {
+        "parameters": [],
+        "aliases": {},
+        "pdf_path": None,
+        "pdf_text": None,
+        "pdf_pages": [],
+        "page_blocks": None,
+        "markdown": None,
+        "page_mapping": PageMap(),
+        "line_boxes": LineBoxes(),
+        "total_pages": 0
+    }
+
+
+def estimate_size(data: Dict[str, Any]) -> int:
+    """Approximate memory held by a session's document state, in bytes"""
+    size = len(data.get("markdown") or "") + len(data.get("pdf_text") or "")
+    size += sum(len(page.get("text", "")) for page in data.get("pdf_pages") or [])
+    size += sum(len(name) for name in data.get("parameters") or [])
+    # Run arrays and per-line boxes (one list of four floats each)
+    size += 16 * len(data["page_mapping"].starts) if data.get("page_mapping") is not None else 0
+    size += 64 * len(data.get("line_boxes") or ())
+    if data.get("page_blocks") is not None:
+        size += data["page_blocks"].get_stats()["cached_bytes"]
+    return size
+
+
+def to_record(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-serialisable form of session fields (word blocks are rebuilt from pdf_path instead)"""
+    record = {name: value for name, value in fields.items() if name != "page_blocks"}
+    if "page_mapping" in record:
+        record["page_mapping"] = PageMap.from_wire(record["page_mapping"]).to_wire()
+    if "line_boxes" in record:
+        record["line_boxes"] = LineBoxes.from_wire(record["line_boxes"]).to_wire()
+    return record
+
+
+class SessionStore:
+    """Session id -> state dict store with TTL expiry and LRU eviction"""
+
+    # Shared backends scan files or keys to prune, so they are pruned at most this often
+    SHARED_PRUNE_INTERVAL = 1.0
+
+    def __init__(self, ttl_seconds: int = None, max_sessions: int = None, max_bytes: int = None,
+                 on_evict: Callable[[str], None] = None, backend: SessionBackend = None):
+        """
+        Args:
+            ttl_seconds: Idle time after which a session expires
+            max_sessions: Most sessions kept at once
+            max_bytes: Memory cap across all sessions (approximate, see estimate_size)
+            on_evict: Called with the session id after a session expires or is evicted
+            backend: Where state is kept (defaults to ProcessingConfig.SESSION_BACKEND)
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else ProcessingConfig.SESSION_TTL_SECONDS
+        self.max_sessions = max_sessions or ProcessingConfig.SESSION_MAX_COUNT
+        self.max_bytes = max_bytes if max_bytes is not None else ProcessingConfig.SESSION_MAX_BYTES
+        self.on_evict = on_evict
+        self.backend = backend or create_backend(
+            ProcessingConfig.SESSION_BACKEND, self.ttl_seconds, self.max_sessions, self.max_bytes,
+            ProcessingConfig.SESSION_DIR
+        )
+        self.evictions = 0
+        self._last_prune = 0.0
+        # Word-block memos of shared-backend sessions, kept per worker and keyed by PDF path
+        self._page_blocks: "OrderedDict[str, LazyPageBlocks]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self) -> str:
+        """Start a new empty session and return its id"""
+        session_id = uuid.uuid4().hex
+        data = new_session_data()
+        self.backend.create(session_id, to_record(data) if self.backend.shared else data)
+        self._prune()
+        return session_id
+
+    def get(self, session_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Get a session's state and mark it as recently used
+
+        Raises:
+            SessionNotFoundError: if the id is unknown or the session expired
+        """
+        self._prune()
+        record = self.backend.load(session_id) if session_id else None
+        if record is None:
+            raise SessionNotFoundError(f"Session {session_id} not found or expired")
+        return self._from_record(record) if self.backend.shared else record
+
+    def get_or_create(self, session_id: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """Get a session, starting a new one when the id is missing or expired"""
+        try:
+            return session_id, self.get(session_id)
+        except SessionNotFoundError:
+            session_id = self.create()
+            return session_id, self.get(session_id)
+
+    def update(self, session_id: str, **fields) -> bool:
+        """
+        Set fields of a session's state
+
+        Returns:
+            False when the session no longer exists (e.g. it expired while a conversion ran)
+        """
+        if self.backend.shared:
+            if fields.get("pdf_path"):
+                self._page_blocks_for(fields["pdf_path"], fields.get("page_blocks"))
+            updated = self.backend.update(session_id, to_record(fields), 0)
+        else:
+            record = self.backend.load(session_id)
+            updated = record is not None and self.backend.update(
+                session_id, fields, estimate_size({**record, **fields})
+            )
+        self._prune()
+        return updated
+
+    def delete(self, session_id: str) -> bool:
+        """Drop a session; returns False if it did not exist"""
+        removed = self.backend.delete(session_id)
+        if removed:
+            self._notify([session_id])
+        return removed
+
+    def _page_blocks_for(self, pdf_path: str, page_blocks: LazyPageBlocks = None) -> LazyPageBlocks:
+        """This worker's word-block memo for a PDF, bounded like the session count"""
+        with self._lock:
+            if page_blocks is not None:
+                self._page_blocks[pdf_path] = page_blocks
+            elif pdf_path not in self._page_blocks:
+                self._page_blocks[pdf_path] = LazyPageBlocks(pdf_path)
+            self._page_blocks.move_to_end(pdf_path)
+            while len(self._page_blocks) > self.max_sessions:
+                self._page_blocks.popitem(last=False)
+            return self._page_blocks[pdf_path]
+
+    def _from_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild live state from a shared backend's JSON record"""
+        data = new_session_data()
+        data.update(record)
+        data["page_mapping"] = PageMap.from_wire(record.get("page_mapping"))
+        data["line_boxes"] = LineBoxes.from_wire(record.get("line_boxes"))
+        if data["pdf_path"]:
+            data["page_blocks"] = self._page_blocks_for(data["pdf_path"])
+        return data
+
+    def _prune(self):
+        if self.backend.shared:
+            now = time.time()
+            if now - self._last_prune < self.SHARED_PRUNE_INTERVAL:
+                return
+            self._last_prune = now
+        self._notify(self.backend.prune())
+
+    def _notify(self, evicted: list):
+        self.evictions += len(evicted)
+        for session_id in evicted:
+            print(f"🗑️ Session {session_id[:8]} expired or evicted")
+            if self.on_evict:
+                self.on_evict(session_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session count and memory usage"""
+        return {
+            **self.backend.get_stats(),
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions
+        }
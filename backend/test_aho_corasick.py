@@ -0,0 +1,50 @@
+"""
+Test Aho-Corasick - Verify the multi-pattern matcher finds every occurrence in one scan
+"""
+
+import random
+
+from aho_corasick import AhoCorasick, build_name_matcher
+
+
+def naive_find_all(patterns, text):
+    """Every (start, end, index) occurrence found with str.find"""
+    occurrences = []
+    for index, pattern in enumerate(patterns):
+        pos = text.find(pattern)
+        while pattern and pos != -1:
+            occurrences.append((pos, pos + len(pattern), index))
+            pos = text.find(pattern, pos + 1)
+    return sorted(occurrences)
+
+
+def test_overlapping_patterns():
+    """Nested and overlapping patterns are all reported"""
+    patterns = ["he", "she", "his", "hers", ""]
+    matcher = AhoCorasick(patterns)
+    assert matcher.find_all("ushers") == [(1, 4, 1), (2, 4, 0), (2, 6, 3)]
+    assert matcher.find_all("") == []
+
+
+def test_matches_naive_search():
+    """Random texts and patterns agree with a brute-force search"""
+    rng = random.Random(7)
+    for _ in range(200):
+        patterns = ["".join(rng.choice("ab c") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("ab c\n") for _ in range(rng.randint(0, 60)))
+        assert AhoCorasick(patterns).find_all(text) == naive_find_all(patterns, text)
+
+
+def test_name_matcher_with_aliases():
+    """Names and aliases are lowercased, shared patterns map to every owner"""
+    names = ["Input voltage", "Supply voltage", "INPUT VOLTAGE"]
+    matcher, owners = build_name_matcher(names, {"Supply voltage": ["VIN", "input voltage"]})
+    assert matcher.patterns == ["input voltage", "supply voltage", "vin"]
+    assert owners == [[0, 1, 2], [1], [1]]
+
+
+if __name__ == "__main__":
+    test_overlapping_patterns()
+    test_matches_naive_search()
+    test_name_matcher_with_aliases()
+    print("✅ Aho-Corasick tests passed")
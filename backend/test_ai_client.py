@@ -0,0 +1,149 @@
+"""
+Test AI Client - Verify pooled keep-alive connections and jittered retries of 429/5xx against a stub server
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+
+from ai_client import AIClientPool, backoff_delay, create_async_client, is_retryable
+
+
+class StubServer(ThreadingHTTPServer):
+    """Chat completions endpoint answering with a scripted list of status codes, then 200"""
+
+    daemon_threads = True
+
+    def __init__(self, statuses):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.statuses = list(statuses)
+        self.requests = 0
+        self.client_ports = set()
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.client_ports.add(self.client_address[1])
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+
+        if status == 200:
+            body = {"id": "stub", "object": "chat.completion", "created": 0, "model": "stub-model",
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "pong"}}]}
+        else:
+            body = {"error": {"message": f"stub status {status}", "type": "stub"}}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(statuses) -> StubServer:
+    server = StubServer(statuses)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _ask(client, times: int = 1):
+    answers = []
+    for _ in range(times):
+        response = await client.chat.completions.create(model="stub-model", messages=[{"role": "user", "content": "ping"}])
+        answers.append(response.choices[0].message.content)
+    await client.close()
+    return answers
+
+
+def test_retries_then_succeeds_on_one_connection():
+    """429 and 5xx answers are retried, and every request reuses one kept-alive connection"""
+    server = _serve([429, 503, 502])
+    try:
+        client = create_async_client("test-key", server.base_url, max_retries=4, backoff_base=0.01)
+        assert asyncio.run(_ask(client, times=3)) == ["pong"] * 3
+        assert server.requests == 6
+        assert len(server.client_ports) == 1
+    finally:
+        server.shutdown()
+
+
+def test_gives_up_after_max_retries_and_skips_client_errors():
+    """Persistent server errors surface after max_retries; 4xx other than 429 are not retried"""
+    server = _serve([500] * 10)
+    try:
+        client = create_async_client("test-key", server.base_url, max_retries=2, backoff_base=0.01)
+        try:
+            asyncio.run(_ask(client))
+            assert False, "persistent 500 should raise"
+        except openai.InternalServerError:
+            pass
+        assert server.requests == 3
+    finally:
+        server.shutdown()
+
+    server = _serve([400])
+    try:
+        client = create_async_client("test-key", server.base_url, max_retries=2, backoff_base=0.01)
+        try:
+            asyncio.run(_ask(client))
+            assert False, "400 should raise"
+        except openai.BadRequestError:
+            pass
+        assert server.requests == 1
+    finally:
+        server.shutdown()
+
+    # Retries stop once the next backoff would overrun the budget
+    server = _serve([503] * 10)
+    try:
+        client = create_async_client("test-key", server.base_url, max_retries=10, backoff_base=0.2, budget=0)
+        try:
+            asyncio.run(_ask(client))
+            assert False, "503 past the budget should raise"
+        except openai.InternalServerError:
+            pass
+        assert server.requests <= 2
+    finally:
+        server.shutdown()
+
+
+def test_backoff_and_pool():
+    """Backoff is jittered below the doubling ceiling and follows Retry-After; the pool hands out one client per provider"""
+    delays = [backoff_delay(3, 0.5, 2.0) for _ in range(200)]
+    assert all(0 <= d <= 2.0 for d in delays) and len(set(delays)) > 100
+    assert all(backoff_delay(1, 0.5, 20) <= 1.0 for _ in range(50))
+    assert backoff_delay(0, 0.5, 20, retry_after="1.5") == 1.5
+    assert backoff_delay(0, 0.5, 20, retry_after="600") == 20
+    assert 0 <= backoff_delay(0, 0.5, 20, retry_after="Wed, 21 Oct 2026 07:28:00 GMT") <= 0.5
+    assert is_retryable(429) and is_retryable(503) and not is_retryable(400) and not is_retryable(200)
+
+    pool = AIClientPool()
+    first = pool.get("test-key", "http://127.0.0.1:1/v1")
+    assert pool.get("test-key", "http://127.0.0.1:1/v1") is first
+    assert pool.get("other-key", "http://127.0.0.1:1/v1") is not first
+    asyncio.run(pool.aclose())
+
+
+if __name__ == "__main__":
+    test_retries_then_succeeds_on_one_connection()
+    test_gives_up_after_max_retries_and_skips_client_errors()
+    test_backoff_and_pool()
+    print("✅ AI client tests passed")
@@ -0,0 +1,418 @@
+"""
+Test AI Extraction - Verify section-aware chunking, BM25 retrieval and the concurrent requests over chunks and parameter batches
+"""
+
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+from types import SimpleNamespace
+
+from config import APIConfig
+from llm_cache import LLMResponseCache
+from markdown_chunks import chunk_markdown
+from markdown_retrieval import BM25Index
+from openai_extractor import OpenAIExtractor
+from page_mapping import PageMap
+
+
+def _datasheet():
+    lines = ["# TPS746", "Low dropout regulator.", ""]
+    lines += ["## Features", "- Input voltage range: 1.5V to 6.0V", ""]
+    lines += ["## Electrical Characteristics", "| PARAMETER | MIN | MAX | UNIT |", "|---|---|---|---|"]
+    lines += [f"| Row {i} output noise | {i} | {i + 1} | µV |" for i in range(40)]
+    lines += ["", "## Thermal", "Thermal shutdown: 170 °C"]
+    return "\n".join(lines)
+
+
+def test_chunks_keep_sections_and_table_headers():
+    """Chunks cover every line once, split at headings, and a split table repeats its header rows"""
+    markdown = _datasheet()
+    lines = markdown.split('\n')
+    chunks = chunk_markdown(markdown, 600)
+
+    assert len(chunks) > 2
+    assert all(c.lines[c.header_lines:] == lines[c.start_line:c.end_line] for c in chunks)
+    assert chunks[0].start_line == 0 and chunks[-1].end_line == len(lines)
+    assert all(a.end_line == b.start_line for a, b in zip(chunks, chunks[1:]))
+    # A section that does not fit next to the previous ones starts a new chunk
+    assert lines[chunks[1].start_line] == "## Electrical Characteristics"
+
+    continued = [c for c in chunks if c.header_lines]
+    assert continued
+    assert all(c.lines[:2] == ["| PARAMETER | MIN | MAX | UNIT |", "|---|---|---|---|"] for c in continued)
+    # Repeated header rows are never reported as the source line
+    assert continued[0].find_line("| PARAMETER |") == -1
+
+    whole = chunk_markdown(markdown, 100000)
+    assert len(whole) == 1 and whole[0].text == markdown
+    assert whole[0].find_line("input  VOLTAGE range") == 4
+
+
+class FakeCompletions:
+    """Answers each request from the chunk it was given, after a fixed delay, streamed in small pieces"""
+
+    def __init__(self, delay: float, slow_parameter: str = None, slow_delay: float = 0, renamed: dict = None,
+                 failing: set = None):
+        self.delay = delay
+        self.slow_parameter = slow_parameter
+        self.slow_delay = slow_delay
+        # Requested name -> name the model answers under instead
+        self.renamed = renamed or {}
+        # Requests asking for any of these parameters fail
+        self.failing = failing or set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.prompts = []
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        prompt = messages[1]["content"]
+        self.prompts.append(prompt)
+        names = re.findall(r"^\d+\. (.+)$", prompt, re.MULTILINE)
+        await asyncio.sleep(self.slow_delay if self.slow_parameter in names else self.delay)
+        self.in_flight -= 1
+        if self.failing.intersection(names):
+            raise RuntimeError("Error code: 503 - service unavailable")
+
+        found = []
+        for name in names:
+            if name == "Input voltage range" and "1.5V to 6.0V" in prompt:
+                found.append({"name": name, "value": "1.5 to 6.0", "unit": "V", "confidence": 90,
+                              "source_text": "Input voltage range: 1.5V to 6.0V"})
+            elif name == "Thermal shutdown" and "170 °C" in prompt:
+                found.append({"name": name.upper(), "value": "170", "unit": "°C", "confidence": "80",
+                              "source_text": "Thermal shutdown: 170 °C"})
+            elif name == "Regulator dropout" and "1.5V to 6.0V" in prompt:
+                # Quotes a line retrieved for another parameter of the same batch
+                found.append({"name": name, "value": "1.5", "unit": "V", "confidence": 60,
+                              "source_text": "Input voltage range: 1.5V to 6.0V"})
+            elif name == "Thermal shutdown" and "Input voltage" in prompt:
+                # A weaker guess from another chunk loses to the confident one
+                found.append({"name": name, "value": "150", "unit": "°C", "confidence": 40, "source_text": ""})
+            else:
+                found.append({"name": name, "value": "NF", "unit": "", "confidence": 0, "source_text": ""})
+        for entry in found:
+            entry["name"] = self.renamed.get(entry["name"], entry["name"])
+        content = json.dumps({"parameters": found}, indent=2)
+        if not kwargs.get("stream"):
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        return self._stream(content)
+
+    async def _stream(self, content: str, piece: int = 16):
+        for i in range(0, len(content), piece):
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + piece]))])
+
+
+def test_map_reduce_merges_by_confidence():
+    """Requests run concurrently up to the limit and each parameter keeps its most confident value"""
+    markdown = _datasheet()
+    total_lines = len(markdown.split('\n'))
+    page_mapping = PageMap([0, 20], [1, 2], total_lines)
+    parameters = ["Input voltage range", "Thermal shutdown", "Quiescent current"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_MAX_CONCURRENT_REQUESTS,
+             APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_MAX_CONCURRENT_REQUESTS = 600, 2, 3
+    APIConfig.AI_RETRIEVAL_ENABLED = False
+    try:
+        extractor = OpenAIExtractor(api_key="test-key")
+        completions = FakeCompletions(delay=0.05)
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        start = time.perf_counter()
+        results = asyncio.run(extractor.extract_parameters_async(markdown, parameters, page_mapping))
+        elapsed = time.perf_counter() - start
+    finally:
+        (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_MAX_CONCURRENT_REQUESTS,
+         APIConfig.AI_RETRIEVAL_ENABLED) = saved
+
+    requests = len(chunk_markdown(markdown, 600)) * 2
+    assert completions.calls == requests
+    assert completions.max_in_flight == 3
+    # Bounded by ceil(requests / 3) rounds of the slowest request, not by the sum of all requests
+    assert elapsed < 0.05 * requests * 0.8
+
+    assert [r["name"] for r in results] == parameters
+    assert (results[0]["value"], results[0]["unit"], results[0]["source_page"], results[0]["markdown_line"]) == ("1.5 to 6.0", "V", 1, 4)
+    assert (results[1]["value"], results[1]["confidence"], results[1]["source_page"]) == ("170", 80, 2)
+    assert results[2]["value"] == "NF" and results[2]["extraction_method"] == "not_found"
+
+
+def test_response_cache_per_parameter():
+    """A repeated extraction makes no requests and a new parameter costs only its own requests"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Thermal shutdown"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 600, 25, False
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LLMResponseCache(os.path.join(directory, "llm.sqlite3"))
+            extractor = OpenAIExtractor(api_key="test-key", cache=cache)
+            completions = FakeCompletions(delay=0)
+            extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+            chunk_count = len(chunk_markdown(markdown, 600))
+
+            first = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert completions.calls == chunk_count
+            assert extractor.last_cache_stats == {"hits": 0, "misses": 2 * chunk_count}
+
+            second = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert completions.calls == chunk_count
+            assert extractor.last_cache_stats == {"hits": 2 * chunk_count, "misses": 0}
+            assert second == first
+
+            third = asyncio.run(extractor.extract_parameters_async(markdown, parameters + ["Quiescent current"]))
+            assert completions.calls == 2 * chunk_count
+            assert extractor.last_cache_stats == {"hits": 2 * chunk_count, "misses": chunk_count}
+            assert third[:2] == first and third[2]["value"] == "NF"
+
+            # A different model (or prompt version) never reuses the cached answers
+            extractor.model = "another-model"
+            asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert completions.calls == 3 * chunk_count
+            assert cache.get_stats()["entries"] == 5 * chunk_count
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+
+def test_only_named_answers_are_cached():
+    """An entry matched to its parameter by position is used but never cached"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Thermal shutdown"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 100000, 25, False
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LLMResponseCache(os.path.join(directory, "llm.sqlite3"))
+            extractor = OpenAIExtractor(api_key="test-key", cache=cache)
+            completions = FakeCompletions(delay=0, renamed={"THERMAL SHUTDOWN": "Shutdown temperature"})
+            extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+            first = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert first[1]["value"] == "170"
+            assert cache.get_stats()["entries"] == 1
+
+            asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert extractor.last_cache_stats == {"hits": 1, "misses": 1}
+            assert completions.calls == 2
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+
+def test_bm25_retrieval():
+    """The best lines come first and carry their heading and table header rows"""
+    index = BM25Index(_datasheet())
+    lines = index.lines
+
+    assert lines[index.search("Thermal shutdown", 3)[0]] == "Thermal shutdown: 170 °C"
+    assert lines[index.search("Input voltage range", 3)[0]] == "- Input voltage range: 1.5V to 6.0V"
+    assert index.search("Quiescent current", 3) == []
+
+    row = index.search("row 7 noise", 1)[0]
+    assert lines[row] == "| Row 7 output noise | 7 | 8 | µV |"
+    excerpt = index.excerpt([[row]], 12000)
+    assert excerpt.lines == ["## Electrical Characteristics", "| PARAMETER | MIN | MAX | UNIT |", "|---|---|---|---|",
+                             "...", lines[row]]
+    assert excerpt.find_line("Row 7 output") == row and excerpt.find_line("...") == -1
+
+
+def test_retrieval_narrows_prompts():
+    """Retrieved parameters get one small excerpt prompt, even past the first chunk; unmatched ones scan every chunk"""
+    markdown = _datasheet() + "\n\n## Layout\n" + "\n".join(f"Layout guideline {i}: keep traces short." for i in range(400))
+    markdown += "\n\n## Protection\nThermal shutdown: 170 °C"
+    parameters = ["Input voltage range", "Thermal shutdown", "Quiescent current"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_RETRIEVAL_ENABLED = 12000, True
+    try:
+        extractor = OpenAIExtractor(api_key="test-key")
+        completions = FakeCompletions(delay=0)
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        results = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+    chunks = chunk_markdown(markdown, 12000)
+    assert len(chunks) > 1
+    assert completions.calls == 1 + len(chunks)
+    excerpt_prompts = [p for p in completions.prompts if "1. Input voltage range" in p]
+    assert len(excerpt_prompts) == 1
+    assert "## Protection" in excerpt_prompts[0] and "Layout guideline" not in excerpt_prompts[0]
+    assert len(excerpt_prompts[0]) * 5 < max(len(c.text) for c in chunks)
+
+    lines = markdown.split('\n')
+    assert (results[0]["value"], results[0]["markdown_line"]) == ("1.5 to 6.0", 4)
+    assert (results[1]["value"], results[1]["markdown_line"]) == ("170", lines.index("Thermal shutdown: 170 °C"))
+    assert results[2]["value"] == "NF"
+
+
+def test_retrieval_batch_context_is_keyed_and_searched():
+    """Batched parameters are cached under their own excerpts but locate quotes in the merged one"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Regulator dropout"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED,
+             APIConfig.AI_RETRIEVAL_TOP_K)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE = 12000, 2
+    APIConfig.AI_RETRIEVAL_ENABLED, APIConfig.AI_RETRIEVAL_TOP_K = True, 1
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LLMResponseCache(os.path.join(directory, "llm.sqlite3"))
+            extractor = OpenAIExtractor(api_key="test-key", cache=cache)
+            completions = FakeCompletions(delay=0)
+            extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+            results = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+
+            index = BM25Index(markdown)
+            hits = [index.search(name, 1) for name in parameters]
+            assert "Input voltage" not in index.excerpt([hits[1]], 12000).text
+            assert "Input voltage" in completions.prompts[0]
+            keys = [LLMResponseCache.make_key(LLMResponseCache.chunk_hash(index.excerpt([found], 12000).text), name,
+                                              extractor.model, APIConfig.TEMPERATURE, extractor.PROMPT_VERSION)
+                    for name, found in zip(parameters, hits)]
+            assert set(cache.get_many(keys)) == set(keys)
+    finally:
+        (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED,
+         APIConfig.AI_RETRIEVAL_TOP_K) = saved
+
+    assert completions.calls == 1
+    # The quoted line came from the other parameter's hit, but was in the prompt
+    assert (results[1]["value"], results[1]["markdown_line"]) == ("1.5", 4)
+
+
+def test_new_parameter_leaves_retrieval_batches_cached():
+    """Adding a parameter to a cached run costs one miss, wherever it falls among the batches"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Row 7 output noise", "Row 12 output noise", "Thermal shutdown"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 12000, 2, True
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = LLMResponseCache(os.path.join(directory, "llm.sqlite3"))
+            extractor = OpenAIExtractor(api_key="test-key", cache=cache)
+            completions = FakeCompletions(delay=0)
+            extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+            first = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert completions.calls == 2
+            assert extractor.last_cache_stats == {"hits": 0, "misses": 4}
+
+            added = parameters[:1] + ["Row 20 output noise"] + parameters[1:]
+            second = asyncio.run(extractor.extract_parameters_async(markdown, added))
+            assert extractor.last_cache_stats == {"hits": 4, "misses": 1}
+            assert completions.calls == 3
+            assert "Row 20 output noise" in completions.prompts[-1] and "Row 7 output noise" not in completions.prompts[-1]
+            assert second[:1] + second[2:] == first
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+
+def test_stream_yields_each_parameter_when_final():
+    """Results are yielded as soon as their requests answer, without waiting for slower ones"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Thermal shutdown", "Quiescent current"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 600, 1, True
+    try:
+        extractor = OpenAIExtractor(api_key="test-key")
+        completions = FakeCompletions(delay=0.01, slow_parameter="Quiescent current", slow_delay=0.5)
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        async def collect():
+            start = time.perf_counter()
+            return [(name, result, time.perf_counter() - start)
+                    async for name, result in extractor.stream_parameters(markdown, parameters)]
+
+        streamed = asyncio.run(collect())
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+    assert sorted(name for name, _, _ in streamed[:2]) == ["Input voltage range", "Thermal shutdown"]
+    assert all(elapsed < 0.3 for _, _, elapsed in streamed[:2])
+    assert streamed[2][0] == "Quiescent current" and streamed[2][2] >= 0.5
+    values = {name: result["value"] for name, result, _ in streamed}
+    assert values == {"Input voltage range": "1.5 to 6.0", "Thermal shutdown": "170", "Quiescent current": "NF"}
+
+
+def test_failed_requests_are_counted_then_raised():
+    """A failed request leaves its parameters not found; when every request fails the error is raised"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Thermal shutdown"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 12000, 1, True
+    try:
+        extractor = OpenAIExtractor(api_key="test-key")
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(
+            completions=FakeCompletions(delay=0, failing={"Thermal shutdown"})
+        ))
+        results = asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+        assert results[0]["value"] == "1.5 to 6.0"
+        assert results[1]["value"] == "NF"
+        assert extractor.last_request_stats == {"sent": 2, "failed": 1}
+
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(
+            completions=FakeCompletions(delay=0, failing=set(parameters))
+        ))
+        try:
+            asyncio.run(extractor.extract_parameters_async(markdown, parameters))
+            assert False, "expected the request error"
+        except RuntimeError as e:
+            assert "503" in str(e)
+        assert extractor.last_request_stats == {"sent": 2, "failed": 2}
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+
+def test_closing_the_stream_waits_for_cancelled_requests():
+    """A consumer that stops early leaves no request tasks behind"""
+    markdown = _datasheet()
+    parameters = ["Input voltage range", "Thermal shutdown", "Quiescent current"]
+
+    saved = (APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 600, 1, True
+    try:
+        extractor = OpenAIExtractor(api_key="test-key")
+        completions = FakeCompletions(delay=0.01, slow_parameter="Quiescent current", slow_delay=5)
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        async def first_then_close():
+            stream = extractor.stream_parameters(markdown, parameters)
+            first = await stream.__anext__()
+            await stream.aclose()
+            return first, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        start = time.perf_counter()
+        (name, _result), leftover = asyncio.run(first_then_close())
+        assert time.perf_counter() - start < 2
+    finally:
+        APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = saved
+
+    assert name != "Quiescent current"
+    assert leftover == []
+
+
+if __name__ == "__main__":
+    test_chunks_keep_sections_and_table_headers()
+    test_map_reduce_merges_by_confidence()
+    test_response_cache_per_parameter()
+    test_only_named_answers_are_cached()
+    test_bm25_retrieval()
+    test_retrieval_narrows_prompts()
+    test_retrieval_batch_context_is_keyed_and_searched()
+    test_new_parameter_leaves_retrieval_batches_cached()
+    test_stream_yields_each_parameter_when_final()
+    test_failed_requests_are_counted_then_raised()
+    test_closing_the_stream_waits_for_cancelled_requests()
+    print("✅ AI extraction tests passed")
@@ -0,0 +1,166 @@
+"""
+Test API - Verify endpoints through FastAPI's TestClient
+"""
+
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import main
+from config import APIConfig
+from openai_extractor import OpenAIExtractor
+from page_mapping import PageMap
+from test_ai_extraction import FakeCompletions, _datasheet
+
+client = TestClient(main.app)
+
+
+def _document_session(parameters):
+    """A session holding the test datasheet's markdown and a parameter list"""
+    session_id = main.sessions.create()
+    markdown = _datasheet()
+    main.sessions.update(
+        session_id,
+        parameters=parameters,
+        pdf_path="datasheet.pdf",
+        pdf_pages=[{"page_number": 1, "text": markdown, "width": 612.0, "height": 792.0}],
+        markdown=markdown,
+        page_mapping=PageMap([0], [1], len(markdown.split('\n'))),
+        total_pages=1
+    )
+    return session_id
+
+
+def _fake_ai(completions):
+    """Stand-in for main.OpenAIExtractor whose requests are answered by completions"""
+    def create(cache=None, clients=None):
+        extractor = OpenAIExtractor(api_key="test-key")
+        extractor.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return extractor
+    return create
+
+
+def _ai_extract(completions, path, parameters, **request):
+    """POST an AI extraction with one request per parameter, answered by completions"""
+    session_id = _document_session(parameters)
+    saved = (main.OpenAIExtractor, APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE,
+             APIConfig.AI_RETRIEVAL_ENABLED)
+    main.OpenAIExtractor = _fake_ai(completions)
+    APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE, APIConfig.AI_RETRIEVAL_ENABLED = 12000, 1, True
+    try:
+        return client.post(path, json={"mode": "ai", **request}, headers={"X-Session-Id": session_id})
+    finally:
+        (main.OpenAIExtractor, APIConfig.AI_CHUNK_CHARS, APIConfig.AI_PARAMETER_BATCH_SIZE,
+         APIConfig.AI_RETRIEVAL_ENABLED) = saved
+
+
+def test_jobs_are_scoped_to_their_session():
+    """Sessions only see their own conversion jobs"""
+    alice = main.sessions.create()
+    bob = main.sessions.create()
+    job = main.conversion_jobs.create_completed("alice.pdf", {"total_pages": 1}, owner=alice)
+
+    listed = client.get("/api/jobs", headers={"X-Session-Id": alice}).json()["jobs"]
+    assert job["job_id"] in [j["job_id"] for j in listed]
+    listed = client.get("/api/jobs", headers={"X-Session-Id": bob}).json()["jobs"]
+    assert job["job_id"] not in [j["job_id"] for j in listed]
+    assert client.get("/api/jobs").json()["jobs"] == []
+
+    response = client.get(f"/api/jobs/{job['job_id']}", headers={"X-Session-Id": alice})
+    assert response.status_code == 200
+    assert response.json()["filename"] == "alice.pdf"
+    assert client.get(f"/api/jobs/{job['job_id']}", headers={"X-Session-Id": bob}).status_code == 404
+    assert client.get(f"/api/jobs/{job['job_id']}").status_code == 404
+
+
+def _sse_events(text):
+    """(event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for block in text.split("\n\n"):
+        if block:
+            event, data = block.split("\n")
+            assert event.startswith("event: ") and data.startswith("data: ")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _check_stream(events, parameters):
+    """Every position gets one result event before a single done event, which counts them"""
+    assert [event for event, _ in events] == ["result"] * len(parameters) + ["done"]
+    results = [None] * len(parameters)
+    for _, data in events[:-1]:
+        assert results[data["index"]] is None
+        results[data["index"]] = data["result"]
+    assert [result["name"] for result in results] == parameters
+    metadata = events[-1][1]
+    assert metadata["total_parameters"] == len(parameters)
+    assert metadata["extracted_count"] + metadata["not_found_count"] == len(parameters)
+    assert metadata["extracted_count"] == sum(1 for result in results if result["value"] != "NF")
+    return results, metadata
+
+
+def test_stream_simple_mode():
+    """Simple mode streams SSE results for every position, repeated names included"""
+    parameters = ["Thermal shutdown", "Quiescent current", "Thermal shutdown"]
+    session_id = _document_session(parameters)
+    response = client.post("/api/extract/stream", json={"mode": "simple"}, headers={"X-Session-Id": session_id})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    results, metadata = _check_stream(_sse_events(response.text), parameters)
+    assert results[0]["value"] == results[2]["value"] == "170"
+    assert results[1]["value"] == "NF"
+    assert metadata["extraction_mode"] == "simple" and metadata["used_markdown"]
+    assert metadata["ai_cache"] is None and metadata["ai_requests"] is None
+
+
+def test_stream_ai_mode():
+    """AI mode streams each result as it is final, as SSE or NDJSON"""
+    parameters = ["Input voltage range", "Thermal shutdown", "Quiescent current"]
+    completions = FakeCompletions(delay=0.01, slow_parameter="Input voltage range", slow_delay=0.2)
+    response = _ai_extract(completions, "/api/extract/stream", parameters)
+    assert response.status_code == 200
+    events = _sse_events(response.text)
+    results, metadata = _check_stream(events, parameters)
+    # The slow request's parameter arrives last, after the others
+    assert events[-2][1]["index"] == 0
+    assert [result["value"] for result in results] == ["1.5 to 6.0", "170", "NF"]
+    assert metadata["extraction_mode"] == "ai"
+    assert metadata["ai_requests"] == {"sent": 3, "failed": 0}
+
+    response = _ai_extract(FakeCompletions(delay=0), "/api/extract/stream", parameters, format="ndjson")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert all(set(record) == {"event", "data"} for record in records)
+    ndjson_results, _ = _check_stream([(record["event"], record["data"]) for record in records], parameters)
+    assert ndjson_results == results
+
+
+def test_failed_ai_requests():
+    """Failed AI requests are counted in the metadata; when all fail the request fails"""
+    parameters = ["Input voltage range", "Thermal shutdown"]
+
+    response = _ai_extract(FakeCompletions(delay=0, failing={"Thermal shutdown"}), "/api/extract", parameters)
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["value"] for r in body["results"]] == ["1.5 to 6.0", "NF"]
+    assert body["metadata"]["ai_requests"] == {"sent": 2, "failed": 1}
+
+    response = _ai_extract(FakeCompletions(delay=0, failing=set(parameters)), "/api/extract", parameters)
+    assert response.status_code == 500
+    assert "503" in response.json()["detail"]
+
+    response = _ai_extract(FakeCompletions(delay=0, failing=set(parameters)), "/api/extract/stream", parameters,
+                           format="ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["event"] == "error"
+    assert "503" in events[-1]["data"]["detail"]
+
+
+if __name__ == "__main__":
+    test_jobs_are_scoped_to_their_session()
+    test_stream_simple_mode()
+    test_stream_ai_mode()
+    test_failed_ai_requests()
+    print("✅ API tests passed")
@@ -0,0 +1,85 @@
+"""
+Test Batch Extraction - Verify extract_parameters and the streamed iter_parameters match per-parameter extraction
+"""
+
+from markdown_parameter_extractor import MarkdownParameterExtractor
+from parameter_extractor import ParameterExtractor
+
+MARKDOWN = """## Recommended Operating Conditions
+
+|       |                 | MIN   | MAX   | UNIT   |
+|-------|-----------------|-------|-------|--------|
+| V IN  | Input voltage   | 1.5   | 6.0   | V      |
+
+Quiescent current: 25 µA
+- Output noise is 53 µVRMS
+Thermal shutdown | 170 | °C |
+"""
+
+PAGES = [
+    {"page_number": 1, "text": "Input voltage: 1.5 to 6.0 V\nQuiescent current 25 uA", "blocks": []},
+    {"page_number": 2, "text": "Thermal shutdown temperature = 170 C\nOutput noise 53 uV", "blocks": []},
+]
+
+PARAMETERS = ["Input voltage", "VIN", "Quiescent current", "Quiescent curent",
+              "Thermal shutdown", "Output noise voltage", "Not in datasheet"]
+
+
+def test_markdown_batch_matches_single():
+    """Batch results equal one-at-a-time results, in input order"""
+    page_mapping = {i: 1 for i in range(20)}
+    extractor = MarkdownParameterExtractor(MARKDOWN, page_mapping, PAGES)
+    batch = extractor.extract_parameters(PARAMETERS)
+    assert [r["name"] for r in batch] == PARAMETERS
+    assert batch == [extractor.extract_parameter(name) for name in PARAMETERS]
+    assert batch[1]["extraction_method"] == "table_match"
+    assert batch[-1]["value"] == "NF"
+
+
+def test_pdf_batch_matches_single():
+    """The PDF text extractor resolves every tier the same way in batch"""
+    extractor = ParameterExtractor("\n".join(p["text"] for p in PAGES), PAGES)
+    batch = extractor.extract_parameters(PARAMETERS)
+    assert [r["name"] for r in batch] == PARAMETERS
+    assert batch == [extractor.extract_parameter(name) for name in PARAMETERS]
+    assert batch[0]["extraction_method"] == "exact_match"
+    assert batch[-1]["value"] == "NF"
+
+
+def test_aliases():
+    """Aliases let the table and exact tiers find differently named parameters"""
+    aliases = {"Supply": ["V IN", "input voltage"], "Iq": ["quiescent current"]}
+    markdown = MarkdownParameterExtractor(MARKDOWN, {i: 1 for i in range(20)}, PAGES)
+    results = markdown.extract_parameters(["Supply", "Iq"], aliases)
+    assert [r["extraction_method"] for r in results] == ["table_match", "exact_match"]
+    assert results[1]["value"] == "25"
+
+    pdf = ParameterExtractor("", PAGES).extract_parameters(["Supply", "Iq"], aliases)
+    assert [r["value"] for r in pdf] == ["1.5 to 6.0", "25"]
+    assert pdf[0]["source_page"] == 1
+
+
+def test_iter_parameters_streams_by_tier():
+    """Every index is yielded once with its batch result; earlier tiers come first and not-found results last"""
+    page_mapping = {i: 1 for i in range(20)}
+    for extractor in (MarkdownParameterExtractor(MARKDOWN, page_mapping, PAGES),
+                      ParameterExtractor("\n".join(p["text"] for p in PAGES), PAGES)):
+        streamed = list(extractor.iter_parameters(PARAMETERS))
+        assert sorted(i for i, _ in streamed) == list(range(len(PARAMETERS)))
+        batch = extractor.extract_parameters(PARAMETERS)
+        assert all(result == batch[i] for i, result in streamed)
+        assert streamed[-1] == (len(PARAMETERS) - 1, batch[-1]) and batch[-1]["value"] == "NF"
+
+    # Markdown tiers finish in priority order, each in index order
+    tiers = ["table_match", "exact_match", "fuzzy_match", "keyword_match", "not_found"]
+    streamed = list(MarkdownParameterExtractor(MARKDOWN, page_mapping, PAGES).iter_parameters(PARAMETERS))
+    ranks = [(tiers.index(result["extraction_method"]), i) for i, result in streamed]
+    assert ranks == sorted(ranks) and ranks[0][0] == 0
+
+
+if __name__ == "__main__":
+    test_markdown_batch_matches_single()
+    test_pdf_batch_matches_single()
+    test_aliases()
+    test_iter_parameters_streams_by_tier()
+    print("✅ Batch extraction tests passed")
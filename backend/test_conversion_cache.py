@@ -0,0 +1,93 @@
+"""
+Test Conversion Cache - Verify content-addressed storage and LRU eviction
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from conversion_cache import ConversionCache
+
+
+def _store(cache: ConversionCache, key: str, markdown: str):
+    cache.put(
+        key,
+        markdown,
+        {0: 1, 1: 2},
+        [{"page_number": 1, "text": "page one", "blocks": [], "width": 612, "height": 792}],
+        2
+    )
+
+
+def test_round_trip():
+    """A stored result comes back unchanged with integer line keys"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ConversionCache(tmp, max_bytes=10 * 1024 * 1024)
+        key = cache.make_key("a" * 64, {"output_version": 1})
+        
+        assert cache.get(key) is None
+        _store(cache, key, "# Datasheet\n| V IN | 1.5 | V |")
+        
+        cached = cache.get(key)
+        assert cached["markdown"] == "# Datasheet\n| V IN | 1.5 | V |"
+        assert cached["page_mapping"] == {0: 1, 1: 2}
+        assert cached["pdf_pages"][0]["text"] == "page one"
+        assert cached["total_pages"] == 2
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+
+def test_key_depends_on_options():
+    """Changing converter options changes the key"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ConversionCache(tmp)
+        assert cache.make_key("a" * 64, {"output_version": 1}) != cache.make_key("a" * 64, {"output_version": 2})
+        assert cache.make_key("a" * 64) != cache.make_key("b" * 64)
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted when over the size limit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ConversionCache(tmp, max_bytes=4000)
+        _store(cache, "first", "x" * 1500)
+        time.sleep(0.05)
+        _store(cache, "second", "y" * 1500)
+        time.sleep(0.05)
+        
+        # Touch the first entry so the second becomes least recently used
+        assert cache.get("first") is not None
+        time.sleep(0.05)
+        _store(cache, "third", "z" * 1500)
+        
+        assert cache.get("second") is None
+        assert cache.get("first") is not None
+        assert cache.get("third") is not None
+
+
+def test_concurrent_puts_are_best_effort():
+    """Writers of the same key don't clobber each other, and a failed write never raises"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ConversionCache(tmp, max_bytes=10 * 1024 * 1024)
+        threads = [threading.Thread(target=_store, args=(cache, "same", "x" * 200000)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert cache.get("same")["markdown"] == "x" * 200000
+        assert [name for name in os.listdir(tmp) if name.endswith(".tmp")] == []
+        
+        # An existing entry counts as stored; unserialisable data is logged, not raised
+        _store(cache, "same", "other")
+        assert cache.get("same")["markdown"] == "x" * 200000
+        cache.put("broken", "text", {0: 1}, [{"blocks": object()}], 1)
+        assert cache.get("broken") is None
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_key_depends_on_options()
+    test_lru_eviction()
+    test_concurrent_puts_are_best_effort()
+    print("✅ Conversion cache tests passed")
@@ -0,0 +1,121 @@
+"""
+Test Conversion Jobs - Verify job states and recovery from a broken worker pool
+"""
+
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from conversion_jobs import ConversionJobManager, QueueFullError
+
+
+class FakeExecutor:
+    """Stands in for the process pool; tests resolve the returned futures themselves"""
+
+    def __init__(self):
+        self.futures = []
+        self.stopped = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.stopped = True
+
+
+def _manager(**kwargs):
+    manager = ConversionJobManager(max_workers=1, **kwargs)
+    manager._executor = FakeExecutor()
+    return manager
+
+
+def _conversion():
+    return {
+        "total_pages": 3,
+        "timings": {"model_load_seconds": 0.0, "conversion_seconds": 1.5, "page_extraction_seconds": 0.25}
+    }
+
+
+def test_submit_and_complete():
+    """A finished conversion stores on_complete's summary and records its timings"""
+    changes = []
+    manager = _manager(on_change=lambda owner, job: changes.append((owner, job["status"])))
+    executor = manager._executor
+    job = manager.submit("a.pdf", "/tmp/a.pdf", lambda job_id, conversion: {"pages": conversion["total_pages"]},
+                         owner="session-1")
+    assert job["status"] == "queued"
+    assert manager.pending_count() == 1
+
+    executor.futures[0].set_result(_conversion())
+    job = manager.get(job["job_id"])
+    assert job["status"] == "completed"
+    assert job["result"] == {"pages": 3}
+    assert manager.pending_count() == 0
+    assert manager.get_metrics()["conversions"] == 1
+    assert manager.get_metrics()["last_conversion_seconds"] == 1.5
+    assert changes == [("session-1", "queued"), ("session-1", "completed")]
+
+
+def test_failed_conversion():
+    """Errors raised by the worker or by on_complete fail the job"""
+    manager = _manager()
+    executor = manager._executor
+    first = manager.submit("a.pdf", "/tmp/a.pdf", lambda job_id, conversion: {})
+    executor.futures[0].set_exception(ValueError("not a PDF"))
+    assert manager.get(first["job_id"])["status"] == "failed"
+    assert manager.get(first["job_id"])["error"] == "not a PDF"
+
+    def on_complete(job_id, conversion):
+        raise OSError("disk full")
+
+    second = manager.submit("b.pdf", "/tmp/b.pdf", on_complete)
+    executor.futures[1].set_result(_conversion())
+    assert manager.get(second["job_id"])["error"] == "disk full"
+    # The pool is only replaced when a worker crashes
+    assert manager._executor is executor
+
+
+def test_queue_full():
+    """Submissions beyond max_pending are refused until a job finishes"""
+    manager = _manager(max_pending=1)
+    manager.submit("a.pdf", "/tmp/a.pdf", lambda job_id, conversion: {})
+    try:
+        manager.submit("b.pdf", "/tmp/b.pdf", lambda job_id, conversion: {})
+        assert False, "expected QueueFullError"
+    except QueueFullError:
+        pass
+    assert len(manager.list_jobs()) == 1
+
+    manager._executor.futures[0].set_result(_conversion())
+    manager.submit("b.pdf", "/tmp/b.pdf", lambda job_id, conversion: {})
+    assert len(manager.list_jobs()) == 2
+
+
+def test_broken_pool_is_replaced_once():
+    """A crashed worker fails its job and stops that pool, but never a pool started since"""
+    manager = _manager()
+    broken = manager._executor
+    first = manager.submit("a.pdf", "/tmp/a.pdf", lambda job_id, conversion: {})
+    second = manager.submit("b.pdf", "/tmp/b.pdf", lambda job_id, conversion: {})
+
+    broken.futures[0].set_exception(BrokenProcessPool("worker died"))
+    assert manager.get(first["job_id"])["error"] == "Conversion worker crashed"
+    assert broken.stopped
+    assert manager._executor is None
+
+    # A fresh pool is running by the time the second job reports the same crash
+    fresh = FakeExecutor()
+    manager._executor = fresh
+    broken.futures[1].set_exception(BrokenProcessPool("worker died"))
+    assert manager.get(second["job_id"])["status"] == "failed"
+    assert manager._executor is fresh
+    assert not fresh.stopped
+
+
+if __name__ == "__main__":
+    test_submit_and_complete()
+    test_failed_conversion()
+    test_queue_full()
+    test_broken_pool_is_replaced_once()
+    print("✅ Conversion job tests passed")
@@ -0,0 +1,98 @@
+"""
+Test Converter Pool - Verify a failed model load gives its slot back instead of starving the pool
+"""
+
+import threading
+
+from converter_pool import ConverterPool
+
+
+class FlakyPool(ConverterPool):
+    """Pool whose first model load fails"""
+
+    WAIT_SECONDS = 0.05
+
+    def __init__(self, size: int, failures: int = 1):
+        super().__init__(size)
+        self.failures = failures
+        self.loads = 0
+
+    def _create_converter(self):
+        self.loads += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model download failed")
+        return object()
+
+
+def test_failed_load_frees_the_slot():
+    """After a failed load, the next acquire creates a converter instead of blocking forever"""
+    pool = FlakyPool(size=1)
+    try:
+        with pool.acquire():
+            assert False, "first load should fail"
+    except RuntimeError:
+        pass
+    assert pool._created == 0
+    
+    result = []
+    worker = threading.Thread(target=lambda: result.append(pool.acquire().__enter__()))
+    worker.start()
+    worker.join(timeout=5)
+    assert not worker.is_alive() and result and pool.loads == 2
+    assert pool._created == 1
+
+
+def test_warm_up_failure_and_waiting_acquire():
+    """warm_up rolls back on failure, and a caller waiting on a full pool takes over a freed slot"""
+    pool = FlakyPool(size=2)
+    try:
+        pool.warm_up()
+        assert False, "warm_up should surface the failed load"
+    except RuntimeError:
+        pass
+    assert pool._created == 0
+    pool.warm_up()
+    assert pool._created == 2
+    
+    # One slot, currently loading (and about to fail) while a second caller waits
+    pool = FlakyPool(size=1)
+    loading = threading.Event()
+    release = threading.Event()
+    original = pool._create_converter
+    
+    def slow_failing_load():
+        if pool.loads == 0:
+            loading.set()
+            release.wait(5)
+        return original()
+    
+    pool._create_converter = slow_failing_load
+    errors, acquired = [], []
+    
+    def first():
+        try:
+            with pool.acquire():
+                pass
+        except RuntimeError as e:
+            errors.append(e)
+    
+    def second():
+        with pool.acquire() as converter:
+            acquired.append(converter)
+    
+    threads = [threading.Thread(target=first)]
+    threads[0].start()
+    loading.wait(5)
+    threads.append(threading.Thread(target=second))
+    threads[1].start()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(errors) == 1 and len(acquired) == 1
+
+
+if __name__ == "__main__":
+    test_failed_load_frees_the_slot()
+    test_warm_up_failure_and_waiting_acquire()
+    print("✅ Converter pool tests passed")
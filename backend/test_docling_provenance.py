@@ -0,0 +1,106 @@
+"""
+Test Docling Provenance - Verify markdown, page mapping and line boxes come from item provenance
+"""
+
+from types import SimpleNamespace
+
+from docling_provenance import LineBoxes, render_with_provenance
+from markdown_parameter_extractor import MarkdownParameterExtractor
+
+
+def _bbox(l, t, r, b):
+    # Docling reports PDF coordinates with a bottom-left origin
+    return SimpleNamespace(l=l, t=t, r=r, b=b, coord_origin="CoordOrigin.BOTTOMLEFT")
+
+
+def _item(label, text, page_no, bbox):
+    return SimpleNamespace(label=label, text=text, prov=[SimpleNamespace(page_no=page_no, bbox=bbox)])
+
+
+class FakeTable:
+    label = "table"
+    text = ""
+
+    def __init__(self, page_no, bbox, cells):
+        self.prov = [SimpleNamespace(page_no=page_no, bbox=bbox)]
+        self.data = SimpleNamespace(table_cells=cells)
+
+    def export_to_markdown(self, doc=None):
+        return "| Parameter | Max | Unit |\n|---|---|---|\n| Supply voltage | 5.5 | V |"
+
+
+class FakeDocument:
+    def __init__(self, items):
+        self.items = items
+        size = SimpleNamespace(width=600.0, height=800.0)
+        self.pages = {1: SimpleNamespace(size=size), 2: SimpleNamespace(size=size)}
+
+    def iterate_items(self):
+        for item in self.items:
+            yield item, 0
+
+
+def _document():
+    cell = lambda row, l, r: SimpleNamespace(start_row_offset_idx=row, bbox=_bbox(l, 700 - 20 * row, r, 690 - 20 * row))
+    return FakeDocument([
+        _item("page_header", "ACME Corp confidential", 1, _bbox(0, 790, 600, 780)),
+        _item("title", "LM1234 Regulator", 1, _bbox(50, 760, 300, 740)),
+        _item("text", "Low dropout linear regulator.", 1, _bbox(50, 730, 400, 720)),
+        _item("section_header", "Electrical Characteristics", 2, _bbox(50, 750, 300, 735)),
+        FakeTable(2, _bbox(50, 710, 500, 650), [
+            cell(0, 50, 200), cell(0, 200, 300),
+            cell(1, 50, 200), cell(1, 200, 300),
+        ]),
+    ])
+
+
+def test_render_with_provenance():
+    """Items render in reading order, headers are dropped and every line knows its page"""
+    markdown, page_mapping, line_boxes, pdf_pages = render_with_provenance(_document())
+    lines = markdown.split('\n')
+    assert lines == [
+        "# LM1234 Regulator", "",
+        "Low dropout linear regulator.", "",
+        "## Electrical Characteristics", "",
+        "| Parameter | Max | Unit |", "|---|---|---|", "| Supply voltage | 5.5 | V |",
+    ]
+    # The blank line separating two blocks stays with the block above it
+    assert [page_mapping.get(i) for i in range(len(lines))] == [1, 1, 1, 1, 2, 2, 2, 2, 2]
+
+    # Boxes are converted to a top-left origin; table rows get the union of their cells
+    assert line_boxes.get(0) == [50.0, 40.0, 300.0, 60.0]
+    assert line_boxes.get(1) is None
+    assert line_boxes.get(6) == [50.0, 100.0, 300.0, 110.0]
+    assert line_boxes.get(8) == [50.0, 120.0, 300.0, 130.0]
+    assert LineBoxes.from_wire(line_boxes.to_wire()).boxes == line_boxes.boxes
+
+    assert [page["page_number"] for page in pdf_pages] == [1, 2]
+    assert pdf_pages[0]["text"] == "LM1234 Regulator\nLow dropout linear regulator."
+    assert pdf_pages[1]["text"] == (
+        "Electrical Characteristics\n"
+        "| Parameter | Max | Unit |\n|---|---|---|\n| Supply voltage | 5.5 | V |"
+    )
+    assert pdf_pages[1]["height"] == 800.0
+
+
+def test_no_provenance():
+    """Documents without iterate_items fall back to the converter's heuristics"""
+    assert render_with_provenance(SimpleNamespace(pages={})) is None
+    assert render_with_provenance(FakeDocument([])) is None
+
+
+def test_highlights_use_line_boxes():
+    """Extraction highlights the matched line's Docling box without touching PDF words"""
+    markdown, page_mapping, line_boxes, pdf_pages = render_with_provenance(_document())
+    extractor = MarkdownParameterExtractor(markdown, page_mapping, pdf_pages, line_boxes=line_boxes)
+    result = extractor.extract_parameter("Supply voltage")
+    assert result["value"] == "5.5"
+    assert result["source_page"] == 2
+    assert result["highlights"] == [{"text": "| Supply voltage | 5.5 | V |", "bbox": [50.0, 120.0, 300.0, 130.0], "type": "value"}]
+
+
+if __name__ == "__main__":
+    test_render_with_provenance()
+    test_no_provenance()
+    test_highlights_use_line_boxes()
+    print("✅ Docling provenance tests passed")
@@ -0,0 +1,75 @@
+"""
+Test Fuzzy Matcher - Verify batched top-k scoring matches per-pair RapidFuzz scoring
+"""
+
+import random
+
+from rapidfuzz import fuzz
+
+from fuzzy_matcher import BatchFuzzyMatcher
+
+
+CHOICES = [
+    "input voltage range | 1.5 | 6.0 | v",
+    "output voltage accuracy | -1 | 1 | %",
+    "quiescent current | 25 | µa",
+    "input voltage range | 1.5 | 6.0 | v",
+    "dropout voltage | 230 | mv",
+    "thermal shutdown | 170 | °c",
+    "output current limit | 1.4 | a",
+    "input voltage",
+]
+QUERIES = ["input voltage", "output current", "thermal shutdown temperature", "dropout", "xyz"]
+
+
+def _naive_top_k(queries, choices, k, threshold, score_cap=100):
+    results = []
+    for query in queries:
+        scored = [(i, min(round(fuzz.partial_ratio(query, choice)), score_cap)) for i, choice in enumerate(choices)]
+        scored = [(i, score) for i, score in scored if score >= threshold]
+        results.append(sorted(scored, key=lambda item: (-item[1], item[0]))[:k])
+    return results
+
+
+def test_top_k_matches_pairwise_scoring():
+    """Every (query, k, threshold) gives the same indices and scores as scoring pair by pair"""
+    rng = random.Random(7)
+    words = "input output voltage current range thermal drop quiescent limit accuracy".split()
+    choices = CHOICES + [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) for _ in range(40)]
+    matcher = BatchFuzzyMatcher(choices, workers=1)
+    for k in (1, 3, 5, len(choices) + 10):
+        for threshold in (0, 50, 70, 100):
+            assert matcher.top_k(QUERIES, k=k, threshold=threshold) == _naive_top_k(QUERIES, choices, k, threshold)
+            assert (matcher.top_k(QUERIES, k=k, threshold=threshold, score_cap=90)
+                    == _naive_top_k(QUERIES, choices, k, threshold, score_cap=90))
+
+
+def test_threshold_ties_and_edges():
+    """The threshold is inclusive, ties keep the earliest choice, and small or empty choice lists work"""
+    matcher = BatchFuzzyMatcher(CHOICES, workers=1)
+    
+    # "input voltage" scores 100 against choices 0, 3 and 7; the earliest indices win the tie
+    assert matcher.top_k(["input voltage"], k=2) == [[(0, 100), (3, 100)]]
+    
+    score = round(fuzz.partial_ratio("dropout", CHOICES[5]))
+    at_threshold = matcher.top_k(["dropout"], k=len(CHOICES), threshold=score)[0]
+    assert (5, score) in at_threshold
+    assert (5, score) not in matcher.top_k(["dropout"], k=len(CHOICES), threshold=score + 1)[0]
+    
+    # Capped scores tie, so an earlier 92 beats a later 100
+    assert round(fuzz.partial_ratio("input voltage", "inpat voltage")) < 100
+    capped = BatchFuzzyMatcher(["inpat voltage", "input voltage"], workers=1)
+    assert capped.top_k(["input voltage"], k=1) == [[(1, 100)]]
+    assert capped.top_k(["input voltage"], k=1, score_cap=90) == [[(0, 90)]]
+    
+    # k larger than the number of choices returns every choice
+    assert len(matcher.top_k(["voltage"], k=100)[0]) == len(CHOICES)
+    
+    assert BatchFuzzyMatcher([], workers=1).top_k(["input voltage", "dropout"]) == [[], []]
+    assert matcher.top_k([]) == []
+
+
+if __name__ == "__main__":
+    test_top_k_matches_pairwise_scoring()
+    test_threshold_ties_and_edges()
+    print("✅ Fuzzy matcher tests passed")
@@ -0,0 +1,55 @@
+"""
+Test JSON Stream - Verify array objects are decoded as soon as they are complete, however the text is split
+"""
+
+import json
+import random
+
+from json_stream import JSONArrayStream
+
+
+def test_objects_complete_as_text_arrives():
+    """Each object is returned by the piece that closes it, including braces and quotes inside strings"""
+    answer = {"parameters": [
+        {"name": "Input [V]", "value": "1.5 {min}", "source_text": "say \"}\" here"},
+        {"name": "Noise", "notes": {"table": [1, {"row": 2}]}},
+        {"name": "Thermal shutdown", "value": "170"}
+    ], "other": [{"ignored": True}]}
+    text = json.dumps(answer, indent=2)
+
+    random.seed(7)
+    for _ in range(100):
+        parser = JSONArrayStream("parameters")
+        items = []
+        position = 0
+        while position < len(text):
+            size = random.randint(1, 9)
+            items.extend(parser.feed(text[position:position + size]))
+            position += size
+        assert items == answer["parameters"]
+        assert parser.close() == []
+
+    parser = JSONArrayStream("parameters")
+    first_end = text.index('"source_text"')
+    assert parser.feed(text[:first_end]) == []
+    assert parser.feed(text[first_end:text.index('"Noise"')]) == [answer["parameters"][0]]
+
+
+def test_other_shapes():
+    """A bare array works, other keys are skipped, and close() falls back to a full parse"""
+    assert JSONArrayStream().feed('[{"a": 1}, {"b": 2}]') == [{"a": 1}, {"b": 2}]
+    assert JSONArrayStream().feed('{"notes": [{"x": 1}], "parameters": [{"y": 2}]}') == [{"y": 2}]
+
+    parser = JSONArrayStream()
+    assert parser.feed('{"parameters": {"not": "a list"}}') == []
+    assert parser.close() == []
+
+    parser = JSONArrayStream()
+    assert parser.feed('{"parameters": [{"unterminated": ') == []
+    assert parser.close() == []
+
+
+if __name__ == "__main__":
+    test_objects_complete_as_text_arrives()
+    test_other_shapes()
+    print("✅ JSON stream tests passed")
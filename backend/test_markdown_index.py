@@ -0,0 +1,50 @@
+"""
+Test Markdown Index - Verify posting-list lookups match a linear line scan
+"""
+
+import random
+from pathlib import Path
+
+from markdown_index import MarkdownIndex
+
+
+MARKDOWN_PATH = Path(__file__).parent / "output" / "tps746-q1.md"
+
+
+def test_lines_containing_matches_linear_scan():
+    """Index lookups return exactly the lines a substring scan finds"""
+    lines = MARKDOWN_PATH.read_text(encoding="utf-8").split("\n")
+    index = MarkdownIndex(lines, lambda line: None)
+    
+    phrases = ["Output current", "dropout VOLTAGE", "V IN", "put cur", "°C", "(3)", "| I OUT |", "zz-not-there"]
+    
+    # Random substrings exercise partial tokens at both phrase edges
+    rng = random.Random(7)
+    for _ in range(500):
+        line = rng.choice([l for l in lines if l])
+        start = rng.randrange(len(line))
+        phrases.append(line[start:start + rng.randint(1, 25)])
+    
+    for phrase in phrases:
+        expected = [i for i, line in enumerate(lines) if phrase.lower() in line.lower()]
+        assert index.lines_containing(phrase) == expected, phrase
+
+
+def test_values_are_precomputed():
+    """Line values are parsed once at build time"""
+    calls = []
+    
+    def extractor(line):
+        calls.append(line)
+        return {"value": "1", "unit": "A"} if "1 A" in line else None
+    
+    index = MarkdownIndex(["Output current: 1 A", "no value here"], extractor)
+    assert len(calls) == 2
+    assert index.value_lines == [0]
+    assert index.lines_containing_any(["current", "value"]) == [0, 1]
+
+
+if __name__ == "__main__":
+    test_lines_containing_matches_linear_scan()
+    test_values_are_precomputed()
+    print("✅ Markdown index tests passed")
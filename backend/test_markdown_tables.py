@@ -0,0 +1,83 @@
+"""
+Test Markdown Tables - Verify limit tables are parsed into symbol/parameter rows
+"""
+
+from markdown_tables import TableIndex, normalize_key, primary_value
+
+MARKDOWN = """## 5.1 Absolute Maximum Ratings
+
+|             |                         | MIN   | MAX   | UNIT   |
+|-------------|-------------------------|-------|-------|--------|
+| Voltage     | Supply, V IN            | -0.3  | 6.5   | V      |
+| Voltage     | Enable, V EN            | -0.3  | 6.5   | V      |
+| Temperature | Operating junction, T J | -40   | 150   | °C     |
+
+## 5.3 Recommended Operating Conditions
+
+|       |                 |                 | MIN   | NOM   | MAX   | UNIT   |
+|-------|-----------------|-----------------|-------|-------|-------|--------|
+| V IN  | Input voltage   | Input voltage   | 1.5   |       | 6.0   | V      |
+| C FF  | Feed-forward    | Feed-forward    | 10    | 10    | 10    | nF     |
+
+## 5.5 Electrical Characteristics
+
+| PARAMETER   | PARAMETER           | TEST CONDITIONS | MIN    | TYP   | MAX   | UNIT   |
+|-------------|---------------------|-----------------|--------|-------|-------|--------|
+|             | Output accuracy (1) | T J = 25°C      | -0.85% |       | 0.85% |        |
+| I GND       | Ground current      | T J = 25°C      |        | 25    | 32    | µA     |
+| I GND       | Ground current      | T J = 150°C     |        | 25    | 36    |        |
+| V DO        | Dropout voltage     | V IN = 2.0 V    |        | 895   | 1090  | mV     |
+"""
+
+
+def test_column_roles():
+    """Headers map to limit/unit roles and descriptor columns are classified"""
+    index = TableIndex(MARKDOWN.split('\n'))
+    assert len(index.tables) == 3
+    assert index.tables[1].roles == {0: "symbol", 1: "parameter", 2: "conditions",
+                                     3: "min", 4: "nom", 5: "max", 6: "unit"}
+    assert index.tables[2].roles[0] == "symbol"
+    assert index.tables[2].roles[1] == "parameter"
+
+
+def test_lookup_returns_limit_columns():
+    """Lookups read the right column instead of the first number on the line"""
+    index = TableIndex(MARKDOWN.split('\n'))
+
+    dropout = index.lookup("Dropout voltage")
+    assert dropout["limits"] == {"typ": "895", "max": "1090"}
+    assert primary_value(dropout) == "895"
+    assert dropout["conditions"] == "V IN = 2.0 V"
+
+    # Symbols match regardless of spacing; recommended limits win over absolute maximums
+    assert index.lookup("VIN")["section"] == "5.3 Recommended Operating Conditions"
+    assert primary_value(index.lookup("V_IN")) == "1.5 to 6.0"
+    assert primary_value(index.lookup("C FF")) == "10"
+    assert index.lookup("Operating junction")["symbol"] == "T J"
+    assert index.lookup("Not a parameter") is None
+
+
+def test_units_carry_down():
+    """Continuation rows inherit the unit, percent limits get a % unit"""
+    index = TableIndex(MARKDOWN.split('\n'))
+    ground = index.lookup_all("I GND")
+    assert [r["unit"] for r in ground] == ["µA", "µA"]
+    assert [r["limits"]["max"] for r in ground] == ["32", "36"]
+
+    accuracy = index.lookup("Output accuracy")
+    assert accuracy["unit"] == "%"
+    assert primary_value(accuracy) == "-0.85 to 0.85"
+
+
+def test_normalize_key():
+    """Symbols and names compare without spacing, case or footnotes"""
+    assert normalize_key("V IN") == normalize_key("vin") == normalize_key("V_IN")
+    assert normalize_key("Output capacitor (1)") == "outputcapacitor"
+
+
+if __name__ == "__main__":
+    test_column_roles()
+    test_lookup_returns_limit_columns()
+    test_units_carry_down()
+    test_normalize_key()
+    print("✅ Markdown table tests passed")
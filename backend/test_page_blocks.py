@@ -0,0 +1,121 @@
+"""
+Test Page Blocks - Verify compact word-box storage matches the highlight JSON shape
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+import page_blocks
+from page_blocks import LazyPageBlocks, PageBlocks
+
+
+WORDS = [
+    {"text": "Input", "x0": 10.0, "top": 20.0, "x1": 40.0, "bottom": 30.0, "height": 10.0},
+    {"text": "1.5V", "x0": 50.0, "top": 20.0, "x1": 70.0, "bottom": 30.0, "height": 10.0},
+    {"text": "", "x0": 0.0, "top": 0.0, "x1": 0.0, "bottom": 0.0, "height": 0.0},
+    {"text": "6.0V", "x0": 80.0, "top": 20.0, "x1": 100.0, "bottom": 30.0, "height": 10.0},
+    {"text": "İnput", "x0": 10.0, "top": 40.0, "x1": 40.0, "bottom": 50.0, "height": 10.0},
+]
+
+
+def _naive_find(needle, ignore_case=False):
+    if ignore_case:
+        return [i for i, w in enumerate(WORDS) if needle.lower() in w["text"].lower()]
+    return [i for i, w in enumerate(WORDS) if needle in w["text"]]
+
+
+def test_find_matches_naive_scan():
+    """Vectorised search returns the same words as a per-dict scan"""
+    blocks = PageBlocks.from_words(WORDS)
+    for needle in ["V", "1.5", "put", "x", "", "Input V"]:
+        assert blocks.find(needle).tolist() == _naive_find(needle)
+    for needle in ["input", "v", "NPUT"]:
+        assert blocks.find(needle, ignore_case=True).tolist() == _naive_find(needle, ignore_case=True)
+
+
+def test_serialises_to_block_dicts():
+    """to_dicts() keeps the {"text", "bbox", "size"} shape"""
+    blocks = PageBlocks.from_words(WORDS)
+    dicts = blocks.to_dicts()
+    assert dicts[1] == {"text": "1.5V", "bbox": [50.0, 20.0, 70.0, 30.0], "size": 10.0}
+    assert PageBlocks.from_blocks(dicts).to_dicts() == dicts
+    assert PageBlocks.coerce(blocks) is blocks
+    assert PageBlocks.coerce(dicts).to_dicts() == dicts
+    assert len(PageBlocks.coerce(None)) == 0
+    assert blocks.highlights([3], "value") == [{"text": "6.0V", "bbox": [80.0, 20.0, 100.0, 30.0], "type": "value"}]
+
+
+def test_within_region():
+    """Bounding-box filtering selects words inside a region"""
+    blocks = PageBlocks.from_words(WORDS)
+    assert blocks.within(0, 15, 75, 35).tolist() == [0, 1]
+
+
+PDF_PATH = "../Source/tps746-q1.pdf"
+
+
+def test_lazy_pages_lru_and_batch_load():
+    """Pages load once per batch, stay memoised up to capacity and evict least recently used first"""
+    if not Path(PDF_PATH).exists():
+        print(f"❌ PDF not found: {PDF_PATH}")
+        return
+    
+    opens = []
+    real_open = pdfplumber.open
+    
+    def counting_open(path, *args, **kwargs):
+        opens.append(path)
+        return real_open(path, *args, **kwargs)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "excerpt.pdf")
+        excerpt = pdfium.PdfDocument.new()
+        excerpt.import_pages(pdfium.PdfDocument(PDF_PATH), [0, 1, 2])
+        excerpt.save(pdf_path)
+        
+        page_blocks.pdfplumber.open = counting_open
+        try:
+            lazy = LazyPageBlocks(pdf_path, capacity=2)
+            
+            # One open for several missing pages; pages outside the document come back empty
+            pages = lazy.get_many([1, 2, 1, 9, 0])
+            assert len(opens) == 1
+            assert sorted(pages) == [0, 1, 2, 9]
+            assert len(pages[9]) == 0 and len(pages[0]) == 0 and len(pages[1]) > 0
+            assert lazy.loads == 4
+            
+            with real_open(pdf_path) as pdf:
+                words = pdf.pages[1].extract_words()
+            assert pages[2].to_dicts() == PageBlocks.from_words(words).to_dicts()
+            
+            stats = lazy.get_stats()
+            assert stats["cached_pages"] == 2
+            assert stats["cached_bytes"] == sum(lazy.get(n).nbytes() for n in (0, 9))
+            
+            # Capacity 2 kept the last two loaded (0 and 9); touching 0 makes 9 the eviction victim
+            loads = lazy.loads
+            assert lazy.get(0) is pages[0] and lazy.loads == loads
+            lazy.get(3)
+            assert lazy.get(0) is pages[0]
+            lazy.get(9)
+            assert lazy.loads == loads + 2
+            assert lazy.get_stats()["hits"] >= 4
+            
+            # An explicit capacity of 0 memoises nothing instead of falling back to the default
+            uncached = LazyPageBlocks(pdf_path, capacity=0)
+            assert uncached.capacity == 0
+            assert len(uncached.get(1)) > 0 and uncached.get_stats()["cached_pages"] == 0
+        finally:
+            page_blocks.pdfplumber.open = real_open
+
+
+if __name__ == "__main__":
+    test_find_matches_naive_scan()
+    test_serialises_to_block_dicts()
+    test_within_region()
+    test_lazy_pages_lru_and_batch_load()
+    print("✅ Page block tests passed")
@@ -0,0 +1,78 @@
+"""
+Test Page Map - Verify the run-based page mapping behaves like the old per-line dict
+"""
+
+import json
+import random
+
+from benchmark_page_mapping import boundary_page_mapping, legacy_fill_page_gaps, make_document
+from page_mapping import LineLocator, PageMap
+
+
+def test_matches_dict_lookups():
+    """get() agrees with dict.get() for every line, including out-of-range lines"""
+    rng = random.Random(3)
+    page, mapping = 1, {}
+    for line_num in range(500):
+        if rng.random() < 0.05:
+            page += 1
+        if rng.random() < 0.97:
+            mapping[line_num] = page
+
+    page_map = PageMap.from_dict(mapping, 500)
+    for line_num in range(-5, 510):
+        assert page_map.get(line_num, 1) == mapping.get(line_num, 1)
+    assert page_map == mapping
+    assert len(page_map) == len(mapping)
+    assert len(page_map.starts) < len(mapping) // 5
+
+
+def test_wire_format():
+    """The compact wire form round-trips, and legacy string-keyed JSON still loads"""
+    page_map = PageMap([0, 10, 25], [1, 2, 3], 40)
+    wire = json.loads(json.dumps(page_map.to_wire()))
+    assert wire == {"starts": [0, 10, 25], "pages": [1, 2, 3], "lines": 40}
+    assert PageMap.from_wire(wire) == page_map
+
+    legacy = {"0": 1, "1": 1, "2": 2}
+    assert PageMap.from_wire(legacy) == {0: 1, 1: 1, 2: 2}
+    assert PageMap.from_wire(None).get(0, 1) == 1
+
+
+def test_page_counts():
+    """Adjacent runs on one page are merged and counted once"""
+    page_map = PageMap([0, 5, 8, 12], [1, 1, 2, 1], 20)
+    assert page_map.starts == [0, 8, 12]
+    assert page_map.page_counts() == {1: 16, 2: 4}
+    assert page_map[9] == 2
+
+
+def test_sparse_fill_matches_legacy():
+    """One-sweep gap filling gives the same mapping as the old per-line rescan"""
+    rng = random.Random(5)
+    for _ in range(50):
+        total_lines = rng.randint(0, 300)
+        sparse = {rng.randrange(total_lines): rng.randint(1, 9) for _ in range(rng.randint(0, 20))} if total_lines else {}
+        assert PageMap.from_sparse(sparse, total_lines) == legacy_fill_page_gaps(sparse, total_lines)
+
+
+def test_boundary_detection():
+    """Pages are located by their first line, searching forward, regardless of page length"""
+    lines, first_lines, truth = make_document(2000, seed=1)
+    page_map = boundary_page_mapping(lines, first_lines)
+    assert [page_map.get(i) for i in range(len(lines))] == truth
+
+    locator = LineLocator(["", "## Title", "text", "## Title", "## Title with a much longer suffix"])
+    assert locator.find("## Title", 2) == 3
+    # Page exports may wrap long lines differently, a shared 30-character prefix is enough
+    assert locator.find("## Title with a much longer suffix that differs", 0) == 4
+    assert locator.find("missing") is None
+
+
+if __name__ == "__main__":
+    test_matches_dict_lookups()
+    test_wire_format()
+    test_page_counts()
+    test_sparse_fill_matches_legacy()
+    test_boundary_detection()
+    print("✅ Page map tests passed")
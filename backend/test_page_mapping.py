@@ -82,8 +82,8 @@ def test_page_mapping():
     
     mapping_file = output_dir / "page_mapping.json"
     with open(mapping_file, 'w') as f:
-        # Convert int keys to strings for JSON
-        json.dump({str(k): v for k, v in page_mapping.items()}, f, indent=2)
+        # Compact form: first line of each page run plus its page
+        json.dump(page_mapping.to_wire(), f)
     
     print(f"\n✅ Page mapping saved to: {mapping_file}")
     
@@ -92,9 +92,7 @@ def test_page_mapping():
     print("Page Distribution")
     print(f"{'='*60}")
     
-    page_counts = {}
-    for page_num in page_mapping.values():
-        page_counts[page_num] = page_counts.get(page_num, 0) + 1
+    page_counts = page_mapping.page_counts()
     
     for page in sorted(page_counts.keys()):
         count = page_counts[page]
@@ -0,0 +1,239 @@
+"""
+Test Session Backends - Verify two server workers share session state through the disk and Redis backends
+"""
+
+import socketserver
+import tempfile
+import threading
+import time
+
+from docling_provenance import LineBoxes
+from page_mapping import PageMap
+from session_backends import DiskBackend, RedisBackend, RespClient
+from session_store import SessionStore, SessionNotFoundError
+
+
+class StandInRedis(socketserver.ThreadingTCPServer):
+    """Just enough of a Redis server for the commands RedisBackend sends"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.sorted_sets = {}
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+
+    def live(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            with self.server.lock:
+                reply = self.execute(args[0].upper().decode(), args[1:])
+            self.wfile.write(reply)
+
+    def execute(self, command, args):
+        server = self.server
+        if command in ("AUTH", "SELECT"):
+            return b"+OK\r\n"
+        if command == "HSET":
+            fields = server.live(args[0]) if server.live(args[0]) is not None else {}
+            server.data[args[0]] = fields
+            added = 0
+            for i in range(1, len(args), 2):
+                added += args[i] not in fields
+                fields[args[i]] = args[i + 1]
+            return b":%d\r\n" % added
+        if command == "HGETALL":
+            fields = server.live(args[0]) or {}
+            reply = [b"*%d\r\n" % (2 * len(fields))]
+            for name, value in fields.items():
+                reply.append(b"$%d\r\n%s\r\n$%d\r\n%s\r\n" % (len(name), name, len(value), value))
+            return b"".join(reply)
+        if command == "PEXPIRE":
+            if server.live(args[0]) is None:
+                return b":0\r\n"
+            server.expires[args[0]] = time.time() + int(args[1]) / 1000
+            return b":1\r\n"
+        if command == "DEL":
+            existed = server.live(args[0]) is not None
+            server.data.pop(args[0], None)
+            return b":%d\r\n" % existed
+        if command == "EXISTS":
+            return b":%d\r\n" % (server.live(args[0]) is not None)
+        if command == "EVAL":
+            # Stands in for RedisBackend.UPDATE_SCRIPT, the only script the backend runs
+            assert args[0].decode() == RedisBackend.UPDATE_SCRIPT
+            key, index, ttl_ms, now_ms, member = args[2:7]
+            if server.live(key) is None:
+                return b":0\r\n"
+            if len(args) > 7:
+                self.execute("HSET", [key, *args[7:]])
+            self.execute("PEXPIRE", [key, ttl_ms])
+            self.execute("ZADD", [index, now_ms, member])
+            return b":1\r\n"
+        if command == "ZADD":
+            scores = server.sorted_sets.setdefault(args[0], {})
+            only_existing = args[1].upper() == b"XX"
+            score, member = args[2:4] if only_existing else args[1:3]
+            added = member not in scores
+            if not (only_existing and added):
+                scores[member] = float(score)
+            return b":%d\r\n" % (added and not only_existing)
+        if command == "ZREM":
+            return b":%d\r\n" % (server.sorted_sets.get(args[0], {}).pop(args[1], None) is not None)
+        if command == "ZRANGEBYSCORE":
+            scores = server.sorted_sets.get(args[0], {})
+            low = float("-inf") if args[1] == b"-inf" else float(args[1])
+            members = sorted((score, member) for member, score in scores.items() if low <= score <= float(args[2]))
+            members = [member for _, member in members][:int(args[5])]
+            return b"".join([b"*%d\r\n" % len(members)] + [b"$%d\r\n%s\r\n" % (len(m), m) for m in members])
+        return b"-ERR unknown command\r\n"
+
+
+def _check_shared(first: SessionStore, second: SessionStore):
+    """A session created and filled through one worker is visible to the other"""
+    session_id = first.create()
+    first.update(session_id, markdown="# TPS746\n| VIN | 1.5 | V |", parameters=["VIN"],
+                 page_mapping=PageMap([0, 1], [1, 2], 2), line_boxes=LineBoxes({1: [1.0, 2.0, 3.0, 4.0]}),
+                 pdf_path="/tmp/tps746.pdf")
+
+    data = second.get(session_id)
+    assert data["markdown"] == "# TPS746\n| VIN | 1.5 | V |"
+    assert data["parameters"] == ["VIN"]
+    assert data["page_mapping"].get(1) == 2
+    assert data["line_boxes"].get(1) == [1.0, 2.0, 3.0, 4.0]
+    assert data["page_blocks"].pdf_path == "/tmp/tps746.pdf"
+    assert data["pdf_pages"] == []
+
+    # Updates from the second worker only touch their own fields
+    second.update(session_id, aliases={"VIN": ["Input voltage"]})
+    assert first.get(session_id)["aliases"] == {"VIN": ["Input voltage"]}
+    assert first.get(session_id)["markdown"].startswith("# TPS746")
+
+    assert second.delete(session_id)
+    try:
+        first.get(session_id)
+        assert False, "deleted session should raise"
+    except SessionNotFoundError:
+        pass
+    assert first.update(session_id, markdown="late") is False
+
+
+def test_disk_backend_shared_between_workers():
+    """Two stores over one directory behave like two uvicorn workers"""
+    with tempfile.TemporaryDirectory() as directory:
+        workers = [SessionStore(backend=DiskBackend(directory, 60, 10, 10 ** 9)) for _ in range(2)]
+        _check_shared(*workers)
+
+
+def test_disk_backend_expiry_and_caps():
+    """Idle and least recently used session files are removed"""
+    with tempfile.TemporaryDirectory() as directory:
+        evicted = []
+        store = SessionStore(backend=DiskBackend(directory, 60, 2, 10 ** 9), on_evict=evicted.append)
+        store.SHARED_PRUNE_INTERVAL = 0
+        a = store.create()
+        time.sleep(0.02)
+        b = store.create()
+        time.sleep(0.02)
+        store.get(a)
+        store.create()
+        assert evicted == [b]
+
+        store.backend.ttl_seconds = 0.05
+        time.sleep(0.1)
+        store.get_or_create(None)
+        assert store.get_stats()["sessions"] == 1
+
+
+def test_disk_backend_keeps_document_apart():
+    """Small updates leave the document file alone, and reads reuse its parsed form until it changes"""
+    with tempfile.TemporaryDirectory() as directory:
+        backend = DiskBackend(directory, 60, 10, 10 ** 9)
+        store = SessionStore(backend=backend)
+        session_id = store.create()
+        store.update(session_id, markdown="# TPS746", pdf_pages=[{"page_number": 1, "text": "TPS746"}],
+                     parameters=["VIN"])
+        document_path = backend._document_path(session_id)
+        written = document_path.stat().st_mtime_ns
+        
+        first = backend.load(session_id)
+        for progress in range(5):
+            store.update(session_id, conversion_job={"status": "running", "progress": progress})
+        second = backend.load(session_id)
+        assert document_path.stat().st_mtime_ns == written
+        assert second["pdf_pages"] is first["pdf_pages"]
+        assert second["conversion_job"]["progress"] == 4 and second["parameters"] == ["VIN"]
+        
+        # Another worker replacing the document is picked up
+        other = DiskBackend(directory, 60, 10, 10 ** 9)
+        other.update(session_id, {"markdown": "# TPS746-Q1"}, 0)
+        assert backend.load(session_id)["markdown"] == "# TPS746-Q1"
+        
+        assert store.delete(session_id)
+        assert not document_path.exists()
+
+
+def test_redis_backend_shared_between_workers():
+    """Two stores talking to one Redis-protocol server share sessions, which expire server-side"""
+    server = StandInRedis()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"redis://127.0.0.1:{server.server_address[1]}/1"
+    try:
+        workers = [SessionStore(backend=RedisBackend(url, 60)) for _ in range(2)]
+        _check_shared(*workers)
+
+        evicted = []
+        expiring = SessionStore(backend=RedisBackend(url, 0.05), on_evict=evicted.append)
+        expiring.SHARED_PRUNE_INTERVAL = 0
+        session_id = expiring.create()
+        time.sleep(0.1)
+        # An update after expiry fails instead of recreating a partial session without a TTL
+        assert expiring.update(session_id, conversion_job={"status": "running"}) is False
+        assert server.live(f"session:{session_id}".encode()) is None
+        try:
+            expiring.get(session_id)
+            assert False, "expired session should raise"
+        except SessionNotFoundError:
+            pass
+        # The expired session is reported once, so its uploads get removed
+        assert evicted == [session_id]
+        expiring.get_or_create(None)
+        assert evicted == [session_id]
+
+        client = RespClient.from_url(url)
+        assert client.execute("PEXPIRE", "missing", 10) == 0
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_disk_backend_shared_between_workers()
+    test_disk_backend_expiry_and_caps()
+    test_disk_backend_keeps_document_apart()
+    test_redis_backend_shared_between_workers()
+    print("✅ Session backend tests passed")
@@ -0,0 +1,75 @@
+"""
+Test Session Store - Verify sessions are isolated, expire after their TTL and respect the caps
+"""
+
+import time
+
+from session_store import SessionStore, SessionNotFoundError, estimate_size
+
+
+def test_sessions_are_isolated():
+    """Two sessions never see each other's documents"""
+    store = SessionStore(ttl_seconds=60, max_sessions=10, max_bytes=10 ** 9)
+    first, second = store.create(), store.create()
+    store.update(first, markdown="# First", parameters=["VIN"])
+    store.update(second, markdown="# Second")
+
+    assert store.get(first)["markdown"] == "# First"
+    assert store.get(second)["markdown"] == "# Second"
+    assert store.get(second)["parameters"] == []
+
+    try:
+        store.get("missing")
+        assert False, "unknown session should raise"
+    except SessionNotFoundError:
+        pass
+
+    session_id, data = store.get_or_create(None)
+    assert session_id not in (first, second) and data["markdown"] is None
+    assert store.get_or_create(first)[0] == first
+
+
+def test_ttl_expiry():
+    """Idle sessions expire and the eviction callback runs for each"""
+    evicted = []
+    store = SessionStore(ttl_seconds=0.05, max_sessions=10, max_bytes=10 ** 9, on_evict=evicted.append)
+    session_id = store.create()
+    time.sleep(0.1)
+
+    try:
+        store.get(session_id)
+        assert False, "expired session should raise"
+    except SessionNotFoundError:
+        pass
+    assert evicted == [session_id]
+    assert store.update(session_id, markdown="late") is False
+
+
+def test_caps_evict_least_recently_used():
+    """Count and memory caps drop the least recently used sessions first"""
+    evicted = []
+    store = SessionStore(ttl_seconds=60, max_sessions=2, max_bytes=10 ** 9, on_evict=evicted.append)
+    a, b = store.create(), store.create()
+    store.get(a)
+    store.create()
+    assert evicted == [b]
+    assert store.get_stats()["sessions"] == 2
+
+    store = SessionStore(ttl_seconds=60, max_sessions=10, max_bytes=1000, on_evict=evicted.append)
+    a, b = store.create(), store.create()
+    store.update(a, markdown="x" * 600)
+    store.update(b, markdown="y" * 600)
+    assert store.get_stats()["sessions"] == 1
+    assert store.get(b)["markdown"] == "y" * 600
+    assert store.get_stats()["size_bytes"] == estimate_size(store.get(b))
+
+    # A single session over the cap is kept, it is the one in use
+    store.update(b, markdown="z" * 5000)
+    assert store.get(b)["markdown"] == "z" * 5000
+
+
+if __name__ == "__main__":
+    test_sessions_are_isolated()
+    test_ttl_expiry()
+    test_caps_evict_least_recently_used()
+    print("✅ Session store tests passed")
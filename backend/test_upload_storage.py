@@ -0,0 +1,59 @@
+"""
+Test Upload Storage - Verify uploads are hashed while streaming, size-limited and published atomically
+"""
+
+import asyncio
+import hashlib
+import io
+import tempfile
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from upload_storage import UploadTooLargeError, check_content_length, save_upload
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="datasheet.pdf")
+
+
+def test_content_addressed_save():
+    """The stored file is named by its SHA-256, computed in the same pass that writes it"""
+    data = b"%PDF-1.7\n" + bytes(range(256)) * 5000
+    with tempfile.TemporaryDirectory() as directory:
+        stored = asyncio.run(save_upload(_upload(data), Path(directory), len(data), suffix=".pdf", chunk_size=4096))
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert stored.size == len(data)
+        assert stored.path == Path(directory) / f"{stored.sha256}.pdf"
+        assert stored.path.read_bytes() == data
+        assert [p.name for p in Path(directory).iterdir()] == [stored.path.name]
+
+        # Not content-addressed: every upload gets its own name
+        first = asyncio.run(save_upload(_upload(b"a,b\n"), Path(directory), 100, ".csv", content_addressed=False))
+        second = asyncio.run(save_upload(_upload(b"a,b\n"), Path(directory), 100, ".csv", content_addressed=False))
+        assert first.path != second.path and first.path.suffix == ".csv"
+
+
+def test_size_limit():
+    """Oversized uploads fail without leaving partial files behind"""
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            asyncio.run(save_upload(_upload(b"x" * 10000), Path(directory), 9999, chunk_size=1000))
+            assert False, "oversized upload should raise"
+        except UploadTooLargeError:
+            pass
+        assert list(Path(directory).iterdir()) == []
+
+    check_content_length(None, 10)
+    check_content_length("10", 10)
+    try:
+        check_content_length("11", 10)
+        assert False, "oversized Content-Length should raise"
+    except UploadTooLargeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_content_addressed_save()
+    test_size_limit()
+    print("✅ Upload storage tests passed")
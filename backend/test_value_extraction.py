@@ -0,0 +1,48 @@
+"""
+Test Value Extraction - Verify the combined patterns keep per-pattern priority
+"""
+
+from value_extraction import ValueExtractor
+
+
+def test_markdown_dialect():
+    """Markdown lines resolve to the first pattern that matches anywhere"""
+    values = ValueExtractor("markdown")
+    assert values.extract("| V IN | Input voltage | 1.5 | V |") == {"value": "1.5", "unit": "V"}
+    # Min and max around an empty typical cell form a range; the unit is the last cell
+    assert values.extract("| T J | Junction temperature | -40 | | 150 | °C |") == {"value": "-40 to 150", "unit": "°C"}
+    assert values.extract("- Input voltage range: 1.5V to 6.0V") == {"value": "1.5 to 6.0", "unit": "V"}
+    assert values.extract("| V OUT | 0.65 to 5.0 | V |") == {"value": "0.65 to 5.0", "unit": "V"}
+    # A later table cell beats an earlier colon because table patterns come first
+    assert values.extract("Note: 3 items | 25 | mA |") == {"value": "25", "unit": "mA"}
+    assert values.extract("## 1 Features") is None
+    assert values.extract("no digits here") is None
+
+
+def test_pdf_text_dialect():
+    """PDF text lines accept ranges after separators or whitespace"""
+    values = ValueExtractor("pdf_text")
+    assert values.extract("Input voltage: 1.5 - 6.0 V") == {"value": "1.5 - 6.0", "unit": "V"}
+    assert values.extract("Output current 1 A") == {"value": "1", "unit": "A"}
+
+
+def test_converter_dialect():
+    """Converter lines prefer table ranges"""
+    values = ValueExtractor("converter")
+    assert values.extract("| V IN | 1.5 to 6.0 | V |") == {"value": "1.5 to 6.0", "unit": "V"}
+    assert values.extract("Supply 1.5V to 6.0V") == {"value": "1.5", "unit": "V"}
+
+
+def test_lines_are_memoised():
+    """Each distinct line is parsed once"""
+    values = ValueExtractor("markdown")
+    first = values.extract("| I OUT | Output current | 1 | A |")
+    assert values.extract("| I OUT | Output current | 1 | A |") is first
+
+
+if __name__ == "__main__":
+    test_markdown_dialect()
+    test_pdf_text_dialect()
+    test_converter_dialect()
+    test_lines_are_memoised()
+    print("✅ Value extraction tests passed")
@@ -0,0 +1,85 @@
+"""
+Streaming upload storage
+Writes uploads to disk in chunks while hashing them, enforces a size limit and
+publishes each file atomically under its SHA-256 so the conversion cache can be
+checked without reading the file a second time.
+"""
+
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds its size limit"""
+
+
+class StoredUpload:
+    """A saved upload: where it landed, its SHA-256 and its size"""
+
+    def __init__(self, path: Path, sha256: str, size: int):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+
+
+def check_content_length(content_length: Optional[str], max_bytes: int) -> None:
+    """
+    Reject a request whose declared body size is already over the limit
+
+    Raises:
+        UploadTooLargeError: if Content-Length exceeds max_bytes
+    """
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise UploadTooLargeError(f"Upload is larger than the {max_bytes // (1024 * 1024)} MB limit")
+
+
+async def save_upload(upload: UploadFile, directory: Path, max_bytes: int, suffix: str = "",
+                      content_addressed: bool = True, chunk_size: int = 1024 * 1024) -> StoredUpload:
+    """
+    Stream an upload to disk, hashing it on the fly
+
+    The data is written to a temporary file first and renamed into place once
+    complete, so readers never see a partial file.
+
+    Args:
+        upload: Incoming file
+        directory: Destination directory (created if needed)
+        max_bytes: Largest accepted upload
+        suffix: Extension of the stored file, e.g. ".pdf"
+        content_addressed: Name the file <sha256><suffix>; otherwise keep a unique temporary name
+        chunk_size: Bytes read and written per step
+
+    Raises:
+        UploadTooLargeError: as soon as more than max_bytes have been received
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f".{uuid.uuid4().hex}{suffix}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload is larger than the {max_bytes // (1024 * 1024)} MB limit")
+                digest.update(chunk)
+                await out.write(chunk)
+
+        sha256 = digest.hexdigest()
+        path = directory / (f"{sha256}{suffix}" if content_addressed else tmp_path.name[1:-len(".part")])
+        await aiofiles.os.replace(tmp_path, path)
+        return StoredUpload(path, sha256, size)
+    finally:
+        if os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
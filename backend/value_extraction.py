@@ -0,0 +1,131 @@
+"""
+Shared value extraction engine
+Precompiled value/unit patterns for PDF text, markdown search and markdown conversion,
+with a per-document memo so each line is parsed at most once
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Building blocks
+NUMBER = r'[+-]?\d+\.?\d*'
+NUMBER_RANGE = NUMBER + r'\s*(?:to|-|–)\s*' + NUMBER
+UNIT = r'[A-Za-z°%/]+'
+
+# Each pattern is (regex, value groups, unit group). Value groups are joined with " to ".
+# Patterns are tried in order; the first one that matches anywhere in the line wins.
+ValuePattern = Tuple[str, Tuple[int, ...], int]
+
+DIALECTS: Dict[str, List[ValuePattern]] = {
+    # Raw PDF text lines (ParameterExtractor)
+    "pdf_text": [
+        (r'[:=]\s*(' + NUMBER_RANGE + r'|' + NUMBER + r')\s*(' + UNIT + r')?', (1,), 2),
+        (r'\s+(' + NUMBER_RANGE + r'|' + NUMBER + r')\s*(' + UNIT + r')?', (1,), 2),
+    ],
+    # Markdown lines (MarkdownParameterExtractor)
+    "markdown": [
+        # Table format: | param | min | typ | max | unit |
+        (r'\|\s*(' + NUMBER + r')\s*\|\s*\|\s*(' + NUMBER + r')\s*\|\s*(' + UNIT + r')?\s*\|', (1, 2), 3),
+        # Table format: | param | value | unit |
+        (r'\|\s*(' + NUMBER + r')\s*\|\s*(' + UNIT + r')?\s*\|', (1,), 2),
+        # Range in table: | param | 1.5 to 6.0 | V |
+        (r'\|\s*(' + NUMBER + r')\s+to\s+(' + NUMBER + r')\s*\|\s*(' + UNIT + r')?\s*\|', (1, 2), 3),
+        # Colon format: param: 1.5V to 6.0V
+        (r':\s*(' + NUMBER + r')\s*([A-Za-z]+)\s+to\s+(' + NUMBER + r')\s*([A-Za-z]+)?', (1, 3), 2),
+        # Simple colon: param: value unit
+        (r':\s*(' + NUMBER + r')\s*(' + UNIT + r')?', (1,), 2),
+    ],
+    # Markdown search during conversion (MarkdownConverter)
+    "converter": [
+        # Table format: | param | value | unit |
+        (r'\|\s*(' + NUMBER_RANGE + r')\s*\|\s*(' + UNIT + r')?\s*\|', (1,), 2),
+        (r'\|\s*(' + NUMBER + r')\s*\|\s*(' + UNIT + r')?\s*\|', (1,), 2),
+        # Colon/equals format: param: value unit
+        (r':\s*(' + NUMBER_RANGE + r')\s*(' + UNIT + r')?', (1,), 2),
+        (r':\s*(' + NUMBER + r')\s*(' + UNIT + r')?', (1,), 2),
+        # Range format: 1.5V to 6.0V
+        (r'(' + NUMBER + r')\s*([A-Za-z]+)\s+to\s+(' + NUMBER + r')\s*([A-Za-z]+)?', (1,), 2),
+    ],
+}
+
+# Pattern for a value directly following a parameter name in running text
+VALUE_AFTER_NAME = re.compile(r'[:=\s]*(' + NUMBER_RANGE + r'|' + NUMBER + r')\s*(' + UNIT + r')?')
+
+
+_DIGIT = re.compile(r'\d')
+
+
+class _CombinedPattern:
+    """
+    Several prioritised patterns compiled into one regex
+
+    Every pattern becomes a lookahead alternative anchored at the line start,
+    (?=.*?(P1))|(?=.*?(P2))|..., so a single match call finds the leftmost match
+    of the first pattern that matches anywhere, exactly like trying each
+    pattern with re.search in turn.
+    """
+
+    def __init__(self, patterns: List[ValuePattern]):
+        alternatives = []
+        self.layout = []
+        group_offset = 0
+        for regex, value_groups, unit_group in patterns:
+            marker = group_offset + 1
+            alternatives.append(r'(?=.*?(' + regex + r'))')
+            self.layout.append((
+                marker,
+                tuple(marker + g for g in value_groups),
+                marker + unit_group
+            ))
+            group_offset = marker + re.compile(regex).groups
+        self.regex = re.compile('|'.join(alternatives), re.DOTALL)
+
+    def extract(self, line: str) -> Optional[Dict[str, str]]:
+        # Every pattern needs a digit; most lines have none
+        if not _DIGIT.search(line):
+            return None
+
+        match = self.regex.match(line)
+        if not match:
+            return None
+
+        for marker, value_groups, unit_group in self.layout:
+            if match.group(marker) is not None:
+                value = " to ".join(match.group(g).strip() for g in value_groups)
+                unit = match.group(unit_group)
+                return {"value": value, "unit": unit.strip() if unit else ""}
+        return None
+
+
+_COMBINED = {name: _CombinedPattern(patterns) for name, patterns in DIALECTS.items()}
+
+
+class ValueExtractor:
+    """Extract {"value", "unit"} from lines, memoising results per line"""
+
+    def __init__(self, dialect: str):
+        """
+        Args:
+            dialect: One of DIALECTS ("pdf_text", "markdown" or "converter")
+        """
+        if dialect not in _COMBINED:
+            raise ValueError(f"Unknown value dialect: {dialect}")
+        self.dialect = dialect
+        self._pattern = _COMBINED[dialect]
+        self._memo: Dict[str, Optional[Dict[str, str]]] = {}
+
+    def extract(self, line: str) -> Optional[Dict[str, str]]:
+        """
+        Extract value and unit from a line
+
+        Returned dicts are shared between calls for the same line; treat them as read-only.
+        """
+        try:
+            return self._memo[line]
+        except KeyError:
+            result = self._memo[line] = self._pattern.extract(line)
+            return result
+
+    def clear(self):
+        """Forget memoised lines"""
+        self._memo.clear()
@@ -3,11 +3,12 @@ Vision-based analysis using AI models that support image input.
 Supports OpenAI GPT-4 Vision and OpenRouter vision models.
 """
 
+import asyncio
 import base64
 import json
 from typing import Dict, Any
-from openai import OpenAI
 from dotenv import load_dotenv
+from ai_client import AIClientPool, create_async_client
 from config import APIConfig
 
 # Load environment variables
@@ -17,13 +18,14 @@ load_dotenv()
 class VisionExtractor:
     """Extract information from images using vision-capable AI models"""
     
-    def __init__(self, api_key: str = None, provider: str = None):
+    def __init__(self, api_key: str = None, provider: str = None, clients: AIClientPool = None):
         """
         Initialize Vision extractor with support for OpenAI and OpenRouter vision models.
         
         Args:
             api_key: API key. If None, reads from config/env
             provider: API provider ('openai' or 'openrouter'). If None, reads from config
+            clients: App-lifetime client pool; without one the extractor opens its own connections
         """
         # Determine provider
         self.provider = provider or APIConfig.API_PROVIDER
@@ -42,15 +44,15 @@ class VisionExtractor:
         self.base_url = APIConfig.get_base_url()
         self.model = APIConfig.get_vision_model()
         
-        # Initialize OpenAI client (works for both OpenAI and OpenRouter)
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+        # Async OpenAI client (works for both OpenAI and OpenRouter) with pooled connections and retries
+        if clients:
+            self.client = clients.get(self.api_key, self.base_url)
+        else:
+            self.client = create_async_client(self.api_key, self.base_url)
         
         print(f"🔍 Initialized Vision Extractor with {self.provider.upper()} - Model: {self.model}")
     
-    def analyze_image(self, image_data: bytes, prompt: str, image_format: str = "jpeg") -> Dict[str, Any]:
+    async def analyze_image(self, image_data: bytes, prompt: str, image_format: str = "jpeg") -> Dict[str, Any]:
         """
         Analyze an image with a custom prompt.
         
@@ -95,7 +97,7 @@ class VisionExtractor:
             
             # Make API call (without JSON mode for vision models)
             # Use lower temperature for more focused, deterministic responses
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=0.0,  # Use 0 for most deterministic/focused answers
@@ -120,7 +122,7 @@ class VisionExtractor:
                 "answer": None
             }
     
-    def analyze_graph(self, image_data: bytes, question: str) -> Dict[str, Any]:
+    async def analyze_graph(self, image_data: bytes, question: str) -> Dict[str, Any]:
         """
         Analyze a graph image and answer questions about it.
         
@@ -146,9 +148,9 @@ Answer the question directly:"""
 
         print(f"🔍 DEBUG: Sending question to AI: {question}")
         print(f"🔍 DEBUG: Using model: {self.model}")
-        return self.analyze_image(image_data, enhanced_prompt)
+        return await self.analyze_image(image_data, enhanced_prompt)
     
-    def extract_equation(self, image_data: bytes) -> Dict[str, Any]:
+    async def extract_equation(self, image_data: bytes) -> Dict[str, Any]:
         """
         Extract the mathematical equation from a graph.
         
@@ -167,7 +169,7 @@ Answer the question directly:"""
 
 Format your response clearly with the equation prominently displayed."""
 
-        return self.analyze_image(image_data, prompt)
+        return await self.analyze_image(image_data, prompt)
     
     def _get_system_prompt(self) -> str:
         """Get the system prompt for vision analysis"""
@@ -182,11 +184,11 @@ CRITICAL RULES:
 
 Your task is to answer the user's specific question by reading the graph accurately."""
     
-    def test_connection(self) -> bool:
+    async def test_connection(self) -> bool:
         """Test if Vision API connection works"""
         try:
             # Create a simple test with text only
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=5
@@ -202,7 +204,7 @@ if __name__ == "__main__":
     # Test the extractor
     extractor = VisionExtractor()
     
-    if extractor.test_connection():
+    if asyncio.run(extractor.test_connection()):
         print("✓ Vision API connection successful!")
     else:
         print("✗ Vision API connection failed!")
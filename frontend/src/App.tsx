@@ -5,6 +5,7 @@ import PDFViewer from './components/PDFViewer';
 import GraphAnalysis from './components/GraphAnalysis';
 import { Panel, PanelGroup, PanelResizeHandle } from 'react-resizable-panels';
 import { Parameter, ExtractionMetadata } from './types';
+import { API_BASE, sessionHeaders } from './session';
 import { FileText, BarChart3 } from 'lucide-react';
 
 type TabType = 'extraction' | 'graph';
@@ -40,7 +41,7 @@ function App() {
     
     // Fetch markdown content
     try {
-      const response = await fetch('http://localhost:8000/api/markdown');
+      const response = await fetch(`${API_BASE}/api/markdown`, { headers: await sessionHeaders() });
       if (response.ok) {
         const data = await response.json();
         setMarkdownContent(data.markdown);
@@ -55,6 +56,27 @@ function App() {
     setMetadata(meta);
   };
 
+  const handleExtractionStarted = () => {
+    setMetadata(null);
+    setParameters(prev => prev.map(p => ({
+      ...p,
+      value: '',
+      unit: '',
+      source_page: null,
+      markdown_line: null,
+      extraction_method: 'pending',
+      confidence: 0,
+      manually_edited: false,
+      source_text: '',
+      notes: '',
+      highlights: []
+    })));
+  };
+
+  const handleResultStreamed = (index: number, result: Parameter) => {
+    setParameters(prev => prev.map((p, i) => (i === index ? result : p)));
+  };
+
   const handleParameterUpdate = (id: string, value: string) => {
     setParameters(prev => prev.map(p => 
       p.id === id 
@@ -115,6 +137,8 @@ function App() {
             onParametersUploaded={handleParametersUploaded}
             onPdfUploaded={handlePdfUploaded}
             onExtractionComplete={handleExtractionComplete}
+            onExtractionStarted={handleExtractionStarted}
+            onResultStreamed={handleResultStreamed}
             parametersCount={parameters.length}
             hasPdf={!!pdfUrl}
             loading={loading}
@@ -2,23 +2,43 @@ import React, { useRef, useState } from 'react';
 import { Upload, FileText, FileSpreadsheet, PlayCircle, Sparkles } from 'lucide-react';
 import axios from 'axios';
 import { Parameter, ExtractionMetadata } from '../types';
+import { API_BASE, sessionHeaders, setSessionId } from '../session';
+import { readEventStream } from '../stream';
 
 interface FileUploadProps {
   onParametersUploaded: (parameters: string[]) => void;
   onPdfUploaded: (url: string) => void;
   onExtractionComplete: (results: Parameter[], metadata: ExtractionMetadata) => void;
+  onExtractionStarted: () => void;
+  onResultStreamed: (index: number, result: Parameter) => void;
   parametersCount: number;
   hasPdf: boolean;
   loading: boolean;
   setLoading: (loading: boolean) => void;
 }
 
-const API_BASE = 'http://localhost:8000';
+const JOB_POLL_INTERVAL_MS = 1000;
+
+// Poll a conversion job until it completes or fails
+const waitForJob = async (jobId: string): Promise<any> => {
+  while (true) {
+    const response = await axios.get(`${API_BASE}/api/jobs/${jobId}`, { headers: await sessionHeaders() });
+    if (response.data.status === 'completed') {
+      return response.data.result;
+    }
+    if (response.data.status === 'failed') {
+      throw new Error(response.data.error || 'PDF conversion failed');
+    }
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
 
 const FileUpload: React.FC<FileUploadProps> = ({
   onParametersUploaded,
   onPdfUploaded,
   onExtractionComplete,
+  onExtractionStarted,
+  onResultStreamed,
   parametersCount,
   hasPdf,
   loading,
@@ -38,10 +58,11 @@ const FileUpload: React.FC<FileUploadProps> = ({
     try {
       setLoading(true);
       const response = await axios.post(`${API_BASE}/api/upload-parameters`, formData, {
-        headers: { 'Content-Type': 'multipart/form-data' }
+        headers: { 'Content-Type': 'multipart/form-data', ...(await sessionHeaders()) }
       });
 
       if (response.data.success) {
+        setSessionId(response.data.session_id);
         onParametersUploaded(response.data.parameters);
       }
     } catch (error: any) {
@@ -61,11 +82,15 @@ const FileUpload: React.FC<FileUploadProps> = ({
     try {
       setLoading(true);
       const response = await axios.post(`${API_BASE}/api/upload-pdf`, formData, {
-        headers: { 'Content-Type': 'multipart/form-data' }
+        headers: { 'Content-Type': 'multipart/form-data', ...(await sessionHeaders()) }
       });
 
       if (response.data.success) {
-        onPdfUploaded(`${API_BASE}${response.data.pdf_url}`);
+        setSessionId(response.data.session_id);
+        const result = response.data.status === 'completed'
+          ? response.data.result
+          : await waitForJob(response.data.job_id);
+        onPdfUploaded(`${API_BASE}${result.pdf_url}`);
       }
     } catch (error: any) {
       alert('Error uploading PDF: ' + (error.response?.data?.detail || error.message));
@@ -74,6 +99,37 @@ const FileUpload: React.FC<FileUploadProps> = ({
     }
   };
 
+  // Results arrive one by one as Server-Sent Events, so the list fills in while extraction is still running
+  const streamExtraction = async () => {
+    const response = await fetch(`${API_BASE}/api/extract/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', ...(await sessionHeaders()) },
+      body: JSON.stringify({ mode: extractionMode })
+    });
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.detail || response.statusText);
+    }
+
+    onExtractionStarted();
+    const results: Parameter[] = [];
+    let streamError = '';
+    await readEventStream(response, (event, data) => {
+      if (event === 'result') {
+        const result = { ...data.result, id: `param-${data.index}` };
+        results[data.index] = result;
+        onResultStreamed(data.index, result);
+      } else if (event === 'done') {
+        onExtractionComplete(results, data);
+      } else if (event === 'error') {
+        streamError = data.detail;
+      }
+    });
+    if (streamError) {
+      throw new Error(streamError);
+    }
+  };
+
   const handleExtract = async () => {
     if (!parametersCount || !hasPdf) {
       alert('Please upload both parameter list and PDF file first');
@@ -82,18 +138,7 @@ const FileUpload: React.FC<FileUploadProps> = ({
 
     try {
       setLoading(true);
-      const response = await axios.post(`${API_BASE}/api/extract`, {
-        mode: extractionMode
-      });
-
-      if (response.data.success) {
-        // Add IDs to results
-        const resultsWithIds = response.data.results.map((r: any, index: number) => ({
-          ...r,
-          id: `param-${index}`
-        }));
-        onExtractionComplete(resultsWithIds, response.data.metadata);
-      }
+      await streamExtraction();
     } catch (error: any) {
       alert('Error extracting parameters: ' + (error.response?.data?.detail || error.message));
     } finally {
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { Search, CheckCircle, AlertCircle, XCircle, Download, FileJson, MapPin } from 'lucide-react';
+import { Search, CheckCircle, AlertCircle, XCircle, Download, FileJson, MapPin, Loader2 } from 'lucide-react';
 import { Parameter, ExtractionMetadata } from '../types';
 
 interface ParameterListProps {
@@ -20,7 +20,14 @@ const ParameterList: React.FC<ParameterListProps> = ({
   const [searchQuery, setSearchQuery] = useState('');
   const [filter, setFilter] = useState<'all' | 'found' | 'not_found' | 'low_confidence'>('all');
 
+  // Results stream in one by one; parameters still being extracted are 'pending'
+  const pendingCount = parameters.filter(p => p.extraction_method === 'pending').length;
+  const streaming = !metadata && pendingCount > 0 && pendingCount < parameters.length;
+
   const getStatusIcon = (param: Parameter) => {
+    if (param.extraction_method === 'pending') {
+      return <Loader2 className={`text-gray-400 ${streaming ? 'animate-spin' : ''}`} size={18} />;
+    }
     if (param.value === 'NF' || param.value === '') {
       return <XCircle className="text-red-500" size={18} />;
     }
@@ -32,6 +39,7 @@ const ParameterList: React.FC<ParameterListProps> = ({
 
   const getStatusColor = (param: Parameter) => {
     if (param.manually_edited) return 'bg-yellow-50 border-yellow-200';
+    if (param.extraction_method === 'pending') return 'bg-white border-gray-200';
     if (param.value === 'NF' || param.value === '') return 'bg-red-50 border-red-200';
     if (param.confidence < 70 && param.confidence > 0) return 'bg-yellow-50 border-yellow-200';
     return 'bg-green-50 border-green-200';
@@ -136,6 +144,22 @@ const ParameterList: React.FC<ParameterListProps> = ({
         </div>
 
         {/* Progress */}
+        {streaming && (
+          <div className="text-sm text-gray-600">
+            <div className="flex justify-between mb-1">
+              <span>Extracting...</span>
+              <span className="font-medium">
+                {parameters.length - pendingCount} / {parameters.length}
+              </span>
+            </div>
+            <div className="w-full bg-gray-200 rounded-full h-2">
+              <div
+                className="bg-blue-400 h-2 rounded-full transition-all"
+                style={{ width: `${((parameters.length - pendingCount) / parameters.length) * 100}%` }}
+              />
+            </div>
+          </div>
+        )}
         {metadata && (
           <div className="text-sm text-gray-600">
             <div className="flex justify-between mb-1">
@@ -0,0 +1,27 @@
+import axios from 'axios';
+
+export const API_BASE = 'http://localhost:8000';
+
+// The backend keeps each browser tab's PDF, markdown and parameters under its own session id
+let sessionId: string | null = null;
+
+// Get the current session id, starting a session on first use
+export const ensureSession = async (): Promise<string> => {
+  if (!sessionId) {
+    const response = await axios.post(`${API_BASE}/api/sessions`);
+    sessionId = response.data.session_id as string;
+  }
+  return sessionId;
+};
+
+// Remember the session id returned by an upload (the backend starts a new one if ours expired)
+export const setSessionId = (id: string | undefined) => {
+  if (id) {
+    sessionId = id;
+  }
+};
+
+// Headers that route a request to this tab's session
+export const sessionHeaders = async (): Promise<Record<string, string>> => ({
+  'X-Session-ID': await ensureSession()
+});
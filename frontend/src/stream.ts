@@ -0,0 +1,38 @@
+// Read a text/event-stream response body, calling onEvent with each event's name and JSON data
+export const readEventStream = async (
+  response: Response,
+  onEvent: (event: string, data: any) => void
+): Promise<void> => {
+  if (!response.body) {
+    throw new Error('Streaming responses are not supported by this browser');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      const data: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          data.push(line.slice(5).trim());
+        }
+      }
+      if (data.length) {
+        onEvent(event, JSON.parse(data.join('\n')));
+      }
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+};